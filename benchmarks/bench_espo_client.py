@@ -0,0 +1,55 @@
+"""Benchmark: per-request latency of EspoClient against a local stand-in server.
+
+Compares a fresh connection per call (module-level httpx.request, as the client
+did before) against the pooled keep-alive client, on the find_account /
+create_account / create_opportunity sequence sync_to_crm makes per job.
+
+    python -m benchmarks.bench_espo_client
+"""
+import time
+
+import httpx
+
+from src.espo_client import EspoClient
+from src.models import Company, JobPost
+from tests.fake_espo import FakeEspoCRM
+
+
+class UnpooledEspoClient(EspoClient):
+    """EspoClient as it was: a new connection for every request"""
+
+    def _request(self, method: str, endpoint: str, find_existing=None, **kwargs) -> dict:
+        response = httpx.request(method, f"{self.base_url}/api/v1/{endpoint}", auth=self.auth, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+def sync_jobs(client: EspoClient, jobs: int) -> float:
+    job = JobPost(
+        source="hn_hiring",
+        source_id="1",
+        source_url="https://news.ycombinator.com/item?id=1",
+        company_name="Acme Corp",
+        title="Backend Engineer",
+        description="Python and Postgres " * 50,
+        tech_stack=["python", "postgresql"],
+    )
+    start = time.perf_counter()
+    for _ in range(jobs):
+        client.find_account(job.company_name)
+        account_id = client.create_account(Company(name=job.company_name))
+        client.create_opportunity(job, account_id)
+    return (time.perf_counter() - start) / (jobs * 3)
+
+
+def main():
+    with FakeEspoCRM() as crm:
+        unpooled = sync_jobs(UnpooledEspoClient(crm.url, "admin", "password"), 200)
+        with EspoClient(crm.url, "admin", "password") as client:
+            pooled = sync_jobs(client, 200)
+    print(f"new connection per request: {unpooled * 1000:.2f} ms/request")
+    print(f"pooled keep-alive client:   {pooled * 1000:.2f} ms/request ({unpooled / pooled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Micro-benchmark: experience parsing per job on long synthetic descriptions.
+
+Compares the original five-regex parse_experience_level (called for title and
+description) against the single-pass extractor.
+
+    python -m benchmarks.bench_experience
+"""
+import random
+import re
+import time
+
+from src.filters import _scan_experience, _summarize_experience
+
+FILLER = (
+    "we are building tools that help teams ship reliable software faster you will "
+    "own features end to end working closely with design and product our stack "
+    "includes python typescript react and postgres we value clear writing kind "
+    "reviews and pragmatic engineering benefits include health dental vision 401k"
+).split()
+MENTIONS = ["3-5 years", "5+ years", "2 yrs", "senior", "junior", "mid-level", "entry level", "sr."]
+
+
+def legacy_parse_experience_level(text: str) -> dict:
+    """parse_experience_level as it was before the single-pass extractor"""
+    result = {"years_min": None, "years_max": None, "level": None}
+    text_lower = text.lower()
+    plus_match = re.search(r"(\d+)\+?\s*(?:years?|yrs?)", text_lower)
+    if plus_match:
+        result["years_min"] = int(plus_match.group(1))
+    range_match = re.search(r"(\d+)\s*[-–]\s*(\d+)\s*(?:years?|yrs?)", text_lower)
+    if range_match:
+        result["years_min"] = int(range_match.group(1))
+        result["years_max"] = int(range_match.group(2))
+    if re.search(r"\b(?:junior|jr\.?|entry[- ]?level)\b", text_lower):
+        result["level"] = "junior"
+    elif re.search(r"\b(?:senior|sr\.?)\b", text_lower):
+        result["level"] = "senior"
+    elif re.search(r"\b(?:mid[- ]?level|intermediate)\b", text_lower):
+        result["level"] = "mid"
+    return result
+
+
+def make_corpus(jobs: int, words: int, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(jobs):
+        text = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(0, 3)):
+            text.insert(rng.randrange(len(text)), rng.choice(MENTIONS))
+        title = rng.choice(["Software Engineer", "Senior Backend Engineer", "Junior Developer"])
+        corpus.append((title, " ".join(text)))
+    return corpus
+
+
+def bench(fn, corpus, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title, description in corpus:
+            fn(title, description)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus)
+
+
+def main():
+    corpus = make_corpus(jobs=500, words=800)
+
+    def legacy(title, description):
+        return legacy_parse_experience_level(title), legacy_parse_experience_level(description)
+
+    def single_pass(title, description):
+        return (
+            _summarize_experience(_scan_experience(title.lower())),
+            _summarize_experience(_scan_experience(description.lower())),
+        )
+
+    assert [legacy(*job) for job in corpus] == [single_pass(*job) for job in corpus]
+    old = bench(legacy, corpus)
+    new = bench(single_pass, corpus)
+    chars = sum(len(d) for _, d in corpus) // len(corpus)
+    print(f"{len(corpus)} jobs, ~{chars} chars per description")
+    print(f"five regexes:  {old * 1e6:8.1f} us/job")
+    print(f"single pass:   {new * 1e6:8.1f} us/job  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
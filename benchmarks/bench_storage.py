@@ -0,0 +1,107 @@
+"""Benchmark: size and throughput of the jobs table with plain vs compressed data.
+
+Descriptions are built like real Indeed/Wellfound posts: a per-company blurb,
+one of a few benefits sections and EEO statements, and job-specific text.
+
+    python -m benchmarks.bench_storage
+"""
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_experience import FILLER
+from src.db import JobDatabase
+from src.models import JobPost
+
+EEO = [
+    "We are an equal opportunity employer and value diversity at our company. We do not "
+    "discriminate on the basis of race, religion, color, national origin, gender, sexual "
+    "orientation, age, marital status, veteran status, or disability status. ",
+    "All qualified applicants will receive consideration for employment without regard to "
+    "race, color, religion, sex, sexual orientation, gender identity, national origin, "
+    "disability, or status as a protected veteran. Reasonable accommodations are available. ",
+]
+BENEFITS = [
+    "Benefits: competitive salary and equity. Medical, dental and vision insurance. 401(k) "
+    "with company match. Unlimited PTO. Home office stipend. Parental leave. ",
+    "What we offer: fully remote team across time zones. Annual learning budget. Health "
+    "insurance for you and your dependents. Flexible hours. Company offsites twice a year. ",
+    "Perks include a generous equity package, premium healthcare, a wellness allowance and "
+    "a yearly retreat. We sponsor conference attendance and provide the latest hardware. ",
+]
+
+
+def make_jobs(count: int, seed: int = 0) -> list[JobPost]:
+    rng = random.Random(seed)
+    blurbs = [
+        f"Company {c} is building the future of {rng.choice(FILLER)} {rng.choice(FILLER)}. "
+        + " ".join(rng.choice(FILLER) for _ in range(120))
+        + ". "
+        for c in range(200)
+    ]
+    jobs = []
+    for i in range(count):
+        company = rng.randrange(len(blurbs))
+        description = (
+            blurbs[company]
+            + " ".join(rng.choice(FILLER) for _ in range(250))
+            + ". "
+            + rng.choice(BENEFITS)
+            + rng.choice(EEO)
+        )
+        jobs.append(
+            JobPost(
+                source=rng.choice(["indeed", "wellfound"]),
+                source_id=str(i),
+                source_url=f"https://example.com/jobs/{i}",
+                company_name=f"Company {company}",
+                title="Senior Backend Engineer",
+                description=description,
+                tech_stack=["python", "postgresql"],
+            )
+        )
+    return jobs
+
+
+def run(label: str, jobs: list[JobPost], compress: bool, train: bool):
+    path = tempfile.mktemp(suffix=".db")
+    db = JobDatabase(path, compress=compress)
+    if train:
+        # Train on an earlier batch, as the migrate command would
+        db.compress = False
+        db.save_jobs({"job": job} for job in jobs[:1000])
+        db.train_data_dictionary()
+        db.db.execute("DELETE FROM jobs")
+        db.compress = True
+
+    start = time.perf_counter()
+    db.save_jobs({"job": job} for job in jobs)
+    write = len(jobs) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    rows = db.get_unsynced_jobs()
+    read = len(rows) / (time.perf_counter() - start)
+    assert rows[0]["data"] == jobs[0].model_dump_json()
+
+    data_mb = db.data_size() / 1e6
+    db.db.vacuum()
+    file_mb = os.path.getsize(path) / 1e6
+    os.unlink(path)
+    print(
+        f"{label:>16}: data {data_mb:6.1f} MB, file {file_mb:6.1f} MB, "
+        f"write {write:7.0f} jobs/s, read {read:7.0f} jobs/s"
+    )
+
+
+def main():
+    jobs = make_jobs(5000)
+    chars = sum(len(job.description) for job in jobs) // len(jobs)
+    print(f"{len(jobs)} jobs, ~{chars} chars of description each")
+    run("plain", jobs, compress=False, train=False)
+    run("zlib", jobs, compress=True, train=False)
+    run("zlib + dict", jobs, compress=True, train=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Load test: the outbox sync stage against a local FakeEspoCRM.
+
+Drains the same queued jobs sequentially, through the async client and with
+batch creates, against a stand-in CRM with per-request latency and injected
+503s and 429s. Reports throughput and the client-side latency of each HTTP
+request (retries count as requests of their own).
+
+    python -m benchmarks.bench_sync_load
+"""
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from src import pipeline
+from src.db import JobDatabase
+from src.espo_client import EspoClient, RetryPolicy
+from src.models import JobPost
+from tests.fake_espo import FakeEspoCRM
+
+JOBS = 400
+COMPANIES = 150
+LATENCY = (0.01, 0.03)
+ERROR_RATE = 0.02
+THROTTLE_RATE = 0.02
+CONCURRENCY = 16
+
+
+def make_jobs() -> list[JobPost]:
+    return [
+        JobPost(
+            source="hn_hiring",
+            source_id=str(i),
+            source_url=f"https://news.ycombinator.com/item?id={i}",
+            company_name=f"Company {i % COMPANIES}",
+            title="Backend Engineer",
+            description="Python and Postgres " * 50,
+            tech_stack=["python", "postgresql"],
+        )
+        for i in range(JOBS)
+    ]
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class LatencyRecorder:
+    """httpx event hooks timing each request from send to response headers"""
+
+    def __init__(self):
+        self.seconds: list[float] = []
+
+    def on_request(self, request):
+        request.extensions["bench_started"] = time.perf_counter()
+
+    def on_response(self, response):
+        self.seconds.append(time.perf_counter() - response.request.extensions["bench_started"])
+
+    async def on_request_async(self, request):
+        self.on_request(request)
+
+    async def on_response_async(self, response):
+        self.on_response(response)
+
+
+def run(name: str, workdir: Path, **drain_options):
+    db = JobDatabase(str(workdir / f"{name}.db"))
+    db.save_jobs({"job": job} for job in make_jobs())
+    latencies = LatencyRecorder()
+    make_async_client = pipeline._async_espo
+
+    def async_client(concurrency):
+        client = make_async_client(concurrency)
+        client.client.event_hooks = {
+            "request": [latencies.on_request_async],
+            "response": [latencies.on_response_async],
+        }
+        return client
+
+    crm = FakeEspoCRM(latency=LATENCY, error_rate=ERROR_RATE, throttle_rate=THROTTLE_RATE, seed=0)
+    with crm, EspoClient(crm.url, "admin", "password", retry=RetryPolicy(base_delay=0.05)) as espo:
+        espo.client.event_hooks = {"request": [latencies.on_request], "response": [latencies.on_response]}
+        with patch.object(pipeline, "db", db), patch.object(pipeline, "espo", espo):
+            with patch.object(pipeline, "_async_espo", async_client):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    synced, failed = pipeline.drain_outbox(**drain_options)
+                seconds = time.perf_counter() - start
+
+    requests = sum(crm.requests.values())
+    print(
+        f"{name:<14} {synced:>4} synced {failed:>3} failed  {seconds:6.2f}s  "
+        f"{synced / seconds:6.1f} jobs/s  {requests:>5} requests  {requests / seconds:6.1f} req/s  "
+        f"p50 {percentile(latencies.seconds, 0.5) * 1000:5.1f}ms  "
+        f"p95 {percentile(latencies.seconds, 0.95) * 1000:5.1f}ms  "
+        f"p99 {percentile(latencies.seconds, 0.99) * 1000:5.1f}ms  "
+        f"{espo.stats.retries} retries"
+    )
+
+
+def main():
+    print(
+        f"{JOBS} jobs of {COMPANIES} companies, {LATENCY[0] * 1000:.0f}-{LATENCY[1] * 1000:.0f}ms per request, "
+        f"{ERROR_RATE:.0%} 503s, {THROTTLE_RATE:.0%} 429s"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        run("sequential", workdir)
+        run("async", workdir, concurrency=CONCURRENCY)
+        run("batch-create", workdir, concurrency=CONCURRENCY, batch_create=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Micro-benchmark: tech-stack extraction per job on long synthetic descriptions.
+
+Compares the per-scraper extractors that existed before src/tech.py (HN's raw
+substring scan and Indeed's per-keyword word-boundary regexes) against the shared
+single-pass TechExtractor.
+
+    python -m benchmarks.bench_tech
+"""
+import random
+import re
+
+from benchmarks.bench_experience import FILLER, bench
+from src.tech import TechExtractor
+
+HN_TECH_KEYWORDS = [
+    "python", "javascript", "typescript", "go", "golang", "rust", "java", "ruby",
+    "php", "c++", "c#", "swift", "kotlin", "scala", "react", "vue", "angular", "node",
+    "django", "flask", "rails", "postgresql", "mysql", "mongodb", "redis",
+    "elasticsearch", "aws", "gcp", "azure", "docker", "kubernetes", "terraform",
+]
+
+INDEED_TECH_KEYWORDS = [
+    "python", "javascript", "typescript", "java", "c++", "c#", "go", "golang",
+    "rust", "ruby", "php", "swift", "kotlin", "scala", "r",
+    "react", "angular", "vue", "next.js", "nextjs", "node.js", "nodejs", "express",
+    "django", "flask", "fastapi", "spring", "rails",
+    "aws", "azure", "gcp", "google cloud", "kubernetes", "k8s", "docker",
+    "postgresql", "postgres", "mysql", "mongodb", "redis", "elasticsearch",
+    "graphql", "rest", "api",
+    "machine learning", "ml", "ai", "llm", "gpt", "openai", "langchain",
+    "tensorflow", "pytorch", "pandas", "numpy",
+]
+
+MENTIONS = [
+    "Python", "Go", "golang", "Node.js", "React", "k8s", "Kubernetes", "Postgres",
+    "AWS", "C++", "TypeScript", "Google Cloud", "Ruby on Rails", "ML", "Docker",
+]
+
+
+def legacy_hn(text: str) -> list[str]:
+    """HNHiringScraper.parse_tech_stack before the shared extractor"""
+    text_lower = text.lower()
+    return [tech for tech in HN_TECH_KEYWORDS if tech in text_lower]
+
+
+def legacy_indeed(text: str) -> list[str]:
+    """IndeedScraper._extract_tech_stack before the shared extractor"""
+    text_lower = text.lower()
+    found = []
+    for tech in INDEED_TECH_KEYWORDS:
+        if len(tech) <= 3:
+            if re.search(rf"\b{re.escape(tech)}\b", text_lower):
+                found.append(tech)
+        elif tech in text_lower:
+            found.append(tech)
+    return found
+
+
+def make_corpus(jobs: int, words: int, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(jobs):
+        text = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(2, 8)):
+            text.insert(rng.randrange(len(text)), rng.choice(MENTIONS))
+        corpus.append(("", " ".join(text)))
+    return corpus
+
+
+def main():
+    corpus = make_corpus(jobs=500, words=800)
+    extract = TechExtractor().extract
+
+    results = {}
+    for label, fn in [("hn substring", legacy_hn), ("indeed regexes", legacy_indeed), ("TechExtractor", extract)]:
+        results[label] = bench(lambda _title, description: fn(description), corpus)
+    chars = sum(len(d) for _, d in corpus) // len(corpus)
+    print(f"{len(corpus)} jobs, ~{chars} chars of description each")
+    for label, seconds in results.items():
+        print(f"{label:>15}: {seconds * 1e6:8.1f} us/job")
+
+
+if __name__ == "__main__":
+    main()
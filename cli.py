@@ -10,12 +10,89 @@ console = Console()
 def run(
     sources: str = typer.Option("hn_hiring,indeed", help="Comma-separated sources (hn_hiring,indeed,wellfound)"),
     dry_run: bool = typer.Option(False, "--dry-run", help="Preview without syncing"),
+    workers: int = typer.Option(None, help="Filter worker processes for large batches (default: CPU count)"),
+    explain: bool = typer.Option(False, "--explain", help="Trace filter decisions and print a summary"),
+    adaptive: bool = typer.Option(False, "--adaptive", help="Order filter stages by cost and selectivity from past runs"),
+    concurrency: int = typer.Option(1, help="Jobs synced to the CRM at once"),
+    sync: bool = typer.Option(True, help="Sync the outbox after scraping (--no-sync leaves it to `sync` workers)"),
 ):
     """Scrape and sync job leads"""
     from src.pipeline import run_pipeline
 
     source_list = [s.strip() for s in sources.split(",")]
-    run_pipeline(source_list, dry_run=dry_run)
+    stats = run_pipeline(
+        source_list,
+        dry_run=dry_run,
+        workers=workers,
+        explain=explain,
+        adaptive=adaptive,
+        concurrency=concurrency,
+        sync=sync,
+    )
+    if stats:
+        print_filter_stats(stats)
+
+
+@app.command()
+def sync(
+    concurrency: int = typer.Option(1, help="Jobs synced to the CRM at once"),
+    batch_size: int = typer.Option(50, help="Jobs leased from the outbox per batch"),
+    max_attempts: int = typer.Option(5, help="Failed attempts before a job is dead-lettered"),
+    retry_dead: bool = typer.Option(False, "--retry-dead", help="Requeue dead-lettered jobs first"),
+    batch_create: bool = typer.Option(
+        False, "--batch-create", help="Create each batch's Accounts, then its Opportunities, all at once"
+    ),
+):
+    """Sync the jobs waiting in the outbox to the CRM; several workers can run at once"""
+    from src.pipeline import db, drain_outbox, espo
+
+    if retry_dead:
+        console.print(f"Requeued {db.requeue_dead_syncs()} dead-lettered jobs.")
+    synced, failed = drain_outbox(
+        concurrency, batch_size=batch_size, max_attempts=max_attempts, batch_create=batch_create
+    )
+    console.print(f"Done: {synced} synced, {failed} failed")
+    console.print(f"EspoCRM: {espo.stats.summary()}")
+
+    dead = db.dead_syncs()
+    if dead:
+        table = Table(title=f"Dead-lettered ({len(dead)}), requeue with --retry-dead")
+        for column in ("Source", "Company", "Title", "Attempts", "Last error"):
+            table.add_column(column)
+        for row in dead:
+            table.add_row(row["source"], row["company_name"], row["title"], str(row["attempts"]), row["last_error"])
+        console.print(table)
+
+
+def print_filter_stats(stats):
+    from src.filters import CompiledFilter
+
+    table = Table(title=f"Filter Stages ({stats.jobs} jobs)")
+    table.add_column("Stage")
+    table.add_column("Rejected", justify="right")
+    table.add_column("Would Fail", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    for stage in CompiledFilter.STAGES:
+        table.add_row(
+            stage,
+            str(stats.rejections[stage]),
+            str(stats.failures[stage]),
+            f"{stats.stage_percentile(stage, 0.5) * 1000:.3f}",
+            f"{stats.stage_percentile(stage, 0.99) * 1000:.3f}",
+        )
+    console.print(table)
+
+    table = Table(title="Keyword Hits")
+    table.add_column("Keyword")
+    table.add_column("Jobs", justify="right")
+    for keyword, count in stats.keyword_hits.most_common(20):
+        table.add_row(keyword, str(count))
+    console.print(table)
+
+    dead = stats.dead_keywords()
+    if dead:
+        console.print(f"[dim]{len(dead)} keywords matched no jobs:[/dim] {', '.join(dead)}")
 
 
 @app.command()
@@ -25,27 +102,155 @@ def status():
 
     db = JobDatabase()
 
+    counts = db.job_counts()
     table = Table(title="Pipeline Status")
-    table.add_column("Metric")
-    table.add_column("Value")
+    table.add_column("Source")
+    for column in ("Total", "Synced", "Rejected", "Pending"):
+        table.add_column(column, justify="right")
+
+    totals = {"total": 0, "synced": 0, "rejected": 0, "pending": 0}
+    for src, row in counts.items():
+        table.add_row(src, *(str(row[key]) for key in totals))
+        for key in totals:
+            totals[key] += row[key]
+    table.add_row("All", *(str(value) for value in totals.values()), style="bold")
+    console.print(table)
+
+    outbox = db.outbox_counts()
+    console.print(
+        f"Sync outbox: {outbox['due']} due, {outbox['leased']} in progress, "
+        f"{outbox['waiting']} waiting to retry, {outbox['dead']} dead-lettered"
+    )
+
+    run = db.last_run()
+    if run:
+        rate = run["scraped"] / run["seconds"] if run["seconds"] else 0
+        console.print(
+            f"Last run {run['started_at'][:19]} ({run['sources']}): "
+            f"{run['scraped']} scraped, {run['new']} new, {run['rejected']} rejected, "
+            f"{run['synced']} synced, {run['failed']} failed in {run['seconds']:.1f}s "
+            f"({rate:.1f} jobs/s)"
+        )
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help='Words to find, e.g. "fastapi postgres"; OR, NOT and prefix* work too'),
+    source: str = typer.Option(None, help="Comma-separated sources to search"),
+    limit: int = typer.Option(20, help="Maximum results"),
+):
+    """Full-text search over stored jobs' titles, companies and descriptions"""
+    from rich.markup import escape
+    from src.db import JobDatabase
+
+    db = JobDatabase()
+    sources = [s.strip() for s in source.split(",")] if source else None
+    # Control characters can't occur in the markup-escaped text
+    results = db.search(query, sources=sources, limit=limit, highlight=("\x02", "\x03"))
+
+    table = Table(title=f"Search: {query} ({len(results)})")
+    table.add_column("Source")
+    table.add_column("Company")
+    table.add_column("Title")
+    table.add_column("Snippet")
+    for row in results:
+        snippet = escape(row["snippet"]).replace("\x02", "[bold yellow]").replace("\x03", "[/]")
+        table.add_row(row["source"], escape(row["company_name"]), escape(row["title"]), snippet)
+    console.print(table)
+
+
+@app.command()
+def refilter(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report changes without saving them"),
+):
+    """Re-apply config/filters.yaml to stored jobs without scraping"""
+    from src.pipeline import refilter_stored_jobs
+
+    newly_passing, newly_failing = refilter_stored_jobs(dry_run=dry_run)
+
+    for title, rows, show_reason in [
+        ("Newly Passing", newly_passing, False),
+        ("Newly Failing", newly_failing, True),
+    ]:
+        table = Table(title=f"{title} ({len(rows)})")
+        table.add_column("Source")
+        table.add_column("Company")
+        table.add_column("Title")
+        if show_reason:
+            table.add_column("Reason")
+        for row in rows:
+            cells = [row["source"], row["company_name"], row["title"]]
+            if show_reason:
+                cells.append(row["rejection_reason"])
+            table.add_row(*cells)
+        console.print(table)
 
-    total = len(list(db.db["jobs"].rows))
-    synced = len(list(db.db["jobs"].rows_where("synced_at is not null")))
-    pending = total - synced
+    if dry_run:
+        console.print("Dry run: no changes saved.")
 
-    # Count by source
-    by_source = {}
-    for job in db.db["jobs"].rows:
-        src = job.get("source", "unknown")
-        by_source[src] = by_source.get(src, 0) + 1
 
-    table.add_row("Total Jobs", str(total))
-    table.add_row("Synced", str(synced))
-    table.add_row("Pending", str(pending))
-    for src, count in sorted(by_source.items()):
-        table.add_row(f"  {src}", str(count))
+@app.command()
+def compress_data(
+    decompress: bool = typer.Option(False, "--decompress", help="Store job data as plain JSON again"),
+    train: bool = typer.Option(True, help="Train a fresh compression dictionary on the stored jobs first"),
+    vacuum: bool = typer.Option(False, "--vacuum", help="VACUUM afterwards to return freed pages to the OS"),
+):
+    """Re-encode the stored job data, compressed (set PIPELINE_DB_COMPRESS=1 for new rows) or plain"""
+    from src.db import JobDatabase
+
+    db = JobDatabase(compress=not decompress)
+    before = db.data_size()
+    if train and not decompress:
+        dict_id = db.train_data_dictionary()
+        if dict_id:
+            console.print(f"Trained dictionary {dict_id}")
+    rewritten = db.migrate_data()
+    after = db.data_size()
+    if vacuum:
+        db.db.vacuum()
+
+    console.print(
+        f"Rewrote {rewritten} jobs: data is {after / 1e6:.1f} MB, was {before / 1e6:.1f} MB"
+    )
+
+
+@app.command()
+def compact(
+    days: int = typer.Option(None, help="Retention in days for sources without their own (default: keep forever)"),
+    source_days: str = typer.Option("", help="Per-source retention, e.g. indeed=90,hn_hiring=365"),
+    archive_dir: str = typer.Option("data/archive", help="Directory for the gzipped JSONL archive"),
+    archive: bool = typer.Option(True, help="Archive removed jobs before deleting them"),
+):
+    """Archive and delete old synced and rejected jobs, then reclaim disk space"""
+    import os
+    from datetime import datetime
+    from src.db import JobDatabase
+
+    retention = {}
+    for item in filter(None, (part.strip() for part in source_days.split(","))):
+        name, _, value = item.partition("=")
+        retention[name.strip()] = int(value)
+
+    archive_path = None
+    if archive:
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.join(archive_dir, f"jobs-{datetime.now():%Y%m%d-%H%M%S}.jsonl.gz")
+
+    db = JobDatabase()
+    size_before = os.path.getsize(db.path)
+    removed = db.compact(retention, days, archive_path)
+    db.reclaim_space()
+    size_after = os.path.getsize(db.path)
 
+    table = Table(title="Compacted")
+    table.add_column("Source")
+    table.add_column("Removed", justify="right")
+    for src, count in sorted(removed.items()):
+        table.add_row(src, str(count))
     console.print(table)
+    if archive_path and any(removed.values()):
+        console.print(f"Archived to {archive_path}")
+    console.print(f"Database: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
 
 
 @app.command()
@@ -58,12 +263,10 @@ def clear_cache(
 
     db = JobDatabase()
 
+    count = db.count_jobs(source)
     if source:
-        jobs = list(db.db["jobs"].rows_where("source = ?", [source]))
-        count = len(jobs)
         target = f"{count} jobs from '{source}'"
     else:
-        count = len(list(db.db["jobs"].rows))
         target = f"all {count} jobs"
 
     if count == 0:
@@ -0,0 +1,93 @@
+import re
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from src.db import JobDatabase
+
+# Cached account IDs older than this are looked up again, in case the
+# Account was merged or deleted in the CRM
+DEFAULT_TTL = timedelta(days=30)
+
+_PUNCTUATION = re.compile(r"[.,'\"]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_company_name(name: str) -> str:
+    """Key for a company name: case, punctuation and spacing differences
+    ("Acme, Inc." vs "acme inc") don't matter"""
+    return _SPACES.sub(" ", _PUNCTUATION.sub("", name.casefold())).strip()
+
+
+class AccountCache:
+    """Company name -> CRM account ID, in memory for a run and persisted in
+    the pipeline DB (seeded from the account IDs of already synced jobs).
+
+    After prefetch() the cache holds every account in the CRM, so a miss means
+    the company has no account yet and needs no lookup.
+    """
+
+    def __init__(self, db: "JobDatabase", ttl: timedelta = DEFAULT_TTL):
+        self.db = db
+        self.ttl = ttl
+        self._entries: dict[str, tuple[str, datetime]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.prefetched = False
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            row = self.db.get_cached_account(key)
+            if row:
+                entry = (row["account_id"], datetime.fromisoformat(row["cached_at"]))
+                self._entries[key] = entry
+        if entry is None or datetime.now() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def get(self, company_name: str) -> Optional[str]:
+        account_id = self._lookup(normalize_company_name(company_name))
+        if account_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return account_id
+
+    def missing(self, company_names: Iterable[str]) -> set[str]:
+        """Normalized names among company_names with no fresh entry (not
+        counted as hits or misses)"""
+        keys = {normalize_company_name(name) for name in company_names}
+        return {key for key in keys if self._lookup(key) is None}
+
+    def prefetch(self, accounts: Iterable[dict]) -> int:
+        """Replace the cache with the CRM's accounts ({"id", "name"} dicts,
+        oldest first so the oldest of same-named accounts wins, as with an
+        equals lookup); returns how many were loaded"""
+        now = datetime.now()
+        entries: dict[str, tuple[str, str]] = {}
+        for account in accounts:
+            entries.setdefault(normalize_company_name(account["name"]), (account["id"], account["name"]))
+        self.db.replace_cached_accounts(
+            (key, name, account_id, now.isoformat()) for key, (account_id, name) in entries.items()
+        )
+        self._entries = {key: (account_id, now) for key, (account_id, _) in entries.items()}
+        self.prefetched = True
+        return len(entries)
+
+    def put(self, company_name: str, account_id: str):
+        key = normalize_company_name(company_name)
+        now = datetime.now()
+        self._entries[key] = (account_id, now)
+        self.db.cache_account(key, company_name, account_id, now.isoformat())
+
+    def invalidate(self, company_name: str):
+        """Forget a company's account, e.g. after the CRM said it no longer exists"""
+        key = normalize_company_name(company_name)
+        self._entries.pop(key, None)
+        self.db.forget_cached_account(key)
+        self.invalidations += 1
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.invalidations} invalidated"
@@ -0,0 +1,68 @@
+"""Compact encoding for the jobs.data column.
+
+Encoded values are BLOBs: MAGIC, a 4-byte big-endian dictionary id (0 for
+none) and a raw deflate stream. Plain TEXT values are left as they are, so
+compressed and uncompressed rows can live side by side.
+"""
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Iterable, Optional, Union
+
+MAGIC = b"JZ"
+_HEADER = struct.Struct(">2sI")
+
+# zlib can only refer back 32KB, so a larger dictionary would be wasted
+MAX_DICT_SIZE = 32 * 1024
+
+# Sentences, JSON punctuation and all, are the units of shared boilerplate
+_FRAGMENT = re.compile(r"[^.!?\n]*[.!?\n]?")
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICT_SIZE) -> bytes:
+    """Build a zlib preset dictionary from the fragments most often repeated
+    across samples (company blurbs, benefits, EEO statements, JSON keys)"""
+    counts = Counter()
+    for sample in samples:
+        counts.update({f for f in _FRAGMENT.findall(sample) if len(f) > 8})
+    ranked = sorted(
+        (f for f, n in counts.items() if n > 1), key=lambda f: counts[f] * len(f), reverse=True
+    )
+    chosen = []
+    used = 0
+    for fragment in ranked:
+        encoded = fragment.encode()
+        if used + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        used += len(encoded)
+    # Matches near the end of the dictionary take the fewest bits, so the most
+    # valuable fragments go last
+    return b"".join(reversed(chosen))
+
+
+def encode(text: str, zdict: Optional[bytes] = None, dict_id: int = 0) -> bytes:
+    if zdict:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return _HEADER.pack(MAGIC, dict_id) + compressor.compress(text.encode()) + compressor.flush()
+
+
+def dict_id_of(value: Union[str, bytes]) -> Optional[int]:
+    """The dictionary id an encoded value needs, or None for plain text"""
+    if isinstance(value, bytes) and value[:2] == MAGIC:
+        return _HEADER.unpack_from(value)[1]
+    return None
+
+
+def decode(value: Union[str, bytes], zdict: Optional[bytes] = None) -> str:
+    """Text of a jobs.data value, whether encoded or plain"""
+    if dict_id_of(value) is None:
+        return value
+    if zdict:
+        decompressor = zlib.decompressobj(-15, zdict=zdict)
+    else:
+        decompressor = zlib.decompressobj(-15)
+    return (decompressor.decompress(value[_HEADER.size :]) + decompressor.flush()).decode()
@@ -1,57 +1,321 @@
+import gzip
+import json
+from itertools import islice
 import sqlite_utils
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Union
 from src.models import JobPost
+from src import compression, migrations
+
+# Weight of earlier runs in the stored stage stats, so the order adapts to
+# changes in the job mix
+STAGE_STATS_DECAY = 0.8
+
+# Stay well under SQLite's limit on bound parameters per statement
+MAX_QUERY_PARAMS = 500
+
+
+def _chunked(items: list, size: int = MAX_QUERY_PARAMS):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+# Rows per INSERT/UPDATE batch in the bulk writers
+WRITE_CHUNK_SIZE = 500
+
+
+def _fts_query(text: str) -> str:
+    """Quote each word of a user query for FTS5 so "node.js" or "c++" are not
+    read as syntax, keeping OR/NOT/AND operators and trailing * prefixes.
+
+    Operators need a term on both sides, so leading, trailing and repeated
+    ones are dropped, as are words that are nothing but *; the result is
+    empty if no term is left.
+    """
+    terms = []
+    for word in text.split():
+        if word in ("AND", "OR", "NOT"):
+            if terms and terms[-1] not in ("AND", "OR", "NOT"):
+                terms.append(word)
+            continue
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    if terms and terms[-1] in ("AND", "OR", "NOT"):
+        terms.pop()
+    return " ".join(terms)
 
 
 class JobDatabase:
-    def __init__(self, db_path: str = "data/pipeline.db"):
+    def __init__(
+        self,
+        db_path: str = "data/pipeline.db",
+        decision_cache_size: int = 100_000,
+        wal: bool = False,
+        compress: bool = False,
+    ):
+        self.path = db_path
         self.db = sqlite_utils.Database(db_path)
+        # New rows get their data column zlib-compressed with the latest
+        # trained dictionary; readers decode either form
+        self.compress = compress
+        self._zdicts: dict[int, bytes] = {}
+        self._write_dict_id: Optional[int] = None
+        self.db.execute("PRAGMA recursive_triggers = ON")
+        # jobs_fts reads the descriptions it indexes out of jobs.data with this
+        self.db.conn.create_function("job_description", 1, self._job_description, deterministic=True)
+        self.decision_cache_size = decision_cache_size
+        if wal:
+            # WAL with synchronous=NORMAL fsyncs at checkpoints instead of on
+            # every commit; a power loss can drop the last commits but never
+            # corrupts the file
+            self.db.enable_wal()
+            self.db.execute("PRAGMA synchronous=NORMAL")
         self._init_tables()
 
     def _init_tables(self):
-        if "jobs" not in self.db.table_names():
-            self.db["jobs"].create(
+        migrations.migrate(self)
+
+    @property
+    def schema_version(self) -> int:
+        return migrations.schema_version(self)
+
+    def _job_row(
+        self,
+        job: JobPost,
+        rejected_stage: Optional[str] = None,
+        rejection_reason: Optional[str] = None,
+        filter_hash: Optional[str] = None,
+    ) -> dict:
+        return {
+            "source": job.source,
+            "source_id": job.source_id,
+            "source_url": job.source_url,
+            "company_name": job.company_name,
+            "title": job.title,
+            "data": self._encode_data(job.model_dump_json()),
+            "scraped_at": datetime.now().isoformat(),
+            "synced_at": None,
+            "account_id": None,
+            "contact_id": None,
+            "rejected_stage": rejected_stage,
+            "rejection_reason": rejection_reason,
+            "filter_hash": filter_hash,
+        }
+
+    def save_job(
+        self,
+        job: JobPost,
+        rejected_stage: Optional[str] = None,
+        rejection_reason: Optional[str] = None,
+        filter_hash: Optional[str] = None,
+    ):
+        """Store a scraped job; rejected jobs are kept too, with the reason"""
+        self.save_jobs(
+            [
                 {
-                    "source": str,
-                    "source_id": str,
-                    "source_url": str,
-                    "company_name": str,
-                    "title": str,
-                    "data": str,  # JSON
-                    "scraped_at": str,
-                    "synced_at": str,
-                    "account_id": str,
-                    "contact_id": str,
-                },
-                pk=["source", "source_id"],
+                    "job": job,
+                    "rejected_stage": rejected_stage,
+                    "rejection_reason": rejection_reason,
+                    "filter_hash": filter_hash,
+                }
+            ]
+        )
+
+    def save_jobs(self, entries: Iterable[dict]):
+        """Store many jobs in one transaction.
+
+        Each entry holds save_job's arguments: "job" and optionally
+        "rejected_stage", "rejection_reason" and "filter_hash". Either all of
+        them are written or, if anything fails, none are. Jobs already synced
+        to the CRM are left as they are: a fresh row would queue them for a
+        second Opportunity.
+        """
+        entries = iter(entries)
+        with self.db.atomic():
+            while chunk := list(islice(entries, WRITE_CHUNK_SIZE)):
+                synced = self._synced_keys([(entry["job"].source, entry["job"].source_id) for entry in chunk])
+                chunk = [entry for entry in chunk if (entry["job"].source, entry["job"].source_id) not in synced]
+                self.db["jobs"].insert_all(
+                    [self._job_row(**entry) for entry in chunk], replace=True
+                )
+                self._index_jobs([entry["job"] for entry in chunk])
+
+    def _synced_keys(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """The (source, source_id) keys among keys that are already synced"""
+        found = set()
+        for chunk in _chunked(list(dict.fromkeys(keys)), MAX_QUERY_PARAMS // 2):
+            values = ", ".join(["(?, ?)"] * len(chunk))
+            rows = self.db.execute(
+                f"SELECT source, source_id FROM jobs WHERE synced_at IS NOT NULL "
+                f"AND (source, source_id) IN (VALUES {values})",
+                [part for key in chunk for part in key],
             )
+            found.update(tuple(row) for row in rows)
+        return found
 
-    def save_job(self, job: JobPost):
-        self.db["jobs"].insert(
-            {
-                "source": job.source,
-                "source_id": job.source_id,
-                "source_url": job.source_url,
-                "company_name": job.company_name,
-                "title": job.title,
-                "data": job.model_dump_json(),
-                "scraped_at": datetime.now().isoformat(),
-                "synced_at": None,
-                "account_id": None,
-                "contact_id": None,
-            },
-            replace=True,
+    def _index_jobs(self, jobs: list[JobPost]):
+        """Add just-saved jobs to jobs_fts under their new rowids"""
+        by_key = {(job.source, job.source_id): job for job in jobs}
+        keys = list(by_key)
+        for chunk in _chunked(keys, MAX_QUERY_PARAMS // 2):
+            values = ", ".join(["(?, ?)"] * len(chunk))
+            rows = self.db.execute(
+                f"SELECT rowid, source, source_id FROM jobs WHERE (source, source_id) IN (VALUES {values})",
+                [part for key in chunk for part in key],
+            ).fetchall()
+            self.db.conn.executemany(
+                "INSERT INTO jobs_fts (rowid, title, company_name, description) VALUES (?, ?, ?, ?)",
+                [
+                    (rowid, job.title, job.company_name, job.description)
+                    for rowid, source, source_id in rows
+                    for job in [by_key[(source, source_id)]]
+                ],
+            )
+
+    def search(
+        self,
+        query: str,
+        sources: Optional[list[str]] = None,
+        limit: int = 20,
+        highlight: tuple[str, str] = ("[", "]"),
+    ) -> list[dict]:
+        """Stored jobs matching a full-text query, best match first.
+
+        Every word must occur in the title, company or description; OR, NOT
+        and a trailing * for prefixes work as in FTS5. Each result has a
+        snippet of the best-matching column with the hits wrapped in highlight.
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+        where = "jobs_fts MATCH ?"
+        params: list = [*highlight, match]
+        if sources:
+            where += f" AND jobs.source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        rows = self.db.execute(
+            f"""
+            SELECT jobs.source, jobs.source_id, jobs.source_url, jobs.company_name, jobs.title,
+                   snippet(jobs_fts, -1, ?, ?, '…', 16) AS snippet, bm25(jobs_fts) AS rank
+            FROM jobs_fts JOIN jobs ON jobs.rowid = jobs_fts.rowid
+            WHERE {where}
+            ORDER BY rank LIMIT ?
+            """,
+            [*params, limit],
         )
+        columns = [d[0] for d in rows.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _zdict(self, dict_id: int) -> bytes:
+        if dict_id not in self._zdicts:
+            self._zdicts[dict_id] = self.db["data_dicts"].get(dict_id)["zdict"]
+        return self._zdicts[dict_id]
+
+    def _latest_dict_id(self) -> int:
+        row = self.db.execute("SELECT MAX(id) FROM data_dicts").fetchone()
+        return row[0] or 0
+
+    def _encode_data(self, text: str, dict_id: Optional[int] = None):
+        if not self.compress:
+            return text
+        if dict_id is None:
+            if self._write_dict_id is None:
+                self._write_dict_id = self._latest_dict_id()
+            dict_id = self._write_dict_id
+        return compression.encode(text, self._zdict(dict_id) if dict_id else None, dict_id)
+
+    def decode_data(self, value) -> str:
+        """The JSON text of a jobs.data value, compressed or not"""
+        dict_id = compression.dict_id_of(value)
+        return compression.decode(value, self._zdict(dict_id) if dict_id else None)
+
+    def _job_description(self, data) -> str:
+        return json.loads(self.decode_data(data)).get("description", "")
+
+    def _decode_row(self, row: dict) -> dict:
+        row["data"] = self.decode_data(row["data"])
+        return row
+
+    def train_data_dictionary(self, sample_size: int = 2000) -> Optional[int]:
+        """Train a compression dictionary on a sample of stored jobs and make
+        it the one new rows use; returns its id, or None with nothing to learn from"""
+        rows = self.db.execute("SELECT data FROM jobs ORDER BY random() LIMIT ?", [sample_size])
+        zdict = compression.train_dictionary(self.decode_data(row[0]) for row in rows)
+        if not zdict:
+            return None
+        dict_id = self._latest_dict_id() + 1
+        self.db["data_dicts"].insert(
+            {"id": dict_id, "zdict": zdict, "created_at": datetime.now().isoformat()}
+        )
+        self._write_dict_id = dict_id
+        return dict_id
+
+    def migrate_data(self) -> int:
+        """Re-encode stored data in the current format: compressed with the
+        latest dictionary if compress is set, plain JSON text otherwise.
+
+        Works through the table in rowid order, one transaction per chunk, so
+        it can be interrupted and rerun. Returns the number of rows rewritten.
+        """
+        target_id = self._latest_dict_id() if self.compress else None
+        rewritten = 0
+        last_rowid = 0
+        while True:
+            rows = self.db.execute(
+                "SELECT rowid, data FROM jobs WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                [last_rowid, WRITE_CHUNK_SIZE],
+            ).fetchall()
+            if not rows:
+                return rewritten
+            last_rowid = rows[-1][0]
+            updates = [
+                (self._encode_data(self.decode_data(data), target_id), rowid)
+                for rowid, data in rows
+                if compression.dict_id_of(data) != target_id
+            ]
+            with self.db.atomic():
+                self.db.conn.executemany("UPDATE jobs SET data = ? WHERE rowid = ?", updates)
+            rewritten += len(updates)
+
+    def data_size(self) -> int:
+        """Bytes stored in the jobs.data column"""
+        row = self.db.execute("SELECT SUM(length(CAST(data AS BLOB))) FROM jobs").fetchone()
+        return row[0] or 0
 
     def get_job(self, source: str, source_id: str) -> Optional[dict]:
         try:
-            return self.db["jobs"].get((source, source_id))
-        except:
+            return self._decode_row(self.db["jobs"].get((source, source_id)))
+        except sqlite_utils.db.NotFoundError:
             return None
 
     def is_duplicate(self, job: JobPost) -> bool:
-        return self.get_job(job.source, job.source_id) is not None
+        """True if the job is already stored and was accepted by the filters
+        or synced, or was archived by compact()"""
+        return bool(self.existing_keys(job.source, [job.source_id]))
+
+    def existing_keys(
+        self, source: str, source_ids: Iterable[str], include_rejected: bool = False
+    ) -> set[str]:
+        """The source_ids already stored for source, in a few IN (...) queries.
+
+        Like is_duplicate, only jobs accepted by the filters or already synced
+        (including those archived by compact()) count unless include_rejected
+        is set. A synced job counts even if a later refilter rejected it, so a
+        rescrape never queues it again.
+        """
+        condition = "" if include_rejected else " AND (rejection_reason IS NULL OR synced_at IS NOT NULL)"
+        found = set()
+        for chunk in _chunked(list(dict.fromkeys(source_ids))):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.db.execute(
+                f"SELECT source_id FROM jobs WHERE source = ? AND source_id IN ({placeholders}){condition} "
+                f"UNION SELECT source_id FROM archived_keys WHERE source = ? AND source_id IN ({placeholders})",
+                [source, *chunk, source, *chunk],
+            )
+            found.update(row[0] for row in rows)
+        return found
 
     def mark_synced(self, source: str, source_id: str, account_id: str, contact_id: str):
         self.db["jobs"].update(
@@ -63,5 +327,428 @@ class JobDatabase:
             },
         )
 
+    def mark_synced_many(self, rows: Iterable[dict], owner: Optional[str] = None):
+        """mark_synced for many jobs in one transaction; rows hold source,
+        source_id, account_id and contact_id. With owner, only jobs whose
+        sync outbox row is still leased to owner are marked."""
+        now = datetime.now().isoformat()
+        condition = ""
+        owned = []
+        if owner:
+            condition = (
+                " AND EXISTS (SELECT 1 FROM sync_outbox o WHERE o.source = jobs.source "
+                "AND o.source_id = jobs.source_id AND o.lease_owner = ?)"
+            )
+            owned = [owner]
+        params = (
+            (now, row["account_id"], row["contact_id"], row["source"], row["source_id"], *owned)
+            for row in rows
+        )
+        with self.db.atomic():
+            while chunk := list(islice(params, WRITE_CHUNK_SIZE)):
+                self.db.conn.executemany(
+                    "UPDATE jobs SET synced_at = ?, account_id = ?, contact_id = ? "
+                    f"WHERE source = ? AND source_id = ?{condition}",
+                    chunk,
+                )
+
     def get_unsynced_jobs(self) -> list[dict]:
-        return list(self.db["jobs"].rows_where("synced_at is null"))
+        return [
+            self._decode_row(row)
+            for row in self.db["jobs"].rows_where("synced_at is null and rejection_reason is null")
+        ]
+
+    def job_counts(self) -> dict[str, dict[str, int]]:
+        """Jobs per source by state (total, synced, rejected, pending), counted in SQL"""
+        rows = self.db.execute(
+            """
+            SELECT source,
+                   COUNT(*),
+                   COUNT(synced_at),
+                   SUM(synced_at IS NULL AND rejection_reason IS NOT NULL)
+            FROM jobs GROUP BY source ORDER BY source
+            """
+        )
+        return {
+            source: {
+                "total": total,
+                "synced": synced,
+                "rejected": rejected,
+                "pending": total - synced - rejected,
+            }
+            for source, total, synced, rejected in rows
+        }
+
+    def count_jobs(self, source: Optional[str] = None) -> int:
+        if source is None:
+            return self.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM jobs WHERE source = ?", [source]).fetchone()[0]
+
+    def record_run(self, run: dict):
+        """Store a pipeline run's counts (started_at, sources, seconds, scraped,
+        new, rejected, synced, failed)"""
+        self.db["runs"].insert(run)
+
+    def last_run(self) -> Optional[dict]:
+        rows = list(self.db["runs"].rows_where(order_by="id desc", limit=1))
+        return rows[0] if rows else None
+
+    def _iter_where(self, where: str, params: list, batch_size: int) -> Iterator[JobPost]:
+        """Jobs matching where in primary-key order, fetched batch_size at a
+        time by keyset pagination so memory stays flat however many match"""
+        last_key = ("", "")
+        while True:
+            rows = self.db.execute(
+                f"SELECT source, source_id, data FROM jobs WHERE ({where}) AND (source, source_id) > (?, ?) "
+                "ORDER BY source, source_id LIMIT ?",
+                [*params, *last_key, batch_size],
+            ).fetchall()
+            for _, _, data in rows:
+                yield JobPost.model_validate_json(self.decode_data(data))
+            if len(rows) < batch_size:
+                return
+            last_key = rows[-1][:2]
+
+    def iter_unsynced(self, batch_size: int = 500) -> Iterator[JobPost]:
+        """Accepted jobs not yet synced to the CRM, streamed in batches"""
+        return self._iter_where("synced_at IS NULL AND rejection_reason IS NULL", [], batch_size)
+
+    def iter_jobs(
+        self,
+        source: Optional[str] = None,
+        since: Union[datetime, str, None] = None,
+        include_rejected: bool = True,
+        batch_size: int = 500,
+    ) -> Iterator[JobPost]:
+        """Stored jobs, optionally only from source or scraped at or after since,
+        streamed in batches"""
+        conditions = ["1"]
+        params = []
+        if source is not None:
+            conditions.append("source = ?")
+            params.append(source)
+        if since is not None:
+            conditions.append("scraped_at >= ?")
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if not include_rejected:
+            conditions.append("rejection_reason IS NULL")
+        return self._iter_where(" AND ".join(conditions), params, batch_size)
+
+    def compact(
+        self,
+        retention_days: dict[str, int],
+        default_days: Optional[int],
+        archive_path: Optional[str],
+        batch_size: int = WRITE_CHUNK_SIZE,
+    ) -> dict[str, int]:
+        """Archive and delete jobs past their source's retention period.
+
+        A synced job expires retention_days[source] (or default_days; None
+        keeps the source forever) after it was synced, a rejected one after it
+        was scraped. Accepted jobs still waiting to be synced are kept. Expired
+        rows are appended to a gzipped JSONL file at archive_path (skipped if
+        None) and deleted in batches of batch_size, one transaction each; the
+        keys of synced ones go to archived_keys so they stay duplicates.
+        Returns the number of jobs removed per source.
+        """
+        now = datetime.now()
+        sources = [row[0] for row in self.db.execute("SELECT DISTINCT source FROM jobs")]
+        removed = {}
+        archive = None
+        try:
+            for source in sources:
+                days = retention_days.get(source, default_days)
+                if days is None:
+                    continue
+                cutoff = (now - timedelta(days=days)).isoformat()
+                where = (
+                    "source = ? AND ((synced_at IS NOT NULL AND synced_at < ?) "
+                    "OR (synced_at IS NULL AND rejection_reason IS NOT NULL AND scraped_at < ?))"
+                )
+                removed[source] = 0
+                while rows := list(
+                    self.db["jobs"].rows_where(where, [source, cutoff, cutoff], limit=batch_size)
+                ):
+                    if archive_path:
+                        archive = archive or gzip.open(archive_path, "at", encoding="utf-8")
+                        for row in rows:
+                            record = {**row, "data": json.loads(self.decode_data(row["data"]))}
+                            archive.write(json.dumps(record) + "\n")
+                        archive.flush()
+                    keys = [(row["source"], row["source_id"]) for row in rows]
+                    archived = [
+                        {"source": source, "source_id": row["source_id"], "archived_at": now.isoformat()}
+                        for row in rows
+                        if row["synced_at"] is not None
+                    ]
+                    with self.db.atomic():
+                        self.db["archived_keys"].insert_all(archived, replace=True)
+                        self.db.conn.executemany("DELETE FROM jobs WHERE source = ? AND source_id = ?", keys)
+                    removed[source] += len(rows)
+        finally:
+            if archive:
+                archive.close()
+        return removed
+
+    def reclaim_space(self):
+        """Return free pages to the OS and refresh query planner statistics.
+
+        The first call switches the file to incremental auto-vacuum, which
+        needs one full VACUUM; later calls only free the unused pages.
+        """
+        if self.db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self.db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.db.vacuum()
+        else:
+            # Each step of the pragma frees one page, so run it to completion
+            self.db.execute("PRAGMA incremental_vacuum").fetchall()
+        self.db.analyze()
+
+    def get_cached_account(self, name_key: str) -> Optional[dict]:
+        rows = list(self.db["account_cache"].rows_where("name_key = ?", [name_key]))
+        return rows[0] if rows else None
+
+    def cache_account(self, name_key: str, company_name: str, account_id: str, cached_at: str):
+        self.db["account_cache"].insert(
+            {"name_key": name_key, "company_name": company_name, "account_id": account_id, "cached_at": cached_at},
+            replace=True,
+        )
+
+    def replace_cached_accounts(self, rows: Iterable[tuple[str, str, str, str]]):
+        """Replace the whole account cache with (name_key, company_name,
+        account_id, cached_at) rows"""
+        columns = ("name_key", "company_name", "account_id", "cached_at")
+        with self.db.atomic():
+            self.db.execute("DELETE FROM account_cache")
+            self.db["account_cache"].insert_all(
+                (dict(zip(columns, row)) for row in rows), replace=True, batch_size=WRITE_CHUNK_SIZE
+            )
+
+    def forget_cached_account(self, name_key: str):
+        self.db.execute("DELETE FROM account_cache WHERE name_key = ?", [name_key])
+
+    def claim_sync_batch(self, owner: str, limit: int, lease_seconds: float) -> list[JobPost]:
+        """Lease up to limit jobs from the sync outbox to owner, oldest first.
+
+        Only rows that are due, not dead and not leased by a live worker are
+        taken, in a single UPDATE, so concurrent workers never get the same
+        job. A worker that dies loses its leases after lease_seconds.
+        """
+        now = datetime.now()
+        # db.execute only auto-commits statements that return no rows, so an
+        # UPDATE ... RETURNING needs its own transaction to be committed
+        with self.db.atomic():
+            keys = self.db.execute(
+                "UPDATE sync_outbox SET lease_owner = ?, lease_until = ? WHERE rowid IN ("
+                "SELECT rowid FROM sync_outbox WHERE dead_at IS NULL "
+                "AND (available_at IS NULL OR available_at <= ?) AND (lease_until IS NULL OR lease_until <= ?) "
+                "ORDER BY enqueued_at, rowid LIMIT ?) RETURNING source, source_id",
+                [owner, (now + timedelta(seconds=lease_seconds)).isoformat(), now.isoformat(), now.isoformat(), limit],
+            ).fetchall()
+        jobs = []
+        for chunk in _chunked(keys, MAX_QUERY_PARAMS // 2):
+            values = ", ".join(["(?, ?)"] * len(chunk))
+            rows = self.db.execute(
+                f"SELECT data FROM jobs WHERE (source, source_id) IN (VALUES {values})",
+                [part for key in chunk for part in key],
+            )
+            jobs.extend(JobPost.model_validate_json(self.decode_data(data)) for (data,) in rows)
+        return jobs
+
+    def renew_sync_leases(
+        self, owner: str, keys: Iterable[tuple[str, str]], lease_seconds: float
+    ) -> set[tuple[str, str]]:
+        """Extend owner's leases on keys, (source, source_id) pairs, to
+        lease_seconds from now; returns the keys owner still holds. A lease
+        that expired and was claimed by another worker is not taken back."""
+        lease_until = (datetime.now() + timedelta(seconds=lease_seconds)).isoformat()
+        held = set()
+        with self.db.atomic():  # see claim_sync_batch
+            for chunk in _chunked(list(dict.fromkeys(keys)), MAX_QUERY_PARAMS // 2 - 1):
+                values = ", ".join(["(?, ?)"] * len(chunk))
+                rows = self.db.execute(
+                    f"UPDATE sync_outbox SET lease_until = ? WHERE lease_owner = ? "
+                    f"AND (source, source_id) IN (VALUES {values}) RETURNING source, source_id",
+                    [lease_until, owner, *(part for key in chunk for part in key)],
+                ).fetchall()
+                held.update(tuple(row) for row in rows)
+        return held
+
+    def record_sync_failures(
+        self, failures: Iterable[dict], max_attempts: int, retry_delay: float, owner: Optional[str] = None
+    ):
+        """Count a failed attempt for each of failures (source, source_id,
+        error) and release its lease. The job is retried after retry_delay
+        seconds, doubling with each attempt, and dead-lettered once it has
+        failed max_attempts times. With owner, jobs whose lease passed to
+        another worker are left to it."""
+        now = datetime.now()
+        condition = " AND lease_owner = ?" if owner else ""
+        owned = [owner] if owner else []
+        with self.db.atomic():
+            for failure in failures:
+                key = [failure["source"], failure["source_id"]]
+                row = self.db.execute(
+                    f"SELECT attempts FROM sync_outbox WHERE source = ? AND source_id = ?{condition}", [*key, *owned]
+                ).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                dead = attempts >= max_attempts
+                available_at = now + timedelta(seconds=retry_delay * 2 ** (attempts - 1))
+                self.db.execute(
+                    "UPDATE sync_outbox SET attempts = ?, last_error = ?, available_at = ?, dead_at = ?, "
+                    "lease_owner = NULL, lease_until = NULL WHERE source = ? AND source_id = ?",
+                    [attempts, failure["error"], available_at.isoformat(), now.isoformat() if dead else None, *key],
+                )
+
+    def release_sync_leases(self, owner: str):
+        """Give back owner's leased rows at once, e.g. when a worker stops early"""
+        self.db.execute(
+            "UPDATE sync_outbox SET lease_owner = NULL, lease_until = NULL WHERE lease_owner = ?", [owner]
+        )
+
+    def requeue_dead_syncs(self) -> int:
+        """Put dead-lettered jobs back in the queue with their attempts reset"""
+        cursor = self.db.execute(
+            "UPDATE sync_outbox SET dead_at = NULL, attempts = 0, available_at = NULL WHERE dead_at IS NOT NULL"
+        )
+        return cursor.rowcount
+
+    def dead_syncs(self) -> list[dict]:
+        """Dead-lettered jobs with their attempts and last error"""
+        cursor = self.db.execute(
+            "SELECT o.source, o.source_id, j.company_name, j.title, o.attempts, o.last_error, o.dead_at "
+            "FROM sync_outbox o JOIN jobs j USING (source, source_id) "
+            "WHERE o.dead_at IS NOT NULL ORDER BY o.dead_at"
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def outbox_counts(self) -> dict[str, int]:
+        """Sync outbox rows by state: due, leased, backing off and dead"""
+        now = datetime.now().isoformat()
+        due, leased, waiting, dead = self.db.execute(
+            """
+            SELECT COALESCE(SUM(dead_at IS NULL AND lease_free AND (available_at IS NULL OR available_at <= :now)), 0),
+                   COALESCE(SUM(dead_at IS NULL AND NOT lease_free), 0),
+                   COALESCE(SUM(dead_at IS NULL AND lease_free AND available_at > :now), 0),
+                   COUNT(dead_at)
+            FROM (SELECT *, (lease_until IS NULL OR lease_until <= :now) AS lease_free FROM sync_outbox)
+            """,
+            {"now": now},
+        ).fetchone()
+        return {"due": due, "leased": leased, "waiting": waiting, "dead": dead}
+
+    def outbox_company_names(self) -> list[str]:
+        """Companies of the jobs waiting in the sync outbox"""
+        rows = self.db.execute(
+            "SELECT DISTINCT j.company_name FROM sync_outbox o JOIN jobs j USING (source, source_id) "
+            "WHERE o.dead_at IS NULL"
+        )
+        return [row[0] for row in rows]
+
+    def save_filter_config(self, config_hash: str, config: dict):
+        """Remember a filter config so later edits can be diffed against it"""
+        self.db["filter_configs"].insert(
+            {"hash": config_hash, "config": json.dumps(config), "created_at": datetime.now().isoformat()},
+            ignore=True,
+        )
+
+    def get_filter_config(self, config_hash: str) -> Optional[dict]:
+        rows = list(self.db["filter_configs"].rows_where("hash = ?", [config_hash]))
+        return json.loads(rows[0]["config"]) if rows else None
+
+    def filter_hashes(self) -> list[Optional[str]]:
+        """Distinct filter configs the stored jobs were last evaluated with"""
+        return [row[0] for row in self.db.execute("SELECT DISTINCT filter_hash FROM jobs")]
+
+    def jobs_to_refilter(
+        self, filter_hash: Optional[str], recheck_passing: bool, recheck_stages: set[str]
+    ) -> list[dict]:
+        """Unsynced jobs evaluated with filter_hash whose decision may change.
+
+        A synced job already has its Opportunity, so its decision is final.
+        """
+        conditions = []
+        params = []
+        if recheck_passing:
+            conditions.append("rejection_reason is null")
+        if recheck_stages:
+            conditions.append(f"rejected_stage in ({', '.join('?' * len(recheck_stages))})")
+            params.extend(sorted(recheck_stages))
+        if not conditions:
+            return []
+        where = f"filter_hash is ? and synced_at is null and ({' or '.join(conditions)})"
+        return [self._decode_row(row) for row in self.db["jobs"].rows_where(where, [filter_hash, *params])]
+
+    def update_filter_results(self, results: list[dict], filter_hash: str):
+        """Record new decisions (source, source_id, rejected_stage, rejection_reason)"""
+        with self.db.atomic():
+            for result in results:
+                self.db["jobs"].update(
+                    (result["source"], result["source_id"]),
+                    {
+                        "rejected_stage": result["rejected_stage"],
+                        "rejection_reason": result["rejection_reason"],
+                        "filter_hash": filter_hash,
+                    },
+                )
+
+    def retag_filter_hash(self, old_hash: Optional[str], new_hash: str):
+        """Mark jobs whose decisions still hold as evaluated with new_hash"""
+        self.db.execute("UPDATE jobs SET filter_hash = ? WHERE filter_hash is ?", [new_hash, old_hash])
+
+    def get_filter_decisions(self, source: str, source_ids: list[str]) -> dict[str, dict]:
+        """Cached filter decisions for these jobs, keyed by source_id.
+
+        Marks the returned entries as recently used for LRU eviction.
+        """
+        decisions = {}
+        now = datetime.now().isoformat()
+        with self.db.atomic():
+            for chunk in _chunked(list(source_ids)):
+                placeholders = ", ".join("?" * len(chunk))
+                where = f"source = ? AND source_id IN ({placeholders})"
+                for row in self.db["filter_decisions"].rows_where(where, [source, *chunk]):
+                    decisions[row["source_id"]] = row
+                self.db.execute(f"UPDATE filter_decisions SET used_at = ? WHERE {where}", [now, source, *chunk])
+        return decisions
+
+    def save_filter_decisions(self, decisions: list[dict]):
+        """Store decisions (source, source_id, content_hash, rejected_stage,
+        config_hash) and evict the least recently used beyond the size bound"""
+        now = datetime.now().isoformat()
+        with self.db.atomic():
+            self.db["filter_decisions"].insert_all(
+                ({**decision, "used_at": now} for decision in decisions), replace=True
+            )
+            self.prune_filter_decisions()
+
+    def prune_filter_decisions(self, max_entries: Optional[int] = None):
+        max_entries = self.decision_cache_size if max_entries is None else max_entries
+        excess = self.db["filter_decisions"].count - max_entries
+        if excess > 0:
+            self.db.execute(
+                "DELETE FROM filter_decisions WHERE rowid IN "
+                "(SELECT rowid FROM filter_decisions ORDER BY used_at LIMIT ?)",
+                [excess],
+            )
+
+    def get_stage_stats(self) -> dict[str, dict]:
+        """Sampled cost and rejection counts per filter stage from previous runs"""
+        return {row["stage"]: row for row in self.db["filter_stage_stats"].rows}
+
+    def record_stage_stats(self, run_stats: dict[str, dict]):
+        """Fold a run's per-stage samples, failures and seconds into the stored
+        stats, decaying earlier runs by STAGE_STATS_DECAY"""
+        previous = self.get_stage_stats()
+        now = datetime.now().isoformat()
+        rows = []
+        for stage, stats in run_stats.items():
+            old = previous.get(stage, {})
+            row = {"stage": stage, "updated_at": now}
+            for key in ("samples", "failures", "seconds"):
+                row[key] = old.get(key, 0) * STAGE_STATS_DECAY + stats[key]
+            rows.append(row)
+        self.db["filter_stage_stats"].insert_all(rows, replace=True)
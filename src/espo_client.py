@@ -1,42 +1,246 @@
+import asyncio
+import email.utils
+import itertools
+import random
+import threading
+import time
 import httpx
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Iterator, NamedTuple, Optional
 from src.models import Company, Person, JobPost
 
 
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+# EspoCRM's default cap on maxSize for list requests
+ACCOUNT_PAGE_SIZE = 200
+
+# Requests in flight at once in the batch calls
+BATCH_CONCURRENCY = 8
+
+
+class RateLimiter:
+    """Token bucket: on average rate requests per second, up to burst at once.
+
+    Thread-safe, and usable from a single event loop since reserve() never
+    blocks; the caller sleeps for the returned wait.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RetryPolicy(NamedTuple):
+    attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds before retry number attempt + 1: the server's Retry-After if
+        it sent one, else exponential backoff with full jitter; never more
+        than max_delay"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one item of a batch call: its value, or the error it failed with"""
+
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class EspoStats:
+    """Request counters for the run summary"""
+
+    requests: int = 0
+    retries: int = 0
+    recovered_creates: int = 0  # retried creates that turned out to have succeeded
+    throttled: int = 0
+    throttle_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts):
+        """Add to counters; safe from the batch calls' threads"""
+        with self._lock:
+            for name, amount in counts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests, {self.retries} retries "
+            f"({self.recovered_creates} creates recovered), "
+            f"{self.throttled} throttled ({self.throttle_seconds:.1f}s)"
+        )
+
+
 class EspoClient:
-    def __init__(self, base_url: str, username: str, password: str):
+    """EspoCRM REST client.
+
+    Requests share one pooled httpx.Client, created on first use, so
+    connections are kept alive across calls. Use it as a context manager or
+    call close() to release them; http2=True needs the h2 package
+    (``pip install httpx[http2]``).
+
+    Requests wait for rate_limiter if one is given and are retried per retry
+    on connect errors, 429s, 5xx and dropped connections. A create whose
+    request may have reached the server is only retried after looking up the
+    record it would have made (by name, email or sync key) and not finding it.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: RetryPolicy = RetryPolicy(),
+        stats: Optional[EspoStats] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.auth = (username, password)
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.stats = stats or EspoStats()
+        self._client: Optional[httpx.Client] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                base_url=f"{self.base_url}/api/v1/",
+                auth=self.auth,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self):
+        return self
 
-    def _request(self, method: str, endpoint: str, **kwargs) -> dict:
-        url = f"{self.base_url}/api/v1/{endpoint}"
-        response = httpx.request(method, url, auth=self.auth, **kwargs)
-        response.raise_for_status()
-        return response.json()
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        find_existing: Optional[Callable[[], Optional[dict]]] = None,
+        **kwargs,
+    ) -> dict:
+        for attempt in itertools.count():
+            wait = _reserve(self.rate_limiter, self.stats)
+            if wait:
+                time.sleep(wait)
+            self.stats.add(requests=1)
+            try:
+                response = self.client.request(method, endpoint, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                plan = _retry_plan(e, method, attempt, self.retry, find_existing is not None)
+                if plan is None:
+                    raise
+            delay, check = plan
+            self.stats.add(retries=1)
+            time.sleep(delay)
+            if check:
+                existing = find_existing()
+                if existing:
+                    self.stats.add(recovered_creates=1)
+                    return existing
 
     def find_account(self, name: str) -> Optional[dict]:
         """Find account by exact name match"""
-        params = {
-            "where[0][type]": "equals",
-            "where[0][attribute]": "name",
-            "where[0][value]": name,
-        }
-        result = self._request("GET", "Account", params=params)
-        if result.get("total", 0) > 0:
-            return result["list"][0]
-        return None
+        return _first(self._request("GET", "Account", params=_account_query(name)))
 
     def create_account(self, company: Company) -> str:
         """Create account, returns ID"""
-        data = {
-            "name": company.name,
-            "website": company.website,
-            "industry": company.industry,
-            "description": company.description,
-        }
-        result = self._request("POST", "Account", json=data)
+        result = self._request(
+            "POST", "Account", json=_account_data(company), find_existing=lambda: self.find_account(company.name)
+        )
         return result["id"]
 
+    def list_accounts(self, page_size: int = ACCOUNT_PAGE_SIZE) -> Iterator[dict]:
+        """Every account's id and name, oldest first, page_size per request"""
+        offset = 0
+        while True:
+            params = {
+                "select": "id,name",
+                "maxSize": page_size,
+                "offset": offset,
+                "orderBy": "createdAt",
+                "order": "asc",
+            }
+            result = self._request("GET", "Account", params=params)
+            page = result.get("list", [])
+            yield from page
+            offset += len(page)
+            # total is negative when the server skips counting
+            if len(page) < page_size or 0 <= result.get("total", -1) <= offset:
+                return
+
+    def _run_batch(self, calls: list[Callable[[], Any]], concurrency: int) -> list[BatchResult]:
+        """Run calls concurrently on the pooled client, one result per call in
+        order. EspoCRM's REST API has no batch create, so each item is still
+        its own request, but they overlap on kept-alive connections (one
+        multiplexed connection with http2) instead of waiting on each other."""
+
+        def run(call):
+            try:
+                return BatchResult(call())
+            except Exception as e:
+                return BatchResult(error=e)
+
+        if concurrency <= 1 or len(calls) <= 1:
+            return [run(call) for call in calls]
+        self.client  # create the pooled client before the threads share it
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(calls))) as pool:
+            return list(pool.map(run, calls))
+
+    def find_accounts(self, names: list[str], concurrency: int = BATCH_CONCURRENCY) -> list[BatchResult]:
+        """find_account for each name; values are the accounts found or None"""
+        return self._run_batch([partial(self.find_account, name) for name in names], concurrency)
+
+    def create_accounts(self, companies: list[Company], concurrency: int = BATCH_CONCURRENCY) -> list[BatchResult]:
+        """create_account for each company; values are the new account IDs"""
+        return self._run_batch([partial(self.create_account, company) for company in companies], concurrency)
+
     def find_contact(self, email: str = None, name: str = None) -> Optional[dict]:
         """Find contact by email or name"""
         params = {}
@@ -61,29 +265,231 @@ class EspoClient:
             "cRelationshipStrength": "1/10",
             "description": f"Source: {person.source_url}",
         }
-        result = self._request("POST", "Contact", json=data)
+        find_existing = (lambda: self.find_contact(email=person.email)) if person.email else None
+        result = self._request("POST", "Contact", json=data, find_existing=find_existing)
         return result["id"]
 
+    def find_opportunity(self, key: str) -> Optional[dict]:
+        """Find the opportunity created for a job's sync_key"""
+        return _first(self._request("GET", "Opportunity", params=_sync_key_query(key)))
+
     def create_opportunity(self, job: JobPost, account_id: str) -> str:
         """Create opportunity (job application) linked to account"""
-        from datetime import datetime, timedelta
+        result = self._request(
+            "POST",
+            "Opportunity",
+            json=_opportunity_data(job, account_id),
+            find_existing=lambda: self.find_opportunity(sync_key(job)),
+        )
+        return result["id"]
 
-        # Build description with job details
-        description = f"{job.description[:1000]}..." if len(job.description) > 1000 else job.description
-        description += f"\n\nSource: {job.source_url}"
-        if job.tech_stack:
-            description += f"\nTech: {', '.join(job.tech_stack)}"
+    def create_opportunities(
+        self, items: list[tuple[JobPost, str]], concurrency: int = BATCH_CONCURRENCY
+    ) -> list[BatchResult]:
+        """create_opportunity for each (job, account_id); values are the new
+        opportunity IDs. Creates are retried as safely as one by one."""
+        return self._run_batch([partial(self.create_opportunity, *item) for item in items], concurrency)
 
-        # Set close date to 30 days from now
-        close_date = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
 
-        data = {
-            "name": f"{job.title} at {job.company_name}"[:150],
-            "accountId": account_id,
-            "stage": "To Apply",
-            "amount": 0,
-            "closeDate": close_date,
-            "description": description,
-        }
-        result = self._request("POST", "Opportunity", json=data)
+class AsyncEspoClient:
+    """EspoClient's account and opportunity calls on a pooled httpx.AsyncClient,
+    for syncing many jobs concurrently, with the same throttling and retries"""
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: RetryPolicy = RetryPolicy(),
+        stats: Optional[EspoStats] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.stats = stats or EspoStats()
+        self.client = httpx.AsyncClient(
+            base_url=f"{self.base_url}/api/v1/",
+            auth=(username, password),
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        find_existing: Optional[Callable[[], Awaitable[Optional[dict]]]] = None,
+        **kwargs,
+    ) -> dict:
+        for attempt in itertools.count():
+            wait = _reserve(self.rate_limiter, self.stats)
+            if wait:
+                await asyncio.sleep(wait)
+            self.stats.add(requests=1)
+            try:
+                response = await self.client.request(method, endpoint, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                plan = _retry_plan(e, method, attempt, self.retry, find_existing is not None)
+                if plan is None:
+                    raise
+            delay, check = plan
+            self.stats.add(retries=1)
+            await asyncio.sleep(delay)
+            if check:
+                existing = await find_existing()
+                if existing:
+                    self.stats.add(recovered_creates=1)
+                    return existing
+
+    async def find_account(self, name: str) -> Optional[dict]:
+        """Find account by exact name match"""
+        return _first(await self._request("GET", "Account", params=_account_query(name)))
+
+    async def create_account(self, company: Company) -> str:
+        """Create account, returns ID"""
+        result = await self._request(
+            "POST", "Account", json=_account_data(company), find_existing=lambda: self.find_account(company.name)
+        )
+        return result["id"]
+
+    async def find_opportunity(self, key: str) -> Optional[dict]:
+        """Find the opportunity created for a job's sync_key"""
+        return _first(await self._request("GET", "Opportunity", params=_sync_key_query(key)))
+
+    async def create_opportunity(self, job: JobPost, account_id: str) -> str:
+        """Create opportunity (job application) linked to account"""
+        result = await self._request(
+            "POST",
+            "Opportunity",
+            json=_opportunity_data(job, account_id),
+            find_existing=lambda: self.find_opportunity(sync_key(job)),
+        )
         return result["id"]
+
+
+def _reserve(rate_limiter: Optional[RateLimiter], stats: EspoStats) -> float:
+    wait = rate_limiter.reserve() if rate_limiter else 0.0
+    if wait:
+        stats.add(throttled=1, throttle_seconds=wait)
+    return wait
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After in seconds, given as seconds or an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _retry_plan(
+    error: httpx.HTTPError, method: str, attempt: int, policy: RetryPolicy, can_check: bool
+) -> Optional[tuple[float, bool]]:
+    """(seconds to wait, whether to look for the record first) before retrying
+    a request that failed with error, or None to give up"""
+    if attempt + 1 >= policy.attempts:
+        return None
+    retry_after = None
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        reached_server = False
+    elif isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status != 429 and status < 500:
+            return None
+        reached_server = status != 429
+        retry_after = _retry_after(error.response)
+        if retry_after is not None and retry_after > policy.max_delay:
+            # Waiting less would only be throttled again; the caller (e.g. the
+            # sync outbox) can try again later without holding a worker
+            return None
+    elif isinstance(error, httpx.TransportError):
+        # Timed out or dropped after the request was (maybe) sent
+        reached_server = True
+    else:
+        return None
+    check = reached_server and method != "GET"
+    if check and not can_check:
+        return None
+    return policy.delay(attempt, retry_after), check
+
+
+def _first(result: dict) -> Optional[dict]:
+    if result.get("total", 0) > 0:
+        return result["list"][0]
+    return None
+
+
+def _account_query(name: str) -> dict:
+    return {
+        "where[0][type]": "equals",
+        "where[0][attribute]": "name",
+        "where[0][value]": name,
+    }
+
+
+def _account_data(company: Company) -> dict:
+    return {
+        "name": company.name,
+        "website": company.website,
+        "industry": company.industry,
+        "description": company.description,
+    }
+
+
+def sync_key(job: JobPost) -> str:
+    """Idempotency key written into a job's opportunity, to find it after a
+    create whose response was lost"""
+    return f"[sync:{job.source}:{job.source_id}]"
+
+
+def _sync_key_query(key: str) -> dict:
+    return {
+        "where[0][type]": "contains",
+        "where[0][attribute]": "description",
+        "where[0][value]": key,
+    }
+
+
+def _opportunity_data(job: JobPost, account_id: str) -> dict:
+    # Build description with job details
+    description = f"{job.description[:1000]}..." if len(job.description) > 1000 else job.description
+    description += f"\n\nSource: {job.source_url}"
+    if job.tech_stack:
+        description += f"\nTech: {', '.join(job.tech_stack)}"
+    description += f"\nSync key: {sync_key(job)}"
+
+    # Set close date to 30 days from now
+    close_date = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+
+    return {
+        "name": f"{job.title} at {job.company_name}"[:150],
+        "accountId": account_id,
+        "stage": "To Apply",
+        "amount": 0,
+        "closeDate": close_date,
+        "description": description,
+    }
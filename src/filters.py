@@ -1,4 +1,14 @@
+import hashlib
+import json
+import multiprocessing
+import os
 import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Iterable, NamedTuple, Optional
 from src.models import JobPost
 
 
@@ -83,64 +93,107 @@ def passes_tech_filter(job: JobPost, config: dict) -> bool:
     return matches >= min_match
 
 
-def parse_experience_level(text: str) -> dict:
-    """Extract experience requirements from job description/title"""
-    result = {"years_min": None, "years_max": None, "level": None}
-    text_lower = text.lower()
-
-    # Parse "X+ years" pattern
-    plus_match = re.search(r"(\d+)\+?\s*(?:years?|yrs?)", text_lower)
-    if plus_match:
-        result["years_min"] = int(plus_match.group(1))
-
-    # Parse "X-Y years" range pattern (must check before plus pattern overwrites)
-    range_match = re.search(r"(\d+)\s*[-–]\s*(\d+)\s*(?:years?|yrs?)", text_lower)
-    if range_match:
-        result["years_min"] = int(range_match.group(1))
-        result["years_max"] = int(range_match.group(2))
-
-    # Detect experience level keywords
-    if re.search(r"\b(?:junior|jr\.?|entry[- ]?level)\b", text_lower):
-        result["level"] = "junior"
-    elif re.search(r"\b(?:senior|sr\.?)\b", text_lower):
-        result["level"] = "senior"
-    elif re.search(r"\b(?:mid[- ]?level|intermediate)\b", text_lower):
-        result["level"] = "mid"
+# One pass finds every experience mention. Years come first so that each digit
+# run is tried as a range ("3-5 years") before "N+ years"; the pattern is kept
+# free of capture groups so sre can skip quickly between candidates.
+_EXPERIENCE_PATTERN = re.compile(
+    r"\d+(?:\s*[-–]\s*\d+\s*|\+?\s*)(?:years?|yrs?)"
+    r"|\b(?:junior|jr\.?|entry[- ]?level|senior|sr\.?|mid[- ]?level|intermediate)\b"
+)
+_NUMBER = re.compile(r"\d+")
+_LEVEL_BY_INITIAL = {"j": "junior", "e": "junior", "s": "senior", "m": "mid", "i": "mid"}
+
+# When several levels are mentioned, the first listed here wins
+_LEVEL_PRIORITY = ("junior", "senior", "mid")
+
+
+class ExperienceMention(NamedTuple):
+    """One years-range, "N+ years" or level keyword found in a text"""
+
+    kind: str  # "range", "plus" or "level"
+    start: int
+    years_min: Optional[int] = None
+    years_max: Optional[int] = None
+    level: Optional[str] = None
+
+
+def _scan_experience(text_lower: str) -> list[ExperienceMention]:
+    mentions = []
+    for match in _EXPERIENCE_PATTERN.finditer(text_lower):
+        found = match.group()
+        if found[0].isdecimal():
+            numbers = [int(n) for n in _NUMBER.findall(found)]
+            if len(numbers) == 2:
+                mentions.append(ExperienceMention("range", match.start(), numbers[0], numbers[1]))
+            else:
+                mentions.append(ExperienceMention("plus", match.start(), numbers[0]))
+        else:
+            mentions.append(ExperienceMention("level", match.start(), level=_LEVEL_BY_INITIAL[found[0]]))
+    return mentions
+
+
+def extract_experience(text: str) -> list[ExperienceMention]:
+    """Every experience mention in text, in order of appearance"""
+    return _scan_experience(text.lower())
 
+
+def _summarize_experience(mentions: list[ExperienceMention]) -> dict:
+    # The first range wins over any "N+ years"; levels go by _LEVEL_PRIORITY
+    result = {"years_min": None, "years_max": None, "level": None}
+    first_range = next((m for m in mentions if m.kind == "range"), None)
+    first_plus = next((m for m in mentions if m.kind == "plus"), None)
+    if first_range:
+        result["years_min"] = first_range.years_min
+        result["years_max"] = first_range.years_max
+    elif first_plus:
+        result["years_min"] = first_plus.years_min
+    levels = {m.level for m in mentions if m.kind == "level"}
+    result["level"] = next((level for level in _LEVEL_PRIORITY if level in levels), None)
     return result
 
 
-def passes_experience_filter(job: JobPost, config: dict) -> bool:
-    """Check if job matches experience requirements"""
-    if not config:
-        return True
+def parse_experience_level(text: str) -> dict:
+    """Extract experience requirements from job description/title"""
+    return _summarize_experience(extract_experience(text))
+
 
+def _experience_rejection(title_exp: dict, desc_exp: dict, config: dict) -> Optional[str]:
     max_years = config.get("max_years")
     allowed_levels = config.get("levels", [])
 
-    # Parse experience from both title and description
-    title_exp = parse_experience_level(job.title)
-    desc_exp = parse_experience_level(job.description)
-
     # Use title experience if available, else description
     years_min = title_exp["years_min"] or desc_exp["years_min"]
     level = title_exp["level"] or desc_exp["level"]
 
     # If no experience mentioned, pass the filter
     if years_min is None and level is None:
-        return True
+        return None
 
     # Check max years requirement
     if max_years is not None and years_min is not None:
         if years_min > max_years:
-            return False
+            return f"requires {years_min}+ years (max {max_years})"
 
     # Check level requirement
     if allowed_levels and level is not None:
         if level not in allowed_levels:
-            return False
+            return f"level '{level}' not allowed"
 
-    return True
+    return None
+
+
+def experience_rejection(job: JobPost, config: dict) -> Optional[str]:
+    """Why the job fails the experience requirements, or None if it meets them"""
+    if not config:
+        return None
+    return _experience_rejection(
+        parse_experience_level(job.title), parse_experience_level(job.description), config
+    )
+
+
+def passes_experience_filter(job: JobPost, config: dict) -> bool:
+    """Check if job matches experience requirements"""
+    return experience_rejection(job, config) is None
 
 
 def filter_job(job: JobPost, config: dict) -> bool:
@@ -156,3 +209,583 @@ def filter_job(job: JobPost, config: dict) -> bool:
     if not passes_experience_filter(job, config.get("experience", {})):
         return False
     return True
+
+
+def trie_pattern(keywords: list[str]) -> str:
+    """Build a regex matching any of the keywords, with shared prefixes factored out"""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A keyword ends here, so everything below is an optional (greedy) extension
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Finds which of many keywords occur in a text with a single trie-shaped regex.
+
+    The regex reports the longest keyword starting at each match position; shorter
+    keywords contained in it ("go" in "golang") are filled in from a precomputed
+    table, so ``find(text)`` equals ``{k for k in keywords if k in text}``.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted({k.lower() for k in keywords})
+        self.max_len = max((len(k) for k in self.keywords), default=0)
+        self._pattern = re.compile(trie_pattern(self.keywords)) if self.keywords else None
+        self._contained = {
+            k: frozenset(other for other in self.keywords if other in k) for k in self.keywords
+        }
+
+    def find(self, text: str) -> set[str]:
+        """Return the keywords occurring in text (which must already be lower-cased)"""
+        if self._pattern is None:
+            return set()
+        longest = set()
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            longest.add(match.group())
+            match = search(text, match.start() + 1)
+        found = set()
+        for keyword in longest:
+            found |= self._contained[keyword]
+        return found
+
+
+class _JobText:
+    """Lower-cased views of one job and the keywords found in each, computed on first use"""
+
+    def __init__(self, job: JobPost, matcher: KeywordMatcher):
+        self.job = job
+        self._matcher = matcher
+
+    @cached_property
+    def title(self) -> str:
+        return self.job.title.lower()
+
+    @cached_property
+    def description(self) -> str:
+        return self.job.description.lower()
+
+    @cached_property
+    def tech_stack(self) -> set[str]:
+        return set(t.lower() for t in self.job.tech_stack)
+
+    @cached_property
+    def title_experience(self) -> dict:
+        return _summarize_experience(_scan_experience(self.title))
+
+    @cached_property
+    def description_experience(self) -> dict:
+        return _summarize_experience(_scan_experience(self.description))
+
+    @cached_property
+    def title_hits(self) -> set[str]:
+        return self._matcher.find(self.title)
+
+    @cached_property
+    def description_hits(self) -> set[str]:
+        return self._matcher.find(self.description)
+
+    def _prefixed_hits(self, prefix: str) -> set[str]:
+        # Hits in f"{prefix} {description}": those inside the description plus any that
+        # start in the prefix, which can reach at most max_len - 1 chars past it.
+        head = f"{prefix.lower()} {self.description[: max(self._matcher.max_len - 1, 0)]}"
+        return self.description_hits | self._matcher.find(head)
+
+    @cached_property
+    def location_hits(self) -> set[str]:
+        return self._prefixed_hits(self.job.location or "")
+
+    @cached_property
+    def company_hits(self) -> set[str]:
+        return self._prefixed_hits(self.job.company_name)
+
+
+# Bump when filter semantics change so cached decisions are re-evaluated
+FILTER_VERSION = 1
+
+
+def _hash_config(config) -> str:
+    payload = json.dumps([FILTER_VERSION, config], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def content_hash(job: JobPost) -> str:
+    """Hash of the job fields the filters look at"""
+    payload = job.model_dump_json(
+        include={"company_name", "title", "location", "remote", "description", "tech_stack"}
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class Rejection(NamedTuple):
+    """Why a job was filtered out"""
+
+    stage: str
+    reason: str
+    keyword: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.stage}: {self.reason}"
+
+
+def _lower_all(keywords: Optional[list]) -> list[str]:
+    return [k.lower() for k in keywords or []]
+
+
+class CompiledFilter:
+    """A filter config compiled once into a single keyword matcher.
+
+    Gives the same answers as filter_job, but each job's text is lower-cased and
+    scanned once for all keyword lists, so the cost per job stays flat as the
+    config grows.
+    """
+
+    STAGES = ("role", "location", "company", "tech", "experience")
+
+    def __init__(self, config: dict, stage_order: Optional[Iterable[str]] = None):
+        self.config = config
+        # Any order gives the same pass/fail result; see order_stages
+        self.stage_order = tuple(stage_order or self.STAGES)
+        role = config.get("role") or {}
+        location = config.get("location") or {}
+        company = config.get("company") or {}
+        tech = config.get("tech") or {}
+
+        self._role_exclude = _lower_all(role.get("exclude"))
+        self._role_include = _lower_all(role.get("include"))
+        self._location_exclude = _lower_all(location.get("exclude"))
+        self._location_include = _lower_all(location.get("include"))
+        self._remote_ok = bool(location.get("remote_ok"))
+        self._company_exclude = _lower_all(company.get("exclude_keywords"))
+        self._tech_enabled = bool(tech)
+        self._tech_exclude = _lower_all(tech.get("exclude"))
+        self._tech_required = _lower_all(tech.get("require_any"))
+        self._tech_min_match = tech.get("min_match", 1)
+        self._experience = config.get("experience") or {}
+
+        self.stage_hashes = {stage: _hash_config(config.get(stage) or {}) for stage in self.STAGES}
+        self.config_hash = _hash_config(self.stage_hashes)
+
+        self._matcher = KeywordMatcher(
+            self._role_exclude
+            + self._role_include
+            + self._location_exclude
+            + self._location_include
+            + self._company_exclude
+            + self._tech_exclude
+            + self._tech_required
+        )
+        self._checks = {
+            "role": self._check_role,
+            "location": self._check_location,
+            "company": self._check_company,
+            "tech": self._check_tech,
+            "experience": self._check_experience,
+        }
+
+    def _check_role(self, text: _JobText) -> Optional[Rejection]:
+        for k in self._role_exclude:
+            if k in text.title_hits:
+                return Rejection("role", f"title matches excluded '{k}'", k)
+        if not self._role_include:
+            return None
+        if any(k in text.title_hits or k in text.description_hits for k in self._role_include):
+            return None
+        return Rejection("role", "no included role keyword")
+
+    def _check_location(self, text: _JobText) -> Optional[Rejection]:
+        for k in self._location_exclude:
+            if k in text.location_hits:
+                return Rejection("location", f"matches excluded '{k}'", k)
+        if self._remote_ok and text.job.remote:
+            return None
+        if not self._location_include:
+            return None
+        if any(k in text.location_hits for k in self._location_include):
+            return None
+        return Rejection("location", "not remote and no included location")
+
+    def _check_company(self, text: _JobText) -> Optional[Rejection]:
+        for k in self._company_exclude:
+            if k in text.company_hits:
+                return Rejection("company", f"matches excluded '{k}'", k)
+        return None
+
+    def _check_tech(self, text: _JobText) -> Optional[Rejection]:
+        if not self._tech_enabled:
+            return None
+        for excluded in self._tech_exclude:
+            if excluded in text.tech_stack or excluded in text.description_hits:
+                return Rejection("tech", f"uses excluded '{excluded}'", excluded)
+        if not self._tech_required:
+            return None
+        matches = sum(
+            1 for t in self._tech_required if t in text.tech_stack or t in text.description_hits
+        )
+        if matches >= self._tech_min_match:
+            return None
+        return Rejection("tech", f"matched {matches} of {self._tech_min_match} required technologies")
+
+    def _check_experience(self, text: _JobText) -> Optional[Rejection]:
+        if not self._experience:
+            return None
+        reason = _experience_rejection(text.title_experience, text.description_experience, self._experience)
+        return Rejection("experience", reason) if reason else None
+
+    @property
+    def keyword_lists(self) -> dict[str, list[str]]:
+        return {
+            "role.exclude": self._role_exclude,
+            "role.include": self._role_include,
+            "location.exclude": self._location_exclude,
+            "location.include": self._location_include,
+            "company.exclude_keywords": self._company_exclude,
+            "tech.exclude": self._tech_exclude,
+            "tech.require_any": self._tech_required,
+        }
+
+    def _matched_keywords(self, text: _JobText) -> list[str]:
+        hits = {
+            "role.exclude": text.title_hits,
+            "role.include": text.title_hits | text.description_hits,
+            "location.exclude": text.location_hits,
+            "location.include": text.location_hits,
+            "company.exclude_keywords": text.company_hits,
+            "tech.exclude": text.tech_stack | text.description_hits,
+            "tech.require_any": text.tech_stack | text.description_hits,
+        }
+        return [
+            f"{name}: {k}" for name, keywords in self.keyword_lists.items() for k in keywords if k in hits[name]
+        ]
+
+    def explain(self, job: JobPost) -> "FilterDecision":
+        """Evaluate every stage (not just up to the first failure) with timings.
+
+        Each stage is timed on its own text scan, so a stage's time is what it
+        would cost if it ran first.
+        """
+        results = {}
+        stage_times = {}
+        for stage in self.stage_order:
+            text = _JobText(job, self._matcher)
+            start = time.perf_counter()
+            results[stage] = self._checks[stage](text)
+            stage_times[stage] = time.perf_counter() - start
+        rejection = next((r for r in results.values() if r), None)
+        return FilterDecision(
+            source=job.source,
+            source_id=job.source_id,
+            rejection=rejection,
+            failed_stages=[stage for stage, r in results.items() if r],
+            stage_times=stage_times,
+            keyword_hits=self._matched_keywords(text),
+        )
+
+    def evaluate(self, job: JobPost) -> Optional[Rejection]:
+        """Returns why the job fails the first stage it fails, or None if it passes"""
+        text = _JobText(job, self._matcher)
+        for stage in self.stage_order:
+            rejection = self._checks[stage](text)
+            if rejection:
+                return rejection
+        return None
+
+    def rejecting_stage(self, job: JobPost) -> Optional[str]:
+        """Returns the first stage the job fails, or None if it passes all filters"""
+        rejection = self.evaluate(job)
+        return rejection.stage if rejection else None
+
+    def passes(self, job: JobPost) -> bool:
+        """Returns True if job passes all filters"""
+        return self.rejecting_stage(job) is None
+
+    __call__ = passes
+
+    def decision_hash(self, rejected_stage: Optional[str]) -> str:
+        """Hash of the config a decision depends on.
+
+        Failing any one stage rejects a job, so a rejection only depends on the
+        config of the stage that rejected it; a pass depends on all of them.
+        """
+        if rejected_stage is None:
+            return self.config_hash
+        return self.stage_hashes[rejected_stage]
+
+
+@dataclass
+class FilterDecision:
+    """Instrumented result of CompiledFilter.explain for one job"""
+
+    source: str
+    source_id: str
+    rejection: Optional[Rejection]
+    failed_stages: list[str]
+    stage_times: dict[str, float]  # seconds
+    keyword_hits: list[str]  # "<stage>.<list>: <keyword>"
+
+    @property
+    def passed(self) -> bool:
+        return self.rejection is None
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class FilterStats:
+    """Aggregate counters over the decisions of a run"""
+
+    keyword_lists: dict = field(default_factory=dict)  # CompiledFilter.keyword_lists
+    jobs: int = 0
+    rejections: Counter = field(default_factory=Counter)  # first failing stage
+    failures: Counter = field(default_factory=Counter)  # every failing stage
+    keyword_hits: Counter = field(default_factory=Counter)
+    stage_times: dict = field(default_factory=lambda: defaultdict(list))
+
+    def add(self, decision: FilterDecision):
+        self.jobs += 1
+        if decision.rejection:
+            self.rejections[decision.rejection.stage] += 1
+        self.failures.update(decision.failed_stages)
+        self.keyword_hits.update(decision.keyword_hits)
+        for stage, seconds in decision.stage_times.items():
+            self.stage_times[stage].append(seconds)
+
+    def stage_percentile(self, stage: str, q: float) -> float:
+        """Time per job for a stage at quantile q (0.5 for p50), in seconds"""
+        return _percentile(self.stage_times[stage], q)
+
+    def stage_totals(self) -> dict[str, dict]:
+        """Per-stage samples, failures and total seconds, as order_stages expects"""
+        return {
+            stage: {
+                "samples": len(self.stage_times[stage]),
+                "failures": self.failures[stage],
+                "seconds": sum(self.stage_times[stage]),
+            }
+            for stage in list(self.stage_times)
+        }
+
+    def dead_keywords(self) -> list[str]:
+        """Configured keywords that matched no job this run"""
+        return [
+            f"{name}: {k}"
+            for name, keywords in self.keyword_lists.items()
+            for k in keywords
+            if not self.keyword_hits[f"{name}: {k}"]
+        ]
+
+
+def order_stages(stage_stats: dict[str, dict]) -> tuple[str, ...]:
+    """Order stages so the cheapest, most selective rejection runs first.
+
+    stage_stats maps each stage to its sampled "samples", "failures" and
+    "seconds" (see JobDatabase.get_stage_stats). Stages are sorted by expected
+    time spent per rejection, mean time / failure rate; stages that never
+    fail go last. Without stats for every stage the default order is kept.
+    """
+    if any(not stage_stats.get(stage, {}).get("samples") for stage in CompiledFilter.STAGES):
+        return CompiledFilter.STAGES
+
+    def cost_per_rejection(stage: str) -> float:
+        stats = stage_stats[stage]
+        if not stats["failures"]:
+            return float("inf")
+        return stats["seconds"] / stats["failures"]
+
+    return tuple(sorted(CompiledFilter.STAGES, key=cost_per_rejection))
+
+
+# Below this many jobs, starting a process pool costs more than it saves
+PARALLEL_MIN_JOBS = 2000
+CHUNK_SIZE = 500
+
+# Pool workers are started from a clean server process rather than forked:
+# run_pipeline filters while scraper threads are still running, and a fork
+# copies whatever locks those threads hold
+_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Per-process filter, compiled once by the pool initializer
+_worker_filter: Optional[CompiledFilter] = None
+
+
+def _init_worker(config: dict, stage_order: Optional[tuple] = None):
+    global _worker_filter
+    _worker_filter = CompiledFilter(config, stage_order)
+
+
+def _evaluate_chunk(jobs: list[JobPost]) -> list[Optional[Rejection]]:
+    return [_worker_filter.evaluate(job) for job in jobs]
+
+
+def evaluate_jobs(
+    jobs: Iterable[JobPost],
+    config: dict,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    min_parallel: int = PARALLEL_MIN_JOBS,
+    stage_order: Optional[tuple] = None,
+) -> list[Optional[Rejection]]:
+    """Filter a batch of jobs, returning each one's Rejection (None if it
+    passed) in input order.
+
+    Batches of at least min_parallel jobs are split into chunks and run on a
+    process pool (workers defaults to the CPU count); smaller batches, or
+    workers=1, are filtered in this process.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) < min_parallel:
+        job_filter = CompiledFilter(config, stage_order)
+        return [job_filter.evaluate(job) for job in jobs]
+
+    chunks = [jobs[i : i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        initializer=_init_worker,
+        initargs=(config, stage_order),
+        mp_context=multiprocessing.get_context(_POOL_START_METHOD),
+    ) as pool:
+        for chunk_results in pool.map(_evaluate_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+def filter_jobs(
+    jobs: Iterable[JobPost],
+    config: dict,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    min_parallel: int = PARALLEL_MIN_JOBS,
+) -> list[bool]:
+    """Filter a batch of jobs, returning pass/fail results in input order"""
+    rejections = evaluate_jobs(jobs, config, workers, chunk_size, min_parallel)
+    return [rejection is None for rejection in rejections]
+
+
+def _include_change(old: list, new: list) -> str:
+    # An empty include list lets everything through
+    old, new = set(_lower_all(old)), set(_lower_all(new))
+    if old == new:
+        return "same"
+    if not old:
+        return "tighter"
+    if not new:
+        return "looser"
+    if new < old:
+        return "tighter"
+    if new > old:
+        return "looser"
+    return "mixed"
+
+
+def _exclude_change(old: list, new: list) -> str:
+    old, new = set(_lower_all(old)), set(_lower_all(new))
+    if old == new:
+        return "same"
+    if new > old:
+        return "tighter"
+    if new < old:
+        return "looser"
+    return "mixed"
+
+
+def _required_change(old: list, new: list) -> str:
+    # An empty list lets everything through; otherwise each required term is
+    # another chance to reach min_match
+    old, new = set(_lower_all(old)), set(_lower_all(new))
+    if old == new:
+        return "same"
+    if not old:
+        return "tighter"
+    if not new:
+        return "looser"
+    if new > old:
+        return "looser"
+    if new < old:
+        return "tighter"
+    return "mixed"
+
+
+def _limit_change(old, new, higher_is_tighter: bool) -> str:
+    if old == new:
+        return "same"
+    if old is None or new is None:
+        # No limit at all is the loosest setting
+        return "tighter" if old is None else "looser"
+    return "tighter" if (new > old) == higher_is_tighter else "looser"
+
+
+# How each config key constrains its stage: extra excludes, fewer includes, a
+# higher min or a lower max only ever reject more jobs
+_STAGE_KEYS = {
+    "role": {"exclude": _exclude_change, "include": _include_change},
+    "location": {
+        "exclude": _exclude_change,
+        "include": _include_change,
+        "remote_ok": lambda old, new: _limit_change(bool(old), bool(new), False),
+    },
+    "company": {"exclude_keywords": _exclude_change},
+    "tech": {
+        "exclude": _exclude_change,
+        "require_any": _required_change,
+        "min_match": lambda old, new: _limit_change(old or 1, new or 1, True),
+    },
+    "experience": {
+        "max_years": lambda old, new: _limit_change(old, new, False),
+        "levels": _include_change,
+    },
+}
+
+
+def _stage_change(stage: str, old: dict, new: dict) -> str:
+    changes = set()
+    for key in set(old) | set(new):
+        compare = _STAGE_KEYS[stage].get(key)
+        if compare is None:
+            changes.add("same" if old.get(key) == new.get(key) else "mixed")
+        else:
+            changes.add(compare(old.get(key), new.get(key)))
+    changes.discard("same")
+    if len(changes) > 1:
+        return "mixed"
+    return changes.pop() if changes else "same"
+
+
+def affected_decisions(old_config: dict, new_config: dict) -> tuple[bool, set[str]]:
+    """Which earlier decisions a config change can flip.
+
+    Returns whether jobs that passed under old_config need re-checking, and the
+    stages whose rejections need re-checking. Only tightening a stage (e.g. a
+    new role.exclude keyword) leaves its rejections standing, and only
+    loosening one leaves passing jobs passing.
+    """
+    recheck_passing = False
+    recheck_stages = set()
+    for stage in CompiledFilter.STAGES:
+        change = _stage_change(stage, old_config.get(stage) or {}, new_config.get(stage) or {})
+        if change == "same":
+            continue
+        if change != "looser":
+            recheck_passing = True
+        if change != "tighter":
+            recheck_stages.add(stage)
+    return recheck_passing, recheck_stages
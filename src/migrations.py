@@ -0,0 +1,340 @@
+"""Ordered schema migrations for the pipeline DB, applied when it is opened.
+
+Each step runs once and is recorded in schema_version. Steps are written to
+be safe on databases that predate versioning (they check before creating),
+and long data backfills commit chunk by chunk and resume where they stopped,
+so a large jobs table is never locked in one huge write transaction.
+
+To change the schema, append a step; never edit or reorder applied ones.
+"""
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+if TYPE_CHECKING:
+    from src.db import JobDatabase
+
+# Rows per transaction in backfills
+BACKFILL_CHUNK_SIZE = 1000
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[["JobDatabase"], None]
+
+
+def backfill(jdb: "JobDatabase", select: str, start: int, update: Callable[[list[tuple]], None]):
+    """Run update on the rows of select in rowid order, one transaction per chunk.
+
+    select must take the last processed rowid and a limit as parameters
+    (``... WHERE rowid > ? ORDER BY rowid LIMIT ?``) and return the rowid first.
+    """
+    last_rowid = start
+    while True:
+        rows = jdb.db.execute(select, [last_rowid, BACKFILL_CHUNK_SIZE]).fetchall()
+        if not rows:
+            return
+        with jdb.db.atomic():
+            update(rows)
+        last_rowid = rows[-1][0]
+
+
+def _create_jobs(jdb: "JobDatabase"):
+    if "jobs" not in jdb.db.table_names():
+        jdb.db["jobs"].create(
+            {
+                "source": str,
+                "source_id": str,
+                "source_url": str,
+                "company_name": str,
+                "title": str,
+                "data": str,  # JSON, or a compression BLOB
+                "scraped_at": str,
+                "synced_at": str,
+                "account_id": str,
+                "contact_id": str,
+            },
+            pk=["source", "source_id"],
+        )
+
+
+def _add_filter_results(jdb: "JobDatabase"):
+    jobs_columns = jdb.db["jobs"].columns_dict
+    for column in ("rejected_stage", "rejection_reason", "filter_hash"):
+        if column not in jobs_columns:
+            jdb.db["jobs"].add_column(column, str)
+    if "filter_configs" not in jdb.db.table_names():
+        jdb.db["filter_configs"].create(
+            {"hash": str, "config": str, "created_at": str},
+            pk="hash",
+        )
+
+
+def _create_filter_decisions(jdb: "JobDatabase"):
+    if "filter_decisions" not in jdb.db.table_names():
+        jdb.db["filter_decisions"].create(
+            {
+                "source": str,
+                "source_id": str,
+                "content_hash": str,
+                "rejected_stage": str,  # NULL if the job passed
+                "rejection_reason": str,
+                "config_hash": str,
+                "used_at": str,
+            },
+            pk=["source", "source_id"],
+        )
+    elif "rejection_reason" not in jdb.db["filter_decisions"].columns_dict:
+        jdb.db["filter_decisions"].add_column("rejection_reason", str)
+    jdb.db["filter_decisions"].create_index(["used_at"], if_not_exists=True)
+
+
+def _create_filter_stage_stats(jdb: "JobDatabase"):
+    if "filter_stage_stats" not in jdb.db.table_names():
+        jdb.db["filter_stage_stats"].create(
+            {"stage": str, "samples": float, "failures": float, "seconds": float, "updated_at": str},
+            pk="stage",
+        )
+
+
+def _add_stats_indexes_and_runs(jdb: "JobDatabase"):
+    for column in ("synced_at", "scraped_at", "company_name"):
+        jdb.db["jobs"].create_index([column], if_not_exists=True)
+    if "runs" not in jdb.db.table_names():
+        jdb.db["runs"].create(
+            {
+                "id": int,
+                "started_at": str,
+                "sources": str,
+                "seconds": float,
+                "scraped": int,
+                "new": int,
+                "rejected": int,
+                "synced": int,
+                "failed": int,
+            },
+            pk="id",
+        )
+
+
+def _create_jobs_fts(jdb: "JobDatabase"):
+    # Full-text index of title, company and description, keyed by the jobs
+    # rowid. Rows are added by save_jobs (the description lives in the data
+    # column) and removed by the trigger, which with recursive_triggers also
+    # fires for rows replaced by INSERT OR REPLACE
+    jdb.db.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+        "title, company_name, description, tokenize='porter unicode61')"
+    )
+    jdb.db.execute(
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN "
+        "DELETE FROM jobs_fts WHERE rowid = old.rowid; END"
+    )
+
+    # Resume after the last job indexed by an interrupted run
+    start = jdb.db.execute("SELECT COALESCE(MAX(rowid), 0) FROM jobs_fts").fetchone()[0]
+    _index_jobs_after(jdb, start)
+
+
+def _index_jobs_after(jdb: "JobDatabase", start: int):
+    """Add the jobs after rowid start to jobs_fts, a backfill chunk at a time"""
+
+    def index(rows):
+        jdb.db.conn.executemany(
+            "INSERT INTO jobs_fts (rowid, title, company_name, description) VALUES (?, ?, ?, ?)",
+            [
+                (rowid, title, company_name, json.loads(jdb.decode_data(data)).get("description", ""))
+                for rowid, title, company_name, data in rows
+            ],
+        )
+
+    backfill(
+        jdb,
+        "SELECT rowid, title, company_name, data FROM jobs WHERE rowid > ? ORDER BY rowid LIMIT ?",
+        start,
+        index,
+    )
+
+
+def _create_data_dicts(jdb: "JobDatabase"):
+    if "data_dicts" not in jdb.db.table_names():
+        jdb.db["data_dicts"].create(
+            {"id": int, "zdict": bytes, "created_at": str},
+            pk="id",
+        )
+
+
+def _create_archived_keys(jdb: "JobDatabase"):
+    # Jobs removed by compact(), still counted as duplicates
+    if "archived_keys" not in jdb.db.table_names():
+        jdb.db["archived_keys"].create(
+            {"source": str, "source_id": str, "archived_at": str},
+            pk=["source", "source_id"],
+        )
+
+
+def _create_account_cache(jdb: "JobDatabase"):
+    from src.account_cache import normalize_company_name
+
+    if "account_cache" not in jdb.db.table_names():
+        jdb.db["account_cache"].create(
+            {"name_key": str, "company_name": str, "account_id": str, "cached_at": str},
+            pk="name_key",
+        )
+
+    # Seed with the accounts synced jobs were filed under; later syncs win
+    def seed(rows):
+        jdb.db["account_cache"].insert_all(
+            (
+                {
+                    "name_key": normalize_company_name(company_name),
+                    "company_name": company_name,
+                    "account_id": account_id,
+                    "cached_at": synced_at,
+                }
+                for _, company_name, account_id, synced_at in rows
+            ),
+            replace=True,
+        )
+
+    backfill(
+        jdb,
+        "SELECT rowid, company_name, account_id, synced_at FROM jobs "
+        "WHERE rowid > ? AND account_id IS NOT NULL AND synced_at IS NOT NULL ORDER BY rowid LIMIT ?",
+        0,
+        seed,
+    )
+
+
+def _create_sync_outbox(jdb: "JobDatabase"):
+    # One row per accepted job waiting for the CRM, leased by sync workers.
+    # Triggers keep it in step with jobs however they are written: rows come
+    # in with unsynced accepted jobs and leave once synced, rejected or deleted
+    if "sync_outbox" not in jdb.db.table_names():
+        jdb.db["sync_outbox"].create(
+            {
+                "source": str,
+                "source_id": str,
+                "enqueued_at": str,
+                "available_at": str,  # NULL: now; set to back off after a failure
+                "attempts": int,
+                "lease_owner": str,
+                "lease_until": str,
+                "last_error": str,
+                "dead_at": str,  # set once attempts run out
+            },
+            pk=["source", "source_id"],
+            not_null={"attempts"},
+            defaults={"attempts": 0},
+        )
+        jdb.db["sync_outbox"].create_index(["dead_at", "available_at"])
+    enqueue = (
+        "INSERT OR IGNORE INTO sync_outbox (source, source_id, enqueued_at) "
+        "VALUES (new.source, new.source_id, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))"
+    )
+    pending = "new.synced_at IS NULL AND new.rejection_reason IS NULL"
+    for name, event, when, action in [
+        ("sync_outbox_insert", "INSERT", pending, enqueue),
+        ("sync_outbox_accept", "UPDATE OF synced_at, rejection_reason", pending, enqueue),
+        (
+            "sync_outbox_done",
+            "UPDATE OF synced_at, rejection_reason",
+            f"NOT ({pending})",
+            "DELETE FROM sync_outbox WHERE source = new.source AND source_id = new.source_id",
+        ),
+        (
+            "sync_outbox_delete",
+            "DELETE",
+            "1",
+            "DELETE FROM sync_outbox WHERE source = old.source AND source_id = old.source_id",
+        ),
+    ]:
+        jdb.db.execute(f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON jobs WHEN {when} BEGIN {action}; END")
+    jdb.db.execute(
+        "INSERT OR IGNORE INTO sync_outbox (source, source_id, enqueued_at) "
+        "SELECT source, source_id, scraped_at FROM jobs WHERE synced_at IS NULL AND rejection_reason IS NULL"
+    )
+
+
+def _external_content_jobs_fts(jdb: "JobDatabase"):
+    # The jobs_fts of step 7 keeps its own uncompressed copy of every
+    # description, as large as the data column itself. Rebuild it as an
+    # external-content index over a view that decodes descriptions from
+    # jobs.data with job_description() (registered by JobDatabase), so only
+    # the index is stored. External content can't be deleted by rowid once
+    # the job row is gone, so the trigger passes the old values instead;
+    # deleting jobs therefore needs a connection opened by JobDatabase.
+    fts_sql = jdb.db.execute("SELECT sql FROM sqlite_master WHERE name = 'jobs_fts'").fetchone()[0]
+    if "content=" not in fts_sql:
+        with jdb.db.atomic():
+            jdb.db.execute("DROP TRIGGER IF EXISTS jobs_fts_delete")
+            jdb.db.execute("DROP TABLE jobs_fts")
+            jdb.db.execute(
+                "CREATE VIEW IF NOT EXISTS job_texts AS SELECT rowid AS job_rowid, title, company_name, "
+                "job_description(data) AS description FROM jobs"
+            )
+            jdb.db.execute(
+                "CREATE VIRTUAL TABLE jobs_fts USING fts5("
+                "title, company_name, description, content='job_texts', content_rowid='job_rowid', "
+                "tokenize='porter unicode61')"
+            )
+            jdb.db.execute(
+                "CREATE TRIGGER jobs_fts_delete AFTER DELETE ON jobs BEGIN "
+                "INSERT INTO jobs_fts (jobs_fts, rowid, title, company_name, description) "
+                "VALUES ('delete', old.rowid, old.title, old.company_name, job_description(old.data)); END"
+            )
+    # Resume after the last job indexed by an interrupted run; the docsize
+    # shadow table has a row per indexed job (jobs_fts itself reads the view)
+    start = jdb.db.execute("SELECT COALESCE(MAX(id), 0) FROM jobs_fts_docsize").fetchone()[0]
+    _index_jobs_after(jdb, start)
+
+
+MIGRATIONS = [
+    Migration(1, "jobs table", _create_jobs),
+    Migration(2, "filter results on jobs, filter_configs", _add_filter_results),
+    Migration(3, "filter_decisions cache", _create_filter_decisions),
+    Migration(4, "filter_stage_stats", _create_filter_stage_stats),
+    Migration(5, "jobs stats indexes, runs", _add_stats_indexes_and_runs),
+    Migration(6, "data_dicts for compressed job data", _create_data_dicts),
+    Migration(7, "jobs_fts full-text index", _create_jobs_fts),
+    Migration(8, "archived_keys for compacted jobs", _create_archived_keys),
+    Migration(9, "account_cache seeded from synced jobs", _create_account_cache),
+    Migration(10, "sync_outbox with triggers, seeded from unsynced jobs", _create_sync_outbox),
+    Migration(11, "jobs_fts reads descriptions from jobs.data", _external_content_jobs_fts),
+]
+
+
+def schema_version(jdb: "JobDatabase") -> int:
+    if "schema_version" not in jdb.db.table_names():
+        return 0
+    return jdb.db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(jdb: "JobDatabase", migrations: list[Migration] = MIGRATIONS) -> list[int]:
+    """Apply the migrations newer than the DB's schema version, in order.
+
+    Steps are not wrapped in one transaction (that would defeat chunked
+    backfills); a step interrupted midway is simply rerun on the next open.
+    Returns the versions applied.
+    """
+    if "schema_version" not in jdb.db.table_names():
+        jdb.db["schema_version"].create(
+            {"version": int, "description": str, "applied_at": str},
+            pk="version",
+        )
+    current = schema_version(jdb)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        migration.apply(jdb)
+        jdb.db["schema_version"].insert(
+            {
+                "version": migration.version,
+                "description": migration.description,
+                "applied_at": datetime.now().isoformat(),
+            }
+        )
+        applied.append(migration.version)
+    return applied
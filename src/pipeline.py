@@ -1,21 +1,58 @@
+import asyncio
 import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
 from dotenv import load_dotenv
+import httpx
 from src.models import JobPost, Company
-from src.espo_client import EspoClient
+from src.account_cache import AccountCache, normalize_company_name
+from src.espo_client import BATCH_CONCURRENCY, AsyncEspoClient, EspoClient, RateLimiter
 from src.db import JobDatabase
-from src.filters import filter_job
+from src.filters import (
+    CompiledFilter,
+    FilterStats,
+    Rejection,
+    affected_decisions,
+    content_hash,
+    evaluate_jobs,
+    order_stages,
+)
+from src.scrapers.base import BaseScraper
 from src.scrapers.hn_hiring import HNHiringScraper
 from src.scrapers.wellfound import WellfoundScraper
 from src.scrapers.indeed import IndeedScraper
 
 load_dotenv("config/.env")
 
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+def _rate_limiter() -> Optional[RateLimiter]:
+    # ESPO_RATE_LIMIT=10 caps EspoCRM calls at 10/s on average, ESPO_BURST at once
+    rate = float(os.getenv("ESPO_RATE_LIMIT", "0"))
+    if rate <= 0:
+        return None
+    return RateLimiter(rate, int(os.getenv("ESPO_BURST", "0")) or None)
+
+
 espo = EspoClient(
     base_url=os.getenv("ESPO_URL", "http://192.168.68.68:8080"),
     username=os.getenv("ESPO_USER", "admin"),
     password=os.getenv("ESPO_PASS", "password"),
+    http2=_env_flag("ESPO_HTTP2"),
+    rate_limiter=_rate_limiter(),
 )
-db = JobDatabase()
+
+# PIPELINE_DB_WAL=1 trades durability of the last few commits on power loss
+# for far fewer fsyncs; PIPELINE_DB_COMPRESS=1 stores job data compressed
+db = JobDatabase(wal=_env_flag("PIPELINE_DB_WAL"), compress=_env_flag("PIPELINE_DB_COMPRESS"))
 
 
 def get_scraper(source: str):
@@ -27,6 +64,54 @@ def get_scraper(source: str):
     return scrapers.get(source)
 
 
+# Seconds a source may take before the run goes on without it
+SCRAPE_TIMEOUTS = {"hn_hiring": 120, "indeed": 600, "wellfound": 900}
+DEFAULT_SCRAPE_TIMEOUT = 600
+
+
+def scrape_sources(
+    scrapers: dict[str, BaseScraper], timeouts: dict[str, float] = SCRAPE_TIMEOUTS
+) -> Iterator[tuple[str, list[JobPost]]]:
+    """Run the scrapers at once, yielding (source, jobs) as each finishes.
+
+    A source that fails or overruns its timeout is reported and skipped. Its
+    thread is a daemon that is abandoned, not joined (threads can't be
+    cancelled), so a hung scraper holds up neither the run nor the exit.
+    """
+    results = queue.Queue()
+
+    def scrape(source: str, scraper: BaseScraper):
+        try:
+            results.put((source, scraper.scrape(), None))
+        except Exception as e:
+            results.put((source, None, e))
+
+    started = time.monotonic()
+    deadlines = {}
+    for source, scraper in scrapers.items():
+        print(f"Scraping {source}...")
+        deadlines[source] = started + timeouts.get(source, DEFAULT_SCRAPE_TIMEOUT)
+        threading.Thread(target=scrape, args=(source, scraper), name=f"scrape-{source}", daemon=True).start()
+
+    while deadlines:
+        wait = max(0.0, min(deadlines.values()) - time.monotonic())
+        try:
+            source, jobs, error = results.get(timeout=wait)
+        except queue.Empty:
+            now = time.monotonic()
+            for source in [source for source, deadline in deadlines.items() if deadline <= now]:
+                del deadlines[source]
+                print(f"Error scraping {source}: no result after {now - started:.0f}s, skipped")
+            continue
+        if deadlines.pop(source, None) is None:
+            continue  # finished after its timeout
+        if error:
+            print(f"Error scraping {source}: {error}")
+            continue
+        print(f"Found {len(jobs)} jobs on {source} in {time.monotonic() - started:.1f}s")
+        yield source, jobs
+
+
 def load_filter_config() -> dict:
     import yaml
 
@@ -37,67 +122,653 @@ def load_filter_config() -> dict:
         return {}
 
 
-def sync_to_crm(job: JobPost) -> bool:
-    """Sync job to CRM as Opportunity. Returns True on success, False on failure."""
-    try:
-        # Find or create Account (company)
+def drop_duplicates(jobs: list[JobPost]) -> list[JobPost]:
+    """Jobs not yet stored as accepted, and not repeated within the batch"""
+    ids_by_source: dict[str, list[str]] = {}
+    for job in jobs:
+        ids_by_source.setdefault(job.source, []).append(job.source_id)
+    seen = {
+        (source, source_id)
+        for source, ids in ids_by_source.items()
+        for source_id in db.existing_keys(source, ids)
+    }
+    fresh = []
+    for job in jobs:
+        key = (job.source, job.source_id)
+        if key not in seen:
+            seen.add(key)
+            fresh.append(job)
+    return fresh
+
+
+# Share of evaluated jobs traced with explain() to measure stage costs
+STAGE_SAMPLE_EVERY = 20
+
+
+def apply_filters(
+    jobs: list[JobPost],
+    job_filter: CompiledFilter,
+    workers: int = None,
+    sample_stats: Optional[FilterStats] = None,
+) -> list[Optional[Rejection]]:
+    """Filter jobs, returning each one's Rejection (None if it passed).
+
+    Reuses cached decisions for jobs whose content and relevant filter config
+    are unchanged since they were last evaluated. If sample_stats is given,
+    every STAGE_SAMPLE_EVERY-th evaluated job is also traced into it.
+    """
+    hashes = [content_hash(job) for job in jobs]
+    cached = {}
+    for source in {job.source for job in jobs}:
+        ids = [job.source_id for job in jobs if job.source == source]
+        for source_id, row in db.get_filter_decisions(source, ids).items():
+            cached[(source, source_id)] = row
+
+    results = [None] * len(jobs)
+    misses = []
+    for i, job in enumerate(jobs):
+        row = cached.get((job.source, job.source_id))
+        if (
+            row
+            and row["content_hash"] == hashes[i]
+            and row["config_hash"] == job_filter.decision_hash(row["rejected_stage"])
+        ):
+            if row["rejected_stage"]:
+                results[i] = Rejection(row["rejected_stage"], row["rejection_reason"])
+        else:
+            misses.append(i)
+
+    rejections = evaluate_jobs(
+        [jobs[i] for i in misses], job_filter.config, workers=workers, stage_order=job_filter.stage_order
+    )
+    if sample_stats is not None:
+        for i in misses[::STAGE_SAMPLE_EVERY]:
+            sample_stats.add(job_filter.explain(jobs[i]))
+    decisions = []
+    for i, rejection in zip(misses, rejections):
+        results[i] = rejection
+        stage = rejection.stage if rejection else None
+        decisions.append(
+            {
+                "source": jobs[i].source,
+                "source_id": jobs[i].source_id,
+                "content_hash": hashes[i],
+                "rejected_stage": stage,
+                "rejection_reason": rejection.reason if rejection else None,
+                "config_hash": job_filter.decision_hash(stage),
+            }
+        )
+    if decisions:
+        db.save_filter_decisions(decisions)
+    if jobs:
+        print(f"Filter cache: {len(jobs) - len(misses)} hits, {len(misses)} evaluated")
+    return results
+
+
+# Synced jobs recorded per mark_synced_many transaction
+SYNC_FLUSH_EVERY = 50
+
+# With at least this many uncached companies to sync, page through all CRM
+# accounts (one request per 200) instead of looking each company up
+ACCOUNT_PREFETCH_THRESHOLD = 50
+
+# Sync outbox: jobs leased per batch, how long a lease outlives a silent
+# worker, and how often and how patiently failed syncs are retried (the
+# delay doubles with each attempt) before they are dead-lettered
+SYNC_BATCH_SIZE = 50
+SYNC_LEASE_SECONDS = 300
+SYNC_MAX_ATTEMPTS = 5
+SYNC_RETRY_DELAY = 60
+
+
+def _new_company(job: JobPost) -> Company:
+    return Company(
+        name=job.company_name,
+        website=job.company_website,
+        description=f"Tech: {', '.join(job.tech_stack)}",
+    )
+
+
+def _synced_row(job: JobPost, account_id: str, opportunity_id: str) -> dict:
+    return {
+        "source": job.source,
+        "source_id": job.source_id,
+        "account_id": account_id,
+        "contact_id": opportunity_id,
+    }
+
+
+def _find_or_create_account(job: JobPost, accounts: Optional[AccountCache]) -> tuple[str, bool]:
+    """Account ID for the job's company and whether it came from the cache"""
+    account = None
+    if accounts is not None:
+        account_id = accounts.get(job.company_name)
+        if account_id:
+            return account_id, True
+    # A prefetched cache holds every account, so a miss needs no lookup
+    if accounts is None or not accounts.prefetched:
         account = espo.find_account(job.company_name)
-        if account:
-            account_id = account["id"]
+    if account:
+        account_id = account["id"]
+    else:
+        account_id = espo.create_account(_new_company(job))
+    if accounts is not None:
+        accounts.put(job.company_name, account_id)
+    return account_id, False
+
+
+def prefetch_accounts(
+    company_names: Iterable[str], accounts: AccountCache, threshold: int = ACCOUNT_PREFETCH_THRESHOLD
+) -> bool:
+    """Load every CRM account into accounts if at least threshold of
+    company_names are uncached; returns whether it did"""
+    if accounts.prefetched or len(accounts.missing(company_names)) < threshold:
+        return False
+    try:
+        loaded = accounts.prefetch(espo.list_accounts())
+    except Exception as e:
+        print(f"Error prefetching CRM accounts, looking them up one by one: {e}")
+        return False
+    print(f"Prefetched {loaded} CRM accounts")
+    return True
+
+
+def _is_stale_account(error: Exception, cached: bool) -> bool:
+    # A cached Account that was deleted or merged away in the CRM
+    return cached and isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404
+
+
+def _failure_row(job: JobPost, error: Exception) -> dict:
+    return {"source": job.source, "source_id": job.source_id, "error": str(error)[:500]}
+
+
+def _renew_leases(jobs: list[JobPost], owner: Optional[str]) -> list[JobPost]:
+    """The jobs whose outbox lease owner still holds, with the lease renewed.
+
+    A worker slower than SYNC_LEASE_SECONDS can lose a lease to another
+    worker; the job is then left to that worker instead of synced twice.
+    Without an owner (not draining the outbox) every job is kept.
+    """
+    if owner is None:
+        return jobs
+    held = db.renew_sync_leases(owner, [(job.source, job.source_id) for job in jobs], SYNC_LEASE_SECONDS)
+    kept = []
+    for job in jobs:
+        if (job.source, job.source_id) in held:
+            kept.append(job)
         else:
-            company = Company(
-                name=job.company_name,
-                website=job.company_website,
-                description=f"Tech: {', '.join(job.tech_stack)}",
-            )
-            account_id = espo.create_account(company)
+            print(f"  Skipping {job.company_name} - {job.title}: leased to another worker")
+    return kept
+
+
+def sync_to_crm(
+    job: JobPost,
+    synced: Optional[list[dict]] = None,
+    accounts: Optional[AccountCache] = None,
+    failures: Optional[list[dict]] = None,
+) -> bool:
+    """Sync job to CRM as Opportunity. Returns True on success, False on failure.
+
+    If synced is given, the sync is appended to it for a later
+    db.mark_synced_many instead of being written immediately, and a failure
+    with its error to failures if that is given. With an AccountCache,
+    companies seen before skip the Account lookup; if the CRM answers 404
+    for a cached account it is forgotten and looked up again.
+    """
+    try:
+        # Find or create Account (company)
+        account_id, cached = _find_or_create_account(job, accounts)
 
         # Create Opportunity (job application)
-        opportunity_id = espo.create_opportunity(job, account_id)
+        try:
+            opportunity_id = espo.create_opportunity(job, account_id)
+        except Exception as e:
+            if not _is_stale_account(e, cached):
+                raise
+            accounts.invalidate(job.company_name)
+            account_id, _ = _find_or_create_account(job, accounts)
+            opportunity_id = espo.create_opportunity(job, account_id)
 
         # Log sync
-        db.mark_synced(job.source, job.source_id, account_id, opportunity_id)
+        if synced is None:
+            db.mark_synced(job.source, job.source_id, account_id, opportunity_id)
+        else:
+            synced.append(_synced_row(job, account_id, opportunity_id))
+        return True
+    except Exception as e:
+        print(f"  Error syncing {job.company_name}: {e}")
+        if failures is not None:
+            failures.append(_failure_row(job, e))
+        return False
+
+
+async def _find_or_create_account_async(
+    client: AsyncEspoClient, job: JobPost, accounts: Optional[AccountCache]
+) -> tuple[str, bool]:
+    account = None
+    if accounts is not None:
+        account_id = accounts.get(job.company_name)
+        if account_id:
+            return account_id, True
+    if accounts is None or not accounts.prefetched:
+        account = await client.find_account(job.company_name)
+    if account:
+        account_id = account["id"]
+    else:
+        account_id = await client.create_account(_new_company(job))
+    if accounts is not None:
+        accounts.put(job.company_name, account_id)
+    return account_id, False
+
+
+async def sync_to_crm_async(
+    client: AsyncEspoClient,
+    job: JobPost,
+    synced: list[dict],
+    accounts: Optional[AccountCache] = None,
+    failures: Optional[list[dict]] = None,
+) -> bool:
+    """sync_to_crm over an AsyncEspoClient; the sync is appended to synced"""
+    try:
+        account_id, cached = await _find_or_create_account_async(client, job, accounts)
+        try:
+            opportunity_id = await client.create_opportunity(job, account_id)
+        except Exception as e:
+            if not _is_stale_account(e, cached):
+                raise
+            accounts.invalidate(job.company_name)
+            account_id, _ = await _find_or_create_account_async(client, job, accounts)
+            opportunity_id = await client.create_opportunity(job, account_id)
+        synced.append(_synced_row(job, account_id, opportunity_id))
         return True
     except Exception as e:
         print(f"  Error syncing {job.company_name}: {e}")
+        if failures is not None:
+            failures.append(_failure_row(job, e))
         return False
 
 
-def run_pipeline(sources: list[str], dry_run: bool = False):
-    filter_config = load_filter_config()
+def sync_jobs(
+    jobs: list[JobPost],
+    accounts: Optional[AccountCache] = None,
+    failures: Optional[list[dict]] = None,
+    owner: Optional[str] = None,
+) -> tuple[int, int]:
+    """Sync jobs one after another, recording them in batches; returns
+    (synced, failed). With the owner of their outbox leases, each lease is
+    renewed before its job is synced, and jobs lost to another worker are
+    skipped."""
+    synced = 0
+    failed = 0
+    pending = []
+    try:
+        for job in jobs:
+            if not _renew_leases([job], owner):
+                continue
+            if sync_to_crm(job, synced=pending, accounts=accounts, failures=failures):
+                print(f"Synced: {job.company_name} - {job.title}")
+                synced += 1
+            else:
+                failed += 1
+            if len(pending) >= SYNC_FLUSH_EVERY:
+                db.mark_synced_many(pending, owner)
+                pending.clear()
+    finally:
+        if pending:
+            db.mark_synced_many(pending, owner)
+    return synced, failed
+
+
+def sync_jobs_batched(
+    jobs: list[JobPost],
+    concurrency: int = BATCH_CONCURRENCY,
+    accounts: Optional[AccountCache] = None,
+    failures: Optional[list[dict]] = None,
+    owner: Optional[str] = None,
+) -> tuple[int, int]:
+    """Sync jobs in three concurrent waves instead of job by job: look up the
+    uncached companies, create the missing Accounts, then create every
+    Opportunity. Only the jobs whose Opportunity was created are marked
+    synced; returns (synced, failed). With owner, outbox leases are renewed
+    before the Opportunity wave, as in sync_jobs."""
+    if accounts is None:
+        accounts = AccountCache(db)
+    by_company: dict[str, list[JobPost]] = {}
+    for job in jobs:
+        by_company.setdefault(normalize_company_name(job.company_name), []).append(job)
+
+    failed = 0
+
+    def fail(company_jobs: list[JobPost], error: Exception):
+        nonlocal failed
+        print(f"  Error syncing {company_jobs[0].company_name}: {error}")
+        failed += len(company_jobs)
+        if failures is not None:
+            failures.extend(_failure_row(job, error) for job in company_jobs)
+
+    account_ids = {}
+    cached = set()
+    for key, company_jobs in by_company.items():
+        account_id = accounts.get(company_jobs[0].company_name)
+        if account_id:
+            account_ids[key] = account_id
+            cached.add(key)
+
+    unresolved = [key for key in by_company if key not in account_ids]
+    if unresolved and not accounts.prefetched:
+        found = espo.find_accounts([by_company[key][0].company_name for key in unresolved], concurrency)
+        missing = []
+        for key, result in zip(unresolved, found):
+            if not result.ok:
+                fail(by_company[key], result.error)
+            elif result.value:
+                account_ids[key] = result.value["id"]
+                accounts.put(by_company[key][0].company_name, account_ids[key])
+            else:
+                missing.append(key)
+        unresolved = missing
+    created = espo.create_accounts([_new_company(by_company[key][0]) for key in unresolved], concurrency)
+    for key, result in zip(unresolved, created):
+        if result.ok:
+            account_ids[key] = result.value
+            accounts.put(by_company[key][0].company_name, result.value)
+        else:
+            fail(by_company[key], result.error)
+
+    ready = [job for key, company_jobs in by_company.items() if key in account_ids for job in company_jobs]
+    ready = _renew_leases(ready, owner)
+    keys = [normalize_company_name(job.company_name) for job in ready]
+    results = espo.create_opportunities([(job, account_ids[key]) for job, key in zip(ready, keys)], concurrency)
+    synced = []
+    for job, key, result in zip(ready, keys, results):
+        if result.ok:
+            print(f"Synced: {job.company_name} - {job.title}")
+            synced.append(_synced_row(job, account_ids[key], result.value))
+            continue
+        if _is_stale_account(result.error, key in cached):
+            # Looked up afresh when the outbox retries the job
+            accounts.invalidate(job.company_name)
+            cached.discard(key)
+        fail([job], result.error)
+    if synced:
+        db.mark_synced_many(synced, owner)
+    return len(synced), failed
+
+
+def _async_espo(concurrency: int) -> AsyncEspoClient:
+    # Shares the rate limit, retry policy and counters of the sync client
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return AsyncEspoClient(
+        espo.base_url,
+        *espo.auth,
+        limits=limits,
+        http2=espo.http2,
+        rate_limiter=espo.rate_limiter,
+        retry=espo.retry,
+        stats=espo.stats,
+    )
+
+
+async def sync_jobs_async(
+    jobs: list[JobPost],
+    concurrency: int,
+    client: Optional[AsyncEspoClient] = None,
+    accounts: Optional[AccountCache] = None,
+    failures: Optional[list[dict]] = None,
+    owner: Optional[str] = None,
+) -> tuple[int, int]:
+    """Sync up to concurrency jobs at a time; returns (synced, failed).
+
+    Jobs of the same company run one after another, so the first creates the
+    Account and the rest find it instead of creating duplicates. With owner,
+    outbox leases are renewed as in sync_jobs.
+    """
+    if client is None:
+        async with _async_espo(concurrency) as client:
+            return await sync_jobs_async(jobs, concurrency, client, accounts, failures, owner)
+
+    slots = asyncio.Semaphore(concurrency)
+    company_locks: dict[str, asyncio.Lock] = {}
+    pending = []
+    counts = {"synced": 0, "failed": 0}
+
+    async def sync_one(job: JobPost):
+        # Wait for the company before taking a slot, so queued jobs of a busy
+        # company don't hold slots other companies could use
+        async with company_locks.setdefault(normalize_company_name(job.company_name), asyncio.Lock()):
+            async with slots:
+                if not _renew_leases([job], owner):
+                    return
+                ok = await sync_to_crm_async(client, job, pending, accounts, failures)
+        if ok:
+            print(f"Synced: {job.company_name} - {job.title}")
+            counts["synced"] += 1
+        else:
+            counts["failed"] += 1
+        if len(pending) >= SYNC_FLUSH_EVERY:
+            db.mark_synced_many(pending, owner)
+            pending.clear()
+
+    try:
+        await asyncio.gather(*(sync_one(job) for job in jobs))
+    finally:
+        if pending:
+            db.mark_synced_many(pending, owner)
+    return counts["synced"], counts["failed"]
+
+
+def drain_outbox(
+    concurrency: int = 1,
+    batch_size: int = SYNC_BATCH_SIZE,
+    max_attempts: int = SYNC_MAX_ATTEMPTS,
+    accounts: Optional[AccountCache] = None,
+    batch_create: bool = False,
+) -> tuple[int, int]:
+    """Sync the jobs waiting in the outbox, a leased batch at a time, until
+    none are due; returns (synced, failed).
+
+    Several workers, in this process or others, can drain at once: each
+    batch is leased to one of them, and each lease is renewed as its job is
+    synced, so a slow worker never syncs a job another one took over. Failed
+    jobs go back in the outbox to be retried later, and are dead-lettered
+    after max_attempts failures. With batch_create each batch goes through
+    sync_jobs_batched, concurrency requests at a time.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    if accounts is None:
+        accounts = AccountCache(db)
+    prefetch_accounts(db.outbox_company_names(), accounts)
+    try:
+        if concurrency > 1 and not batch_create:
+            return asyncio.run(_drain_outbox_async(owner, concurrency, batch_size, max_attempts, accounts))
+        synced = 0
+        failed = 0
+        while jobs := db.claim_sync_batch(owner, batch_size, SYNC_LEASE_SECONDS):
+            failures = []
+            if batch_create:
+                batch_synced, batch_failed = sync_jobs_batched(jobs, concurrency, accounts, failures, owner)
+            else:
+                batch_synced, batch_failed = sync_jobs(jobs, accounts, failures, owner)
+            db.record_sync_failures(failures, max_attempts, SYNC_RETRY_DELAY, owner)
+            synced += batch_synced
+            failed += batch_failed
+        return synced, failed
+    finally:
+        # Jobs claimed but not finished, e.g. after Ctrl-C, are free again
+        db.release_sync_leases(owner)
+
+
+async def _drain_outbox_async(
+    owner: str, concurrency: int, batch_size: int, max_attempts: int, accounts: AccountCache
+) -> tuple[int, int]:
+    synced = 0
+    failed = 0
+    async with _async_espo(concurrency) as client:
+        # Lease enough to keep every connection busy
+        while jobs := db.claim_sync_batch(owner, max(batch_size, concurrency), SYNC_LEASE_SECONDS):
+            failures = []
+            batch_synced, batch_failed = await sync_jobs_async(
+                jobs, concurrency, client, accounts, failures, owner
+            )
+            db.record_sync_failures(failures, max_attempts, SYNC_RETRY_DELAY, owner)
+            synced += batch_synced
+            failed += batch_failed
+    return synced, failed
+
+
+def run_pipeline(
+    sources: list[str],
+    dry_run: bool = False,
+    workers: int = None,
+    explain: bool = False,
+    adaptive: bool = False,
+    concurrency: int = 1,
+    sync: bool = True,
+    scrape_timeouts: dict[str, float] = SCRAPE_TIMEOUTS,
+) -> Optional[FilterStats]:
+    """Scrape, filter, dedup and sync.
+
+    Sources are scraped concurrently (see scrape_sources) and each is
+    filtered and saved as soon as it finishes.
+
+    Accepted jobs are saved to the sync outbox as each source is scraped,
+    and the outbox is drained (see drain_outbox) once all sources are done,
+    so scraping never waits on the CRM. With sync=False the jobs are left
+    in the outbox for a separate ``cli.py sync`` worker. With concurrency
+    above 1 up to that many jobs are synced to the CRM at once.
+
+    With explain=True every job is run through CompiledFilter.explain and the
+    aggregate FilterStats is returned. With adaptive=True filter stages run in
+    the order learned from previous runs' stage stats, and this run's sampled
+    stats are stored for the next one.
+    """
+    stage_order = None
+    if adaptive:
+        stage_order = order_stages(db.get_stage_stats())
+        print(f"Filter stage order: {', '.join(stage_order)}")
+    job_filter = CompiledFilter(load_filter_config(), stage_order)
+    db.save_filter_config(job_filter.config_hash, job_filter.config)
+    stats = FilterStats(keyword_lists=job_filter.keyword_lists) if explain or adaptive else None
+    accounts = AccountCache(db)
     synced = 0
     failed = 0
+    scraped = 0
+    new = 0
+    rejected = 0
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
 
+    scrapers = {}
     for source in sources:
         scraper = get_scraper(source)
-        if not scraper:
+        if scraper:
+            scrapers[source] = scraper
+        else:
             print(f"Unknown source: {source}")
-            continue
 
-        print(f"Scraping {source}...")
-        try:
-            jobs = scraper.scrape()
-        except Exception as e:
-            print(f"Error scraping {source}: {e}")
-            continue
-        print(f"Found {len(jobs)} jobs")
+    for source, jobs in scrape_sources(scrapers, scrape_timeouts):
+        scraped += len(jobs)
 
-        for job in jobs:
-            if not filter_job(job, filter_config):
-                continue
-            if db.is_duplicate(job):
+        jobs = drop_duplicates(jobs)
+        new += len(jobs)
+        if explain:
+            decisions = [job_filter.explain(job) for job in jobs]
+            for decision in decisions:
+                stats.add(decision)
+            rejections = [decision.rejection for decision in decisions]
+        else:
+            rejections = apply_filters(jobs, job_filter, workers=workers, sample_stats=stats)
+        # Record every job of this source in one transaction; accepted ones
+        # land in the sync outbox with it, so a crash loses none of them
+        to_save = []
+        for job, rejection in zip(jobs, rejections):
+            if rejection:
+                rejected += 1
+                if not dry_run:
+                    to_save.append(
+                        {
+                            "job": job,
+                            "rejected_stage": rejection.stage,
+                            "rejection_reason": rejection.reason,
+                            "filter_hash": job_filter.config_hash,
+                        }
+                    )
                 continue
 
             if dry_run:
                 print(f"[DRY RUN] Would sync: {job.company_name} - {job.title}")
                 synced += 1
             else:
-                db.save_job(job)
-                if sync_to_crm(job):
-                    print(f"Synced: {job.company_name} - {job.title}")
-                    synced += 1
-                else:
-                    failed += 1
+                to_save.append({"job": job, "filter_hash": job_filter.config_hash})
+        if to_save:
+            db.save_jobs(to_save)
+
+    if not dry_run and sync:
+        synced, failed = drain_outbox(concurrency, accounts=accounts)
 
     if not dry_run:
         print(f"\nDone: {synced} synced, {failed} failed")
+        print(f"Account cache: {accounts.summary()}")
+        print(f"EspoCRM: {espo.stats.summary()}")
+        db.record_run(
+            {
+                "started_at": started_at,
+                "sources": ",".join(sources),
+                "seconds": time.perf_counter() - started,
+                "scraped": scraped,
+                "new": new,
+                "rejected": rejected,
+                "synced": synced,
+                "failed": failed,
+            }
+        )
+    if adaptive and stats.jobs:
+        db.record_stage_stats(stats.stage_totals())
+    return stats if explain else None
+
+
+def refilter_stored_jobs(dry_run: bool = False) -> tuple[list[dict], list[dict]]:
+    """Re-evaluate stored jobs against the current filter config, without scraping.
+
+    Only jobs whose decision the config change can flip are re-checked (see
+    affected_decisions). Returns (newly passing, newly failing) job rows.
+    """
+    job_filter = CompiledFilter(load_filter_config())
+    newly_passing = []
+    newly_failing = []
+
+    for old_hash in db.filter_hashes():
+        if old_hash == job_filter.config_hash:
+            continue
+        old_config = db.get_filter_config(old_hash) if old_hash else None
+        if old_config is None:
+            # Evaluated with an unknown config: re-check everything
+            recheck_passing, recheck_stages = True, set(CompiledFilter.STAGES)
+        else:
+            recheck_passing, recheck_stages = affected_decisions(old_config, job_filter.config)
+
+        rows = db.jobs_to_refilter(old_hash, recheck_passing, recheck_stages)
+        results = []
+        for row in rows:
+            rejection = job_filter.evaluate(JobPost.model_validate_json(row["data"]))
+            was_passing = row["rejection_reason"] is None
+            if was_passing and rejection:
+                newly_failing.append({**row, "rejection_reason": str(rejection)})
+            elif not was_passing and not rejection:
+                newly_passing.append(row)
+            results.append(
+                {
+                    "source": row["source"],
+                    "source_id": row["source_id"],
+                    "rejected_stage": rejection.stage if rejection else None,
+                    "rejection_reason": rejection.reason if rejection else None,
+                }
+            )
+
+        if not dry_run:
+            db.update_filter_results(results, job_filter.config_hash)
+            db.retag_filter_hash(old_hash, job_filter.config_hash)
+
+    if not dry_run:
+        db.save_filter_config(job_filter.config_hash, job_filter.config)
+    return newly_passing, newly_failing
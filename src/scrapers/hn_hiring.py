@@ -3,47 +3,13 @@ import httpx
 from typing import Optional
 from src.scrapers.base import BaseScraper
 from src.models import JobPost
+from src.tech import extract_tech_stack
 
 
 class HNHiringScraper(BaseScraper):
     ALGOLIA_SEARCH = "https://hn.algolia.com/api/v1/search_by_date"
     ALGOLIA_ITEM = "https://hn.algolia.com/api/v1/items"
 
-    TECH_KEYWORDS = [
-        "python",
-        "javascript",
-        "typescript",
-        "go",
-        "golang",
-        "rust",
-        "java",
-        "ruby",
-        "php",
-        "c++",
-        "c#",
-        "swift",
-        "kotlin",
-        "scala",
-        "react",
-        "vue",
-        "angular",
-        "node",
-        "django",
-        "flask",
-        "rails",
-        "postgresql",
-        "mysql",
-        "mongodb",
-        "redis",
-        "elasticsearch",
-        "aws",
-        "gcp",
-        "azure",
-        "docker",
-        "kubernetes",
-        "terraform",
-    ]
-
     def get_latest_thread_id(self) -> str:
         """Find the most recent 'Who is hiring' thread posted by whoishiring bot"""
         params = {"tags": "story,ask_hn,author_whoishiring", "hitsPerPage": 5}
@@ -87,12 +53,7 @@ class HNHiringScraper(BaseScraper):
 
     def parse_tech_stack(self, text: str) -> list[str]:
         """Extract known technologies from text"""
-        text_lower = text.lower()
-        found = []
-        for tech in self.TECH_KEYWORDS:
-            if tech in text_lower:
-                found.append(tech)
-        return found
+        return extract_tech_stack(text)
 
     def parse_email(self, text: str) -> Optional[str]:
         """Extract email address if present"""
@@ -1,4 +1,3 @@
-import re
 import time
 import os
 from datetime import datetime
@@ -6,19 +5,7 @@ from typing import Optional
 import httpx
 from src.scrapers.base import BaseScraper
 from src.models import JobPost
-
-# Common tech keywords to extract from descriptions
-TECH_KEYWORDS = [
-    "python", "javascript", "typescript", "java", "c++", "c#", "go", "golang",
-    "rust", "ruby", "php", "swift", "kotlin", "scala", "r",
-    "react", "angular", "vue", "next.js", "nextjs", "node.js", "nodejs", "express",
-    "django", "flask", "fastapi", "spring", "rails",
-    "aws", "azure", "gcp", "google cloud", "kubernetes", "k8s", "docker",
-    "postgresql", "postgres", "mysql", "mongodb", "redis", "elasticsearch",
-    "graphql", "rest", "api",
-    "machine learning", "ml", "ai", "llm", "gpt", "openai", "langchain",
-    "tensorflow", "pytorch", "pandas", "numpy",
-]
+from src.tech import extract_tech_stack
 
 
 class IndeedScraper(BaseScraper):
@@ -66,16 +53,7 @@ class IndeedScraper(BaseScraper):
 
     def _extract_tech_stack(self, text: str) -> list[str]:
         """Extract tech keywords from job description"""
-        text_lower = text.lower()
-        found = []
-        for tech in TECH_KEYWORDS:
-            # Use word boundary matching for short terms
-            if len(tech) <= 3:
-                if re.search(rf"\b{re.escape(tech)}\b", text_lower):
-                    found.append(tech)
-            elif tech in text_lower:
-                found.append(tech)
-        return found
+        return extract_tech_stack(text)
 
     def _is_remote(self, item: dict) -> bool:
         """Check if job is remote from API data and description"""
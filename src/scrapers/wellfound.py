@@ -4,6 +4,7 @@ from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 from src.scrapers.base import BaseScraper
 from src.models import JobPost
+from src.tech import merge_tech_stack
 
 
 class WellfoundScraper(BaseScraper):
@@ -164,6 +165,11 @@ class WellfoundScraper(BaseScraper):
                             )
                             time.sleep(1)  # Rate limit
 
+                        # Card tags are sparse; add what the description mentions
+                        job_data["tech_stack"] = merge_tech_stack(
+                            job_data["tech_stack"], job_data["description"]
+                        )
+
                         jobs.append(
                             JobPost(
                                 source="wellfound",
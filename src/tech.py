@@ -0,0 +1,96 @@
+import re
+from typing import Iterable
+
+from src.filters import trie_pattern
+
+# Canonical technology name -> the spellings that mean it. Matching is
+# case-insensitive and only on whole words, so "go" does not match "good".
+TECH_ALIASES: dict[str, tuple[str, ...]] = {
+    "python": ("python",),
+    "javascript": ("javascript",),
+    "typescript": ("typescript",),
+    "java": ("java",),
+    "c++": ("c++", "cpp"),
+    "c#": ("c#", "csharp"),
+    "go": ("go", "golang"),
+    "rust": ("rust",),
+    "ruby": ("ruby", "ruby on rails"),
+    "php": ("php",),
+    "swift": ("swift",),
+    "kotlin": ("kotlin",),
+    "scala": ("scala",),
+    "react": ("react", "reactjs", "react.js"),
+    "angular": ("angular", "angularjs", "angular.js"),
+    "vue": ("vue", "vuejs", "vue.js"),
+    "next.js": ("next.js", "nextjs"),
+    "node.js": ("node", "nodejs", "node.js"),
+    "express": ("express", "express.js", "expressjs"),
+    "django": ("django",),
+    "flask": ("flask",),
+    "fastapi": ("fastapi",),
+    "spring": ("spring", "spring boot", "spring framework"),
+    "rails": ("rails", "ruby on rails"),
+    "aws": ("aws", "amazon web services"),
+    "azure": ("azure",),
+    "gcp": ("gcp", "google cloud", "google cloud platform"),
+    "kubernetes": ("kubernetes", "k8s"),
+    "docker": ("docker",),
+    "terraform": ("terraform",),
+    "postgresql": ("postgresql", "postgres"),
+    "mysql": ("mysql",),
+    "mongodb": ("mongodb", "mongo"),
+    "redis": ("redis",),
+    "elasticsearch": ("elasticsearch", "elastic search"),
+    "graphql": ("graphql",),
+    "rest": ("rest api", "rest apis", "restful"),
+    "api": ("api", "apis"),
+    "machine learning": ("machine learning", "ml"),
+    "ai": ("ai",),
+    "llm": ("llm", "llms"),
+    "gpt": ("gpt",),
+    "openai": ("openai",),
+    "langchain": ("langchain",),
+    "tensorflow": ("tensorflow",),
+    "pytorch": ("pytorch",),
+    "pandas": ("pandas",),
+    "numpy": ("numpy",),
+}
+
+
+class TechExtractor:
+    """Finds known technologies in free text and reports them by canonical name.
+
+    All aliases are compiled into one trie-shaped regex guarded by alphanumeric
+    lookarounds. The longest alias at a position wins ("google cloud platform" over
+    "google cloud"), "c++", "node.js" and "k8s" match, and "go" in "good" does not.
+    """
+
+    def __init__(self, aliases: dict[str, Iterable[str]] = TECH_ALIASES):
+        self.canonical: dict[str, list[str]] = {}
+        for name, spellings in aliases.items():
+            for spelling in spellings:
+                self.canonical.setdefault(spelling.lower(), []).append(name)
+        trie = trie_pattern(sorted(self.canonical))
+        self._pattern = re.compile(rf"(?<![a-z0-9])(?:{trie})(?![a-z0-9])")
+        self._order = {name: i for i, name in enumerate(aliases)}
+
+    def extract(self, text: str) -> list[str]:
+        """Canonical names of the technologies mentioned in text, in table order"""
+        found = set()
+        for spelling in set(self._pattern.findall(text.lower())):
+            found.update(self.canonical[spelling])
+        return sorted(found, key=self._order.__getitem__)
+
+    def merge(self, tags: Iterable[str], text: str) -> list[str]:
+        """Keep tags as given and append technologies found in text that they don't cover"""
+        merged = list(tags)
+        seen = {t.lower() for t in merged}
+        for tag in merged:
+            seen.update(self.extract(tag))
+        merged.extend(name for name in self.extract(text) if name not in seen)
+        return merged
+
+
+_default_extractor = TechExtractor()
+extract_tech_stack = _default_extractor.extract
+merge_tech_stack = _default_extractor.merge
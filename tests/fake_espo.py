@@ -0,0 +1,187 @@
+"""In-process stand-in for EspoCRM, for load tests and end-to-end tests of the
+sync path without a real CRM.
+
+It serves the parts of the REST API EspoClient uses: list (with equals and
+contains where clauses, select, maxSize, offset and orderBy) and create for
+Account, Contact and Opportunity, kept in memory. Latency, server errors and
+429s can be injected:
+
+    with FakeEspoCRM(latency=0.02, error_rate=0.01, throttle_rate=0.01) as crm:
+        client = EspoClient(crm.url, "admin", "password")
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+ENTITIES = ("Account", "Contact", "Opportunity")
+
+
+class FakeEspoCRM:
+    """A threaded HTTP server holding Account/Contact/Opportunity records.
+
+    latency is the seconds each request takes, or a (min, max) range to draw
+    from. error_rate and throttle_rate are the chances a request fails with a
+    503 or a 429 (with Retry-After: retry_after) before it is handled, so
+    injected failures never half-apply a create. Creating an Opportunity for
+    an unknown accountId answers 404, like a deleted account.
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.records: dict[str, list[dict]] = {entity: [] for entity in ENTITIES}
+        self.requests: Counter = Counter()  # (method, entity) -> count
+        self.injected: Counter = Counter()  # status -> count
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeEspoCRM":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self._random.uniform(*self.latency)
+        return self.latency
+
+    def _injected_status(self) -> Optional[int]:
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def add(self, entity: str, record: dict) -> dict:
+        """Store a record as the create endpoint would and return it"""
+        record = {
+            **record,
+            "id": uuid.uuid4().hex[:17],
+            "createdAt": datetime.now().isoformat(sep=" ", timespec="microseconds"),
+        }
+        with self._lock:
+            self.records[entity].append(record)
+        return record
+
+    def find(self, entity: str, params: dict[str, str]) -> dict:
+        """The list endpoint's response for query params"""
+        with self._lock:
+            rows = list(self.records[entity])
+        i = 0
+        while f"where[{i}][type]" in params:
+            kind = params[f"where[{i}][type]"]
+            attribute = params[f"where[{i}][attribute]"]
+            value = params.get(f"where[{i}][value]", "")
+            if kind == "equals":
+                rows = [row for row in rows if row.get(attribute) == value]
+            elif kind == "contains":
+                rows = [row for row in rows if value in (row.get(attribute) or "")]
+            i += 1
+        if "orderBy" in params:
+            rows.sort(key=lambda row: row.get(params["orderBy"]) or "", reverse=params.get("order") == "desc")
+        offset = int(params.get("offset", 0))
+        page = rows[offset : offset + int(params.get("maxSize", 20))]
+        if "select" in params:
+            fields = params["select"].split(",")
+            page = [{field: row.get(field) for field in fields} for row in page]
+        return {"total": len(rows), "list": page}
+
+    def account_exists(self, account_id: str) -> bool:
+        with self._lock:
+            return any(row["id"] == account_id for row in self.records["Account"])
+
+
+def _handler(crm: FakeEspoCRM) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def _reply(self, status: int, body: dict, headers: Optional[dict] = None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _route(self, method: str) -> Optional[tuple[str, dict]]:
+            """Entity and query params of the request, after latency and fault
+            injection; None if a reply was already sent"""
+            url = urlsplit(self.path)
+            entity = url.path.removeprefix("/api/v1/")
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with crm._lock:
+                crm.requests[method, entity] += 1
+            time.sleep(crm._delay())
+            if entity not in ENTITIES:
+                self._reply(404, {"message": f"Unknown entity {entity}"})
+                return None
+            status = crm._injected_status()
+            if status:
+                with crm._lock:
+                    crm.injected[status] += 1
+                headers = {"Retry-After": str(crm.retry_after)} if status == 429 else {}
+                self._reply(status, {"message": "Injected failure"}, headers)
+                return None
+            if method == "POST":
+                return entity, json.loads(body or b"{}")
+            return entity, {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        def do_GET(self):
+            routed = self._route("GET")
+            if routed:
+                self._reply(200, crm.find(*routed))
+
+        def do_POST(self):
+            routed = self._route("POST")
+            if not routed:
+                return
+            entity, data = routed
+            if entity == "Opportunity" and data.get("accountId") and not crm.account_exists(data["accountId"]):
+                self._reply(404, {"message": "Account not found"})
+                return
+            self._reply(200, crm.add(entity, data))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path):
+    from src.db import JobDatabase
+
+    return JobDatabase(str(tmp_path / "pipeline.db"))
+
+
+def _job(sample_job_data, source_id, company_name="Acme Corp"):
+    from src.models import JobPost
+
+    return JobPost(**{**sample_job_data, "source_id": source_id, "company_name": company_name})
+
+
+class TestAccountCache:
+    def test_name_variants_share_an_entry(self):
+        from src.account_cache import normalize_company_name
+
+        assert normalize_company_name("Acme, Inc.") == normalize_company_name("  acme   inc ")
+        assert normalize_company_name("Acme Inc") != normalize_company_name("Acme Labs")
+
+    def test_entries_persist_across_runs(self, db):
+        from src.account_cache import AccountCache
+
+        AccountCache(db).put("Acme Corp", "acc1")
+        cache = AccountCache(db)
+
+        assert cache.get("ACME corp.") == "acc1"
+        assert cache.get("Globex") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired_entries_miss(self, db):
+        from src.account_cache import AccountCache, normalize_company_name
+
+        stale = (datetime.now() - timedelta(days=31)).isoformat()
+        db.cache_account(normalize_company_name("Acme Corp"), "Acme Corp", "acc1", stale)
+
+        assert AccountCache(db).get("Acme Corp") is None
+        assert AccountCache(db, ttl=timedelta(days=60)).get("Acme Corp") == "acc1"
+
+    def test_invalidate_forgets_the_persisted_entry(self, db):
+        from src.account_cache import AccountCache
+
+        cache = AccountCache(db)
+        cache.put("Acme Corp", "acc1")
+        cache.invalidate("Acme Corp")
+
+        assert cache.get("Acme Corp") is None
+        assert AccountCache(db).get("Acme Corp") is None
+
+    def test_seeded_from_synced_jobs_on_upgrade(self, db, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.db import JobDatabase
+
+        db.save_jobs({"job": _job(sample_job_data, str(i))} for i in range(2))
+        db.mark_synced("hn_hiring", "1", "acc1", "opp1")
+        # As before the account_cache step
+        db.db["account_cache"].drop()
+        db.db.execute("DELETE FROM schema_version WHERE version >= 9")
+
+        upgraded = JobDatabase(db.path)
+
+        assert AccountCache(upgraded).get("Acme Corp") == "acc1"
+
+
+    def test_prefetch_replaces_the_cache(self, db):
+        from src.account_cache import AccountCache
+
+        AccountCache(db).put("Deleted Co", "gone")
+        cache = AccountCache(db)
+        loaded = cache.prefetch(
+            [{"id": "acc1", "name": "Acme Corp"}, {"id": "acc2", "name": "Globex"}, {"id": "dup", "name": "ACME corp"}]
+        )
+
+        assert loaded == 2
+        assert cache.prefetched
+        assert cache.missing(["acme corp.", "Globex", "Initech"]) == {"initech"}
+        assert (cache.hits, cache.misses) == (0, 0)
+        assert AccountCache(db).get("Acme Corp") == "acc1"
+        assert AccountCache(db).get("Deleted Co") is None
+
+
+class TestCachedSync:
+    def _not_found(self):
+        request = httpx.Request("POST", "http://crm/api/v1/Opportunity")
+        return httpx.HTTPStatusError("404 Not Found", request=request, response=httpx.Response(404, request=request))
+
+    def test_repeat_companies_skip_the_lookup(self, db, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.pipeline import sync_jobs
+
+        jobs = [_job(sample_job_data, str(i)) for i in range(3)]
+        db.save_jobs({"job": job} for job in jobs)
+        accounts = AccountCache(db)
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.find_account.return_value = {"id": "acc1"}
+            espo.create_opportunity.return_value = "opp"
+            assert sync_jobs(jobs, accounts) == (3, 0)
+
+        espo.find_account.assert_called_once()
+        assert (accounts.hits, accounts.misses) == (2, 1)
+
+    def test_stale_cached_account_is_looked_up_again(self, db, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.pipeline import sync_to_crm
+
+        job = _job(sample_job_data, "1")
+        db.save_jobs([{"job": job}])
+        accounts = AccountCache(db)
+        accounts.put("Acme Corp", "deleted")
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.find_account.return_value = {"id": "acc2"}
+            espo.create_opportunity.side_effect = [self._not_found(), "opp"]
+            assert sync_to_crm(job, accounts=accounts)
+
+        assert espo.create_opportunity.call_args.args == (job, "acc2")
+        assert accounts.invalidations == 1
+        assert db.get_job("hn_hiring", "1")["account_id"] == "acc2"
+        assert AccountCache(db).get("Acme Corp") == "acc2"
+
+    def test_prefetch_threshold(self, db, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.pipeline import prefetch_accounts
+
+        companies = ["Acme", "acme", "Globex"]
+        accounts = AccountCache(db)
+        accounts.put("Globex", "acc-globex")
+
+        with patch("src.pipeline.espo") as espo:
+            espo.list_accounts.return_value = iter([{"id": "acc-acme", "name": "Acme"}])
+            assert not prefetch_accounts(companies, accounts, threshold=2)
+            assert prefetch_accounts(companies, accounts, threshold=1)
+
+        espo.list_accounts.assert_called_once()
+
+    def test_prefetched_cache_only_calls_the_api_to_create(self, db, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.pipeline import sync_jobs
+
+        jobs = [_job(sample_job_data, str(i), company) for i, company in enumerate(["Acme", "Initech", "Initech"])]
+        db.save_jobs({"job": job} for job in jobs)
+        accounts = AccountCache(db)
+        accounts.prefetch([{"id": "acc-acme", "name": "Acme"}])
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.create_account.return_value = "acc-initech"
+            espo.create_opportunity.return_value = "opp"
+            assert sync_jobs(jobs, accounts) == (3, 0)
+
+        espo.find_account.assert_not_called()
+        espo.create_account.assert_called_once()
+        assert db.get_job("hn_hiring", "2")["account_id"] == "acc-initech"
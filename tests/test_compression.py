@@ -0,0 +1,33 @@
+class TestCompression:
+    def test_round_trip_without_dictionary(self):
+        from src.compression import decode, dict_id_of, encode
+
+        value = encode('{"title": "Engineer"}')
+        assert dict_id_of(value) == 0
+        assert decode(value) == '{"title": "Engineer"}'
+
+    def test_round_trip_with_dictionary(self):
+        from src.compression import decode, dict_id_of, encode, train_dictionary
+
+        boilerplate = "We are an equal opportunity employer and value diversity. "
+        samples = [f"Job {i} in team {i % 7}. {boilerplate}" for i in range(20)]
+        zdict = train_dictionary(samples)
+        value = encode(samples[3], zdict, dict_id=4)
+
+        assert boilerplate.strip().encode() in zdict
+        assert dict_id_of(value) == 4
+        assert len(value) < len(encode(samples[3]))
+        assert decode(value, zdict) == samples[3]
+
+    def test_plain_text_passes_through(self):
+        from src.compression import decode, dict_id_of
+
+        assert dict_id_of('{"title": "Engineer"}') is None
+        assert decode('{"title": "Engineer"}') == '{"title": "Engineer"}'
+
+    def test_dictionary_respects_size(self):
+        from src.compression import train_dictionary
+
+        samples = [f"Shared sentence number {n} for everyone." for n in range(500)] * 2
+        assert len(train_dictionary(samples, size=1024)) <= 1024
+        assert train_dictionary(["nothing repeats here."]) == b""
@@ -49,3 +49,535 @@ class TestJobStorage:
 
         assert retrieved["synced_at"] is not None
         assert retrieved["account_id"] == "acc123"
+
+    def test_rejected_job_is_stored_but_not_duplicate(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        job = JobPost(**sample_job_data)
+        db.save_job(job, rejected_stage="role", rejection_reason="title matches excluded 'manager'")
+
+        assert db.get_job(job.source, job.source_id)["rejected_stage"] == "role"
+        assert db.is_duplicate(job) == False
+        assert db.get_unsynced_jobs() == []
+
+
+class TestStats:
+    def test_job_counts_by_source_and_state(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs(
+            [
+                {"job": JobPost(**{**sample_job_data, "source_id": "1"})},
+                {"job": JobPost(**{**sample_job_data, "source_id": "2"})},
+                {"job": JobPost(**{**sample_job_data, "source_id": "3"}), "rejection_reason": "no match"},
+                {"job": JobPost(**{**sample_job_data, "source": "indeed"})},
+            ]
+        )
+        db.mark_synced("hn_hiring", "1", "acc", "opp")
+
+        assert db.job_counts() == {
+            "hn_hiring": {"total": 3, "synced": 1, "rejected": 1, "pending": 1},
+            "indeed": {"total": 1, "synced": 0, "rejected": 0, "pending": 1},
+        }
+        assert db.count_jobs() == 4
+        assert db.count_jobs("indeed") == 1
+
+    def test_last_run(self, temp_db):
+        from src.db import JobDatabase
+
+        db = JobDatabase(temp_db)
+        assert db.last_run() is None
+
+        for synced in (1, 2):
+            db.record_run(
+                {
+                    "started_at": "2026-01-01T00:00:00",
+                    "sources": "hn_hiring",
+                    "seconds": 2.0,
+                    "scraped": 10,
+                    "new": 5,
+                    "rejected": 3,
+                    "synced": synced,
+                    "failed": 0,
+                }
+            )
+
+        assert db.last_run()["synced"] == 2
+
+
+class TestSearch:
+    @pytest.fixture
+    def db(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs(
+            {"job": JobPost(**{**sample_job_data, **fields})}
+            for fields in [
+                {"source_id": "1", "description": "FastAPI services on Postgres"},
+                {"source_id": "2", "description": "Django and Postgres, some FastAPI"},
+                {"source_id": "3", "description": "Rails monolith on MySQL"},
+                {"source_id": "4", "source": "indeed", "description": "FastAPI and Postgres, Node.js"},
+            ]
+        )
+        return db
+
+    def test_every_word_must_match(self, db):
+        results = db.search("fastapi postgres")
+
+        assert sorted(r["source_id"] for r in results) == ["1", "2", "4"]
+        assert "[FastAPI]" in results[0]["snippet"]
+
+    def test_filters_by_source(self, db):
+        assert [r["source_id"] for r in db.search("fastapi", sources=["indeed"])] == ["4"]
+
+    def test_operators_and_punctuation(self, db):
+        assert sorted(r["source_id"] for r in db.search("mysql OR django")) == ["2", "3"]
+        assert [r["source_id"] for r in db.search("node.js")] == ["4"]
+        assert [r["source_id"] for r in db.search("rail*")] == ["3"]
+        assert sorted(r["source_id"] for r in db.search("mysql OR OR django")) == ["2", "3"]
+        assert [r["source_id"] for r in db.search("AND rails OR")] == ["3"]
+        assert len(db.search("AND fastapi")) == 3
+        for query in ["", "   ", "*", "NOT", "OR AND", "rust OR", '""']:
+            assert db.search(query) == []
+
+    def test_index_follows_replaced_and_deleted_jobs(self, db, sample_job_data):
+        from src.models import JobPost
+
+        db.save_job(JobPost(**{**sample_job_data, "source_id": "3", "description": "Elixir and Phoenix"}))
+        assert db.search("rails") == []
+        assert [r["source_id"] for r in db.search("phoenix")] == ["3"]
+
+        db.db.execute("DELETE FROM jobs WHERE source = 'indeed'")
+        assert db.search("node.js") == []
+
+    def test_index_keeps_no_copy_of_the_text(self, db, sample_job_data):
+        from src.models import JobPost
+
+        db.train_data_dictionary()
+        db.migrate_data()
+        db.save_job(JobPost(**{**sample_job_data, "source_id": "2", "description": "Elixir and Phoenix"}))
+        db.db.execute("DELETE FROM jobs WHERE source_id = '1'")
+
+        assert "jobs_fts_content" not in db.db.table_names()
+        # Checks the index against the descriptions decoded from jobs.data
+        db.db.execute("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('integrity-check', 1)")
+        assert [r["source_id"] for r in db.search("phoenix")] == ["2"]
+        assert "[Postgres]" in db.search("postgres")[0]["snippet"]
+
+    def test_existing_jobs_are_indexed_on_open(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_job(JobPost(**{**sample_job_data, "description": "Scala and Spark"}))
+        # As a database from before the index and schema versioning existed
+        db.db.execute("DROP TABLE jobs_fts")
+        db.db.execute("DROP TABLE schema_version")
+
+        assert [r["source_id"] for r in JobDatabase(temp_db).search("spark")] == ["12345"]
+
+
+class TestCompressedData:
+    def _jobs(self, sample_job_data, count):
+        from src.models import JobPost
+
+        boilerplate = "We offer health insurance, equity and a learning budget. We are an equal opportunity employer."
+        return [
+            JobPost(**{**sample_job_data, "source_id": str(i), "description": f"Role {i}. {boilerplate}"})
+            for i in range(count)
+        ]
+
+    def test_readers_decode_compressed_rows(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+
+        db = JobDatabase(temp_db, compress=True)
+        jobs = self._jobs(sample_job_data, 3)
+        db.save_jobs({"job": job} for job in jobs)
+
+        assert isinstance(db.db.execute("SELECT data FROM jobs").fetchone()[0], bytes)
+        assert db.get_job("hn_hiring", "1")["data"] == jobs[1].model_dump_json()
+        assert [row["data"] for row in db.get_unsynced_jobs()] == [job.model_dump_json() for job in jobs]
+        assert [r["source_id"] for r in db.search("role 2")] == ["2"]
+
+    def test_migrate_compresses_and_restores(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+
+        jobs = self._jobs(sample_job_data, 50)
+        JobDatabase(temp_db).save_jobs({"job": job} for job in jobs)
+        plain_size = JobDatabase(temp_db).data_size()
+
+        db = JobDatabase(temp_db, compress=True)
+        assert db.train_data_dictionary() == 1
+        assert db.migrate_data() == 50
+        assert db.migrate_data() == 0
+        assert db.data_size() < plain_size / 2
+        # A reader that doesn't compress still decodes them
+        assert JobDatabase(temp_db).get_job("hn_hiring", "7")["data"] == jobs[7].model_dump_json()
+
+        db = JobDatabase(temp_db)
+        assert db.migrate_data() == 50
+        assert db.data_size() == plain_size
+
+
+class TestStreaming:
+    @pytest.fixture
+    def db(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db, compress=True)
+        db.save_jobs(
+            {"job": JobPost(**{**sample_job_data, "source": source, "source_id": str(i)})}
+            for source in ("hn_hiring", "indeed")
+            for i in range(7)
+        )
+        db.save_job(JobPost(**{**sample_job_data, "source_id": "rejected"}), rejection_reason="no match")
+        db.mark_synced("indeed", "3", "acc", "opp")
+        return db
+
+    def test_iter_unsynced_pages_through_all_pending_jobs(self, db):
+        from src.models import JobPost
+
+        jobs = list(db.iter_unsynced(batch_size=3))
+
+        assert all(isinstance(job, JobPost) for job in jobs)
+        keys = [(job.source, job.source_id) for job in jobs]
+        assert len(keys) == 13
+        assert keys == sorted(keys)
+        assert ("indeed", "3") not in keys
+
+    def test_iter_jobs_filters(self, db):
+        assert len(list(db.iter_jobs(batch_size=4))) == 15
+        assert len(list(db.iter_jobs(source="indeed", batch_size=4))) == 7
+        assert len(list(db.iter_jobs(source="hn_hiring", include_rejected=False))) == 7
+        assert list(db.iter_jobs(since="2999-01-01")) == []
+
+    def test_iter_jobs_is_lazy(self, db):
+        jobs = db.iter_jobs(batch_size=2)
+        first = next(jobs)
+        db.db.execute("DELETE FROM jobs WHERE source = 'indeed'")
+
+        assert first.source == "hn_hiring"
+        assert all(job.source == "hn_hiring" for job in jobs)
+
+
+class TestCompact:
+    @pytest.fixture
+    def db(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs(
+            {"job": JobPost(**{**sample_job_data, "source": source, "source_id": str(i)})}
+            for source in ("hn_hiring", "indeed")
+            for i in range(4)
+        )
+        db.mark_synced_many(
+            {"source": source, "source_id": source_id, "account_id": "a", "contact_id": "o"}
+            for source in ("hn_hiring", "indeed")
+            for source_id in ("0", "1")
+        )
+        db.db.execute("UPDATE jobs SET rejection_reason = 'no match' WHERE source_id = '2'")
+        # Everything but job 1 of each source is a year old
+        db.db.execute("UPDATE jobs SET scraped_at = '2020-01-01', synced_at = '2020-01-01' WHERE synced_at IS NOT NULL")
+        db.db.execute("UPDATE jobs SET scraped_at = '2020-01-01' WHERE synced_at IS NULL")
+        db.db.execute("UPDATE jobs SET synced_at = datetime('now') WHERE source_id = '1'")
+        return db
+
+    def test_removes_expired_synced_and_rejected_jobs(self, db, tmp_path):
+        import gzip
+        import json
+
+        archive = tmp_path / "archive.jsonl.gz"
+        removed = db.compact({"indeed": 30}, None, str(archive), batch_size=1)
+
+        assert removed == {"indeed": 2}
+        remaining = sorted(row["source_id"] for row in db.db["jobs"].rows_where("source = 'indeed'"))
+        # Recently synced and still pending jobs are kept
+        assert remaining == ["1", "3"]
+        assert db.count_jobs("hn_hiring") == 4
+
+        with gzip.open(archive, "rt") as f:
+            records = [json.loads(line) for line in f]
+        assert sorted(r["source_id"] for r in records) == ["0", "2"]
+        assert records[0]["data"]["company_name"] == "Acme Corp"
+
+    def test_archived_synced_jobs_stay_duplicates(self, db, sample_job_data):
+        from src.models import JobPost
+
+        db.compact({}, 30, None)
+
+        # 0 was archived, 1 and 3 are still stored, rejected 2 may come back
+        assert db.get_job("hn_hiring", "0") is None
+        assert db.existing_keys("hn_hiring", ["0", "1", "2", "3"]) == {"0", "1", "3"}
+        assert db.is_duplicate(JobPost(**{**sample_job_data, "source_id": "0"}))
+
+    def test_reclaim_space(self, db):
+        db.compact({}, 30, None)
+        db.reclaim_space()
+        db.reclaim_space()
+
+        assert db.db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert db.db.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+class TestSyncOutbox:
+    def _db(self, temp_db, sample_job_data, count=3):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs({"job": JobPost(**{**sample_job_data, "source_id": str(i)})} for i in range(count))
+        return db
+
+    def _outbox(self, db):
+        return [row[0] for row in db.db.execute("SELECT source_id FROM sync_outbox ORDER BY source_id")]
+
+    def test_follows_job_state(self, temp_db, sample_job_data):
+        from src.models import JobPost
+
+        db = self._db(temp_db, sample_job_data)
+        db.save_job(JobPost(**{**sample_job_data, "source_id": "r"}), "exclude", "excluded")
+        assert self._outbox(db) == ["0", "1", "2"]
+
+        db.mark_synced("hn_hiring", "0", "acc", "opp")
+        db.update_filter_results(
+            [
+                {"source": "hn_hiring", "source_id": "1", "rejected_stage": "exclude", "rejection_reason": "x"},
+                {"source": "hn_hiring", "source_id": "r", "rejected_stage": None, "rejection_reason": None},
+            ],
+            "hash",
+        )
+        db.db.execute("DELETE FROM jobs WHERE source_id = '2'")
+
+        assert self._outbox(db) == ["r"]
+
+    def test_workers_never_claim_the_same_job(self, temp_db, sample_job_data):
+        db = self._db(temp_db, sample_job_data)
+
+        first = db.claim_sync_batch("a", 2, lease_seconds=60)
+        second = db.claim_sync_batch("b", 2, lease_seconds=60)
+
+        assert [job.source_id for job in first] == ["0", "1"]
+        assert [job.source_id for job in second] == ["2"]
+        assert db.claim_sync_batch("c", 2, lease_seconds=60) == []
+
+    def test_expired_and_released_leases_are_reclaimed(self, temp_db, sample_job_data):
+        db = self._db(temp_db, sample_job_data, count=2)
+
+        db.claim_sync_batch("crashed", 1, lease_seconds=-1)
+        db.claim_sync_batch("stopped", 1, lease_seconds=60)
+        db.release_sync_leases("stopped")
+
+        assert {job.source_id for job in db.claim_sync_batch("b", 5, lease_seconds=60)} == {"0", "1"}
+
+    def test_failures_back_off_then_dead_letter(self, temp_db, sample_job_data):
+        db = self._db(temp_db, sample_job_data, count=1)
+        failure = {"source": "hn_hiring", "source_id": "0", "error": "502 Bad Gateway"}
+
+        db.claim_sync_batch("a", 1, lease_seconds=60)
+        db.record_sync_failures([failure], max_attempts=2, retry_delay=60)
+        assert db.claim_sync_batch("a", 1, lease_seconds=60) == []
+        assert db.outbox_counts() == {"due": 0, "leased": 0, "waiting": 1, "dead": 0}
+
+        db.record_sync_failures([failure], max_attempts=2, retry_delay=-60)
+        assert db.outbox_counts()["dead"] == 1
+        assert db.dead_syncs()[0]["last_error"] == "502 Bad Gateway"
+        assert db.claim_sync_batch("a", 1, lease_seconds=60) == []
+
+        assert db.requeue_dead_syncs() == 1
+        assert [job.source_id for job in db.claim_sync_batch("a", 1, lease_seconds=60)] == ["0"]
+
+    def test_lost_leases_are_left_to_the_new_owner(self, temp_db, sample_job_data):
+        db = self._db(temp_db, sample_job_data, count=2)
+        keys = [("hn_hiring", "0"), ("hn_hiring", "1")]
+        db.claim_sync_batch("slow", 2, lease_seconds=-1)
+        db.claim_sync_batch("other", 1, lease_seconds=60)
+
+        assert db.renew_sync_leases("slow", keys, lease_seconds=60) == {("hn_hiring", "1")}
+        db.mark_synced_many(
+            [{"source": "hn_hiring", "source_id": "0", "account_id": "acc", "contact_id": "opp"}], owner="slow"
+        )
+        db.record_sync_failures([{"source": "hn_hiring", "source_id": "0", "error": "timeout"}], 5, 60, owner="slow")
+
+        assert db.get_job("hn_hiring", "0")["synced_at"] is None
+        row = db.db.execute("SELECT attempts, lease_owner FROM sync_outbox WHERE source_id = '0'").fetchone()
+        assert row == (0, "other")
+        assert db.outbox_counts() == {"due": 0, "leased": 2, "waiting": 0, "dead": 0}
+
+    def test_seeded_with_unsynced_jobs_on_upgrade(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+
+        db = self._db(temp_db, sample_job_data)
+        db.mark_synced("hn_hiring", "0", "acc", "opp")
+        # As before the sync_outbox step
+        db.db["sync_outbox"].drop()
+        db.db.execute("DELETE FROM schema_version WHERE version >= 10")
+
+        assert self._outbox(JobDatabase(temp_db)) == ["1", "2"]
+
+
+class TestExistingKeys:
+    def test_finds_stored_accepted_jobs_across_chunks(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs({"job": JobPost(**{**sample_job_data, "source_id": str(i)})} for i in range(0, 1200, 2))
+
+        found = db.existing_keys("hn_hiring", [str(i) for i in range(1200)])
+
+        assert found == {str(i) for i in range(0, 1200, 2)}
+        assert db.existing_keys("indeed", ["0", "2"]) == set()
+
+    def test_rejected_jobs_only_when_asked(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_job(JobPost(**sample_job_data), rejected_stage="role", rejection_reason="no match")
+
+        assert db.existing_keys("hn_hiring", ["12345"]) == set()
+        assert db.existing_keys("hn_hiring", ["12345"], include_rejected=True) == {"12345"}
+
+    def test_synced_jobs_count_even_when_rejected_later(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        job = JobPost(**sample_job_data)
+        db.save_job(job)
+        db.mark_synced(job.source, job.source_id, "acc", "opp")
+        db.update_filter_results(
+            [{"source": job.source, "source_id": job.source_id, "rejected_stage": "role", "rejection_reason": "no"}],
+            "cfg",
+        )
+
+        assert db.existing_keys("hn_hiring", ["12345"]) == {"12345"}
+
+    def test_get_job_missing_returns_none(self, temp_db):
+        from src.db import JobDatabase
+
+        assert JobDatabase(temp_db).get_job("hn_hiring", "missing") is None
+
+
+class TestBulkWrites:
+    def test_save_jobs_stores_all_entries(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        jobs = [JobPost(**{**sample_job_data, "source_id": str(i)}) for i in range(1200)]
+        db.save_jobs(
+            [{"job": jobs[0], "rejected_stage": "role", "rejection_reason": "no match"}]
+            + [{"job": job, "filter_hash": "cfg"} for job in jobs[1:]]
+        )
+
+        assert db.db["jobs"].count == 1200
+        assert db.get_job("hn_hiring", "0")["rejected_stage"] == "role"
+        assert db.get_job("hn_hiring", "1")["filter_hash"] == "cfg"
+
+    def test_save_jobs_is_all_or_nothing(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        entries = [{"job": JobPost(**{**sample_job_data, "source_id": str(i)})} for i in range(600)]
+        entries.append({"job": None})
+
+        with pytest.raises(AttributeError):
+            db.save_jobs(entries)
+        assert db.db["jobs"].count == 0
+
+    def test_mark_synced_many(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs({"job": JobPost(**{**sample_job_data, "source_id": str(i)})} for i in range(3))
+        db.mark_synced_many(
+            {"source": "hn_hiring", "source_id": str(i), "account_id": f"acc{i}", "contact_id": f"opp{i}"}
+            for i in range(2)
+        )
+
+        assert db.get_job("hn_hiring", "1")["account_id"] == "acc1"
+        assert db.get_job("hn_hiring", "1")["synced_at"] is not None
+        assert [row["source_id"] for row in db.get_unsynced_jobs()] == ["2"]
+
+    def test_save_jobs_keeps_synced_rows(self, temp_db, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(temp_db)
+        db.save_jobs({"job": JobPost(**{**sample_job_data, "source_id": str(i)})} for i in range(2))
+        db.mark_synced("hn_hiring", "0", "acc", "opp")
+        rescraped = [JobPost(**{**sample_job_data, "source_id": str(i), "title": "Staff Engineer"}) for i in range(2)]
+        db.save_jobs({"job": job} for job in rescraped)
+
+        assert db.get_job("hn_hiring", "0")["contact_id"] == "opp"
+        assert db.get_job("hn_hiring", "0")["title"] == "Backend Engineer"
+        assert db.get_job("hn_hiring", "1")["title"] == "Staff Engineer"
+        assert db.outbox_counts()["due"] == 1
+        assert [row["title"] for row in db.search("staff")] == ["Staff Engineer"]
+
+    def test_wal_mode(self, temp_db):
+        from src.db import JobDatabase
+
+        db = JobDatabase(temp_db, wal=True)
+
+        assert db.db.journal_mode == "wal"
+        assert db.db.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        db.db.disable_wal()
+
+
+class TestFilterDecisions:
+    def _decision(self, source_id, stage=None):
+        return {
+            "source": "hn_hiring",
+            "source_id": source_id,
+            "content_hash": "c" + source_id,
+            "rejected_stage": stage,
+            "config_hash": "cfg",
+        }
+
+    def test_save_and_get_decisions(self, temp_db):
+        from src.db import JobDatabase
+
+        db = JobDatabase(temp_db)
+        db.save_filter_decisions([self._decision("1"), self._decision("2", "role")])
+
+        decisions = db.get_filter_decisions("hn_hiring", ["1", "2", "3"])
+        assert set(decisions) == {"1", "2"}
+        assert decisions["1"]["rejected_stage"] is None
+        assert decisions["2"]["rejected_stage"] == "role"
+
+    def test_evicts_least_recently_used(self, temp_db):
+        from src.db import JobDatabase
+
+        db = JobDatabase(temp_db, decision_cache_size=2)
+        db.save_filter_decisions([self._decision("1"), self._decision("2")])
+        db.db.execute("UPDATE filter_decisions SET used_at = '2000-01-01' WHERE source_id = '2'")
+        db.save_filter_decisions([self._decision("3")])
+
+        assert set(db.get_filter_decisions("hn_hiring", ["1", "2", "3"])) == {"1", "3"}
+
+
+class TestStageStats:
+    def test_record_accumulates_with_decay(self, temp_db):
+        from src.db import JobDatabase, STAGE_STATS_DECAY
+
+        db = JobDatabase(temp_db)
+        run = {"role": {"samples": 10, "failures": 4, "seconds": 0.5}}
+        db.record_stage_stats(run)
+        db.record_stage_stats(run)
+
+        stats = db.get_stage_stats()["role"]
+        assert stats["samples"] == pytest.approx(10 * STAGE_STATS_DECAY + 10)
+        assert stats["failures"] == pytest.approx(4 * STAGE_STATS_DECAY + 4)
@@ -1,3 +1,6 @@
+import json
+
+import httpx
 import pytest
 import respx
 from httpx import Response
@@ -18,7 +21,59 @@ class TestEspoClientAuth:
         assert client.base_url == espo_config["base_url"]
 
 
+class TestConnectionPooling:
+    @respx.mock
+    def test_requests_share_one_client(self, espo_client):
+        route = respx.get("http://192.168.68.68:8080/api/v1/Account").mock(
+            return_value=Response(200, json={"total": 0, "list": []})
+        )
+        espo_client.find_account("Acme Corp")
+        client = espo_client.client
+        espo_client.find_account("Other Corp")
+
+        assert espo_client.client is client
+        assert route.call_count == 2
+        assert route.calls[0].request.headers["authorization"].startswith("Basic ")
+
+    def test_context_manager_closes_client(self, espo_config):
+        import httpx
+        from src.espo_client import EspoClient
+
+        limits = httpx.Limits(max_connections=3)
+        with EspoClient(**espo_config, limits=limits, timeout=httpx.Timeout(2.0)) as client:
+            pooled = client.client
+            assert pooled.timeout.read == 2.0
+
+        assert pooled.is_closed
+        assert client._client is None
+
+
 class TestAccountOperations:
+    @respx.mock
+    def test_list_accounts_pages_with_projection(self, espo_client):
+        accounts = [{"id": f"a{i}", "name": f"Company {i}"} for i in range(5)]
+        route = respx.get("http://192.168.68.68:8080/api/v1/Account").mock(
+            side_effect=[
+                Response(200, json={"total": 5, "list": accounts[:2]}),
+                Response(200, json={"total": 5, "list": accounts[2:4]}),
+                Response(200, json={"total": 5, "list": accounts[4:]}),
+            ]
+        )
+
+        assert list(espo_client.list_accounts(page_size=2)) == accounts
+        assert route.call_count == 3
+        params = route.calls[1].request.url.params
+        assert (params["select"], params["maxSize"], params["offset"]) == ("id,name", "2", "2")
+
+    @respx.mock
+    def test_list_accounts_stops_on_short_page_without_total(self, espo_client):
+        route = respx.get("http://192.168.68.68:8080/api/v1/Account").mock(
+            return_value=Response(200, json={"total": -1, "list": [{"id": "a", "name": "Acme"}]})
+        )
+
+        assert len(list(espo_client.list_accounts(page_size=2))) == 1
+        assert route.call_count == 1
+
     @respx.mock
     def test_find_account_exists(self, espo_client):
         """find_account returns dict when account exists"""
@@ -76,3 +131,196 @@ class TestContactOperations:
         request_body = json.loads(route.calls[0].request.content)
         assert request_body["cStatus"] == "Cold"
         assert request_body["cRelationshipStrength"] == "1/10"
+
+
+class TestBatchCalls:
+    @respx.mock
+    def test_results_are_reported_per_item(self, espo_client, sample_job_data):
+        from src.models import JobPost
+
+        def create(request):
+            name = json.loads(request.content)["name"]
+            if name.startswith("Broken"):
+                return Response(400, json={"message": "Invalid"})
+            return Response(200, json={"id": "opp-" + name.split()[0]})
+
+        route = respx.post("http://192.168.68.68:8080/api/v1/Opportunity").mock(side_effect=create)
+        items = [
+            (JobPost(**{**sample_job_data, "source_id": str(i), "title": title}), "acc1")
+            for i, title in enumerate(["Backend", "Broken", "Frontend"])
+        ]
+
+        results = espo_client.create_opportunities(items, concurrency=3)
+
+        assert [result.value for result in results] == ["opp-Backend", None, "opp-Frontend"]
+        assert [result.ok for result in results] == [True, False, True]
+        assert results[1].error.response.status_code == 400
+        assert route.call_count == 3
+        assert espo_client.stats.requests == 3
+
+    @respx.mock
+    def test_find_accounts(self, espo_client):
+        def find(request):
+            name = request.url.params["where[0][value]"]
+            accounts = [{"id": "acc1", "name": name}] if name == "Acme Corp" else []
+            return Response(200, json={"total": len(accounts), "list": accounts})
+
+        respx.get("http://192.168.68.68:8080/api/v1/Account").mock(side_effect=find)
+
+        results = espo_client.find_accounts(["Acme Corp", "Globex"])
+
+        assert [result.value for result in results] == [{"id": "acc1", "name": "Acme Corp"}, None]
+
+
+class TestRetries:
+    URL = "http://192.168.68.68:8080/api/v1/"
+
+    @pytest.fixture
+    def client(self, espo_config):
+        from unittest.mock import patch
+        from src.espo_client import EspoClient, RetryPolicy
+
+        with patch("src.espo_client.time.sleep") as sleep:
+            client = EspoClient(**espo_config, retry=RetryPolicy(attempts=3, base_delay=0))
+            client.sleep = sleep
+            yield client
+
+    @respx.mock
+    def test_lookups_are_retried_on_5xx(self, client):
+        route = respx.get(self.URL + "Account").mock(
+            side_effect=[Response(502), Response(200, json={"total": 0, "list": []})]
+        )
+
+        assert client.find_account("Acme Corp") is None
+        assert route.call_count == 2
+        assert client.stats.retries == 1
+
+    @respx.mock
+    def test_429_honors_retry_after_without_a_lookup(self, client):
+        from src.models import Company
+
+        lookup = respx.get(self.URL + "Account")
+        create = respx.post(self.URL + "Account").mock(
+            side_effect=[Response(429, headers={"Retry-After": "2"}), Response(200, json={"id": "acc1"})]
+        )
+
+        assert client.create_account(Company(name="Acme Corp")) == "acc1"
+        client.sleep.assert_called_once_with(2.0)
+        assert create.call_count == 2
+        assert not lookup.called
+
+    @respx.mock
+    def test_gives_up_when_retry_after_exceeds_max_delay(self, client):
+        from src.espo_client import RetryPolicy
+
+        route = respx.get(self.URL + "Account").mock(return_value=Response(429, headers={"Retry-After": "3600"}))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            client.find_account("Acme Corp")
+        assert route.call_count == 1
+        assert not client.sleep.called
+        assert RetryPolicy(max_delay=30).delay(0, retry_after=3600) == 30
+
+    @respx.mock
+    def test_create_that_happened_is_not_repeated(self, client, sample_job_data):
+        from src.espo_client import sync_key
+        from src.models import JobPost
+
+        job = JobPost(**sample_job_data)
+        create = respx.post(self.URL + "Opportunity").mock(return_value=Response(500))
+        lookup = respx.get(self.URL + "Opportunity").mock(
+            return_value=Response(200, json={"total": 1, "list": [{"id": "opp1"}]})
+        )
+
+        assert client.create_opportunity(job, "acc1") == "opp1"
+        assert create.call_count == 1
+        assert lookup.calls[0].request.url.params["where[0][value]"] == sync_key(job)
+        assert sync_key(job) in json.loads(create.calls[0].request.content)["description"]
+        assert client.stats.recovered_creates == 1
+
+    @respx.mock
+    def test_create_that_did_not_happen_is_retried(self, client, sample_job_data):
+        from src.models import JobPost
+
+        create = respx.post(self.URL + "Opportunity").mock(
+            side_effect=[httpx.ReadTimeout("timed out"), Response(200, json={"id": "opp1"})]
+        )
+        respx.get(self.URL + "Opportunity").mock(return_value=Response(200, json={"total": 0, "list": []}))
+
+        assert client.create_opportunity(JobPost(**sample_job_data), "acc1") == "opp1"
+        assert create.call_count == 2
+
+    @respx.mock
+    def test_gives_up_on_client_errors_and_after_attempts(self, client):
+        bad_request = respx.get(self.URL + "Contact").mock(return_value=Response(400))
+        unavailable = respx.get(self.URL + "Account").mock(return_value=Response(503))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            client.find_contact(email="a@example.com")
+        with pytest.raises(httpx.HTTPStatusError):
+            client.find_account("Acme Corp")
+        assert bad_request.call_count == 1
+        assert unavailable.call_count == 3
+
+    def test_retry_after_http_date(self):
+        from datetime import datetime, timedelta, timezone
+        from email.utils import format_datetime
+        from src.espo_client import _retry_after
+
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        response = Response(429, headers={"Retry-After": format_datetime(when, usegmt=True)})
+
+        assert 25 < _retry_after(response) <= 30
+
+    def test_rate_limiter_allows_a_burst_then_spaces_requests(self):
+        from src.espo_client import RateLimiter
+
+        limiter = RateLimiter(10, burst=2)
+        waits = [limiter.reserve() for _ in range(4)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.1, abs=0.01)
+        assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+
+class TestAsyncEspoClient:
+    @respx.mock
+    def test_find_or_create_account_and_opportunity(self, espo_config, sample_job_data):
+        import asyncio
+        import json
+        from src.espo_client import AsyncEspoClient
+        from src.models import Company, JobPost
+
+        respx.get("http://192.168.68.68:8080/api/v1/Account").mock(
+            return_value=Response(200, json={"total": 0, "list": []})
+        )
+        respx.post("http://192.168.68.68:8080/api/v1/Account").mock(return_value=Response(200, json={"id": "acc1"}))
+        opportunity = respx.post("http://192.168.68.68:8080/api/v1/Opportunity").mock(
+            return_value=Response(200, json={"id": "opp1"})
+        )
+
+        async def sync():
+            async with AsyncEspoClient(**espo_config) as client:
+                assert await client.find_account("Acme Corp") is None
+                account_id = await client.create_account(Company(name="Acme Corp"))
+                return account_id, await client.create_opportunity(JobPost(**sample_job_data), account_id)
+
+        assert asyncio.run(sync()) == ("acc1", "opp1")
+        assert json.loads(opportunity.calls[0].request.content)["accountId"] == "acc1"
+
+    @respx.mock
+    def test_retries_share_the_sync_clients_counters(self, espo_config):
+        import asyncio
+        from src.espo_client import AsyncEspoClient, EspoStats, RetryPolicy
+
+        respx.get("http://192.168.68.68:8080/api/v1/Account").mock(
+            side_effect=[Response(503), Response(200, json={"total": 0, "list": []})]
+        )
+        stats = EspoStats()
+
+        async def find():
+            async with AsyncEspoClient(**espo_config, retry=RetryPolicy(base_delay=0), stats=stats) as client:
+                return await client.find_account("Acme Corp")
+
+        assert asyncio.run(find()) is None
+        assert (stats.requests, stats.retries) == (2, 1)
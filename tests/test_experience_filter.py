@@ -43,6 +43,30 @@ class TestParseExperienceLevel:
         assert result["level"] is None
 
 
+class TestExtractExperience:
+    def test_returns_every_mention_in_order(self):
+        from src.filters import extract_experience
+
+        mentions = extract_experience("3-5 years of Python, Senior role, 10+ yrs preferred")
+        assert [m.kind for m in mentions] == ["range", "level", "plus"]
+        assert (mentions[0].years_min, mentions[0].years_max) == (3, 5)
+        assert mentions[1].level == "senior"
+        assert (mentions[2].years_min, mentions[2].years_max) == (10, None)
+
+    def test_recognizes_level_spellings(self):
+        from src.filters import extract_experience
+
+        levels = [m.level for m in extract_experience("Jr. dev, entry level, Sr. lead, mid-level")]
+        assert levels == ["junior", "junior", "senior", "mid"]
+
+    def test_range_wins_over_earlier_plus(self):
+        from src.filters import parse_experience_level
+
+        result = parse_experience_level("2+ years with Go, 4-6 years overall")
+        assert result["years_min"] == 4
+        assert result["years_max"] == 6
+
+
 class TestExperienceFilter:
     @pytest.fixture
     def sample_job_data(self):
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def crm():
+    from tests.fake_espo import FakeEspoCRM
+
+    with FakeEspoCRM(seed=0) as crm:
+        yield crm
+
+
+@pytest.fixture
+def client(crm):
+    from src.espo_client import EspoClient, RetryPolicy
+
+    with EspoClient(crm.url, "admin", "password", retry=RetryPolicy(base_delay=0)) as client:
+        yield client
+
+
+class TestFakeEspoCRM:
+    def test_create_and_find(self, client):
+        from src.models import Company
+
+        account_id = client.create_account(Company(name="Acme Corp"))
+
+        assert client.find_account("Acme Corp")["id"] == account_id
+        assert client.find_account("Globex") is None
+
+    def test_list_accounts_pages_oldest_first(self, crm, client):
+        for i in range(5):
+            crm.add("Account", {"name": f"Company {i}"})
+
+        accounts = list(client.list_accounts(page_size=2))
+
+        assert [account["name"] for account in accounts] == [f"Company {i}" for i in range(5)]
+        assert set(accounts[0]) == {"id", "name"}
+        assert crm.requests["GET", "Account"] == 3
+
+    def test_opportunity_found_by_sync_key(self, crm, client, sample_job_data):
+        from src.espo_client import sync_key
+        from src.models import JobPost
+
+        job = JobPost(**sample_job_data)
+        account_id = crm.add("Account", {"name": "Acme Corp"})["id"]
+        opportunity_id = client.create_opportunity(job, account_id)
+
+        assert client.find_opportunity(sync_key(job))["id"] == opportunity_id
+
+    def test_unknown_account_is_404(self, client, sample_job_data):
+        from src.models import JobPost
+
+        with pytest.raises(httpx.HTTPStatusError) as error:
+            client.create_opportunity(JobPost(**sample_job_data), "deleted")
+        assert error.value.response.status_code == 404
+
+    def test_injected_failures_are_retried(self, crm, client):
+        from src.models import Company
+
+        crm.throttle_rate = 0.3
+        crm.error_rate = 0.3
+        ids = [client.create_account(Company(name=f"Company {i}")) for i in range(10)]
+
+        # A create is only repeated if the lookup shows it did not happen
+        assert len(crm.records["Account"]) == len(set(ids)) == 10
+        assert crm.injected[429] > 0 and crm.injected[503] > 0
+        assert client.stats.retries == sum(crm.injected.values())
+
+    def test_drain_outbox_end_to_end(self, crm, client, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import drain_outbox
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        db.save_jobs(
+            {"job": JobPost(**{**sample_job_data, "source_id": str(i), "company_name": f"Company {i % 3}"})}
+            for i in range(6)
+        )
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo", client):
+            assert drain_outbox() == (6, 0)
+
+        assert len(crm.records["Account"]) == 3
+        assert len(crm.records["Opportunity"]) == 6
+        assert db.outbox_counts()["due"] == 0
@@ -135,3 +135,271 @@ class TestFullFilter:
 
         job = JobPost(**sample_job_data)
         assert filter_job(job, filter_config) == True
+
+
+class TestKeywordMatcher:
+    def test_finds_overlapping_keywords(self):
+        from src.filters import KeywordMatcher
+
+        matcher = KeywordMatcher(["go", "golang", "java", "javascript", "script"])
+        assert matcher.find("we write golang and javascript") == {
+            "go",
+            "golang",
+            "java",
+            "javascript",
+            "script",
+        }
+
+    def test_matches_substring_semantics(self):
+        from src.filters import KeywordMatcher
+
+        keywords = ["rest", "api", "c#", ".net", "remote (eu)", "cet)"]
+        text = "interest in rapid .net/c# apis, remote (eu) (cet)"
+        assert KeywordMatcher(keywords).find(text) == {k for k in keywords if k in text}
+
+    def test_empty_keyword_list(self):
+        from src.filters import KeywordMatcher
+
+        assert KeywordMatcher([]).find("anything") == set()
+
+
+class TestCompiledFilter:
+    @pytest.fixture
+    def yaml_config(self):
+        import yaml
+
+        with open("config/filters.yaml") as f:
+            return yaml.safe_load(f)
+
+    @pytest.fixture
+    def jobs(self, sample_job_data):
+        from src.models import JobPost
+
+        variants = [
+            {},
+            {"title": "Senior Staff Engineer"},
+            {"title": "Engineering Manager", "remote": False},
+            {"description": "Defense contractor seeking engineers"},
+            {"description": "We use React, TypeScript and golang"},
+            {"description": "Python and .NET shop, 10+ years required"},
+            {"title": "Junior Full Stack Developer", "description": "React, Node, 1-2 years"},
+            {"location": "Remote", "description": "(EU) timezone only. Python, AWS"},
+            {"location": "Seattle", "remote": False, "description": "Python, Docker"},
+            {"location": None, "remote": False, "description": "Onsite in Austin. Python, Go"},
+            {"company_name": "Casino", "description": "Python and React"},
+            {"tech_stack": ["COBOL"], "description": "Python and Postgres"},
+            {"title": "Senior Backend Engineer", "description": "Python, AWS, 5+ years"},
+        ]
+        return [JobPost(**{**sample_job_data, **v}) for v in variants]
+
+    def test_matches_filter_job_on_fixture_config(self, jobs, filter_config):
+        from src.filters import CompiledFilter, filter_job
+
+        compiled = CompiledFilter(filter_config)
+        assert [compiled(job) for job in jobs] == [filter_job(job, filter_config) for job in jobs]
+
+    def test_matches_filter_job_on_yaml_config(self, jobs, yaml_config):
+        from src.filters import CompiledFilter, filter_job
+
+        compiled = CompiledFilter(yaml_config)
+        results = [compiled(job) for job in jobs]
+        assert results == [filter_job(job, yaml_config) for job in jobs]
+        assert True in results and False in results
+
+    def test_keyword_spanning_location_and_description(self, sample_job_data):
+        from src.models import JobPost
+        from src.filters import CompiledFilter, filter_job
+
+        config = {"location": {"exclude": ["remote (eu)"]}}
+        job = JobPost(**{**sample_job_data, "location": "Remote", "description": "(EU) Python"})
+        assert CompiledFilter(config)(job) == filter_job(job, config) == False
+
+    def test_empty_config_passes(self, sample_job_data):
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        assert CompiledFilter({})(JobPost(**sample_job_data)) == True
+
+
+class TestFilterJobs:
+    @pytest.fixture
+    def jobs(self, sample_job_data):
+        from src.models import JobPost
+
+        titles = ["Backend Engineer", "Engineering Manager", "Full Stack Dev", "Principal Engineer"]
+        return [
+            JobPost(**{**sample_job_data, "source_id": str(i), "title": titles[i % len(titles)]})
+            for i in range(20)
+        ]
+
+    def test_serial_results_in_input_order(self, jobs, filter_config):
+        from src.filters import filter_jobs, filter_job
+
+        assert filter_jobs(jobs, filter_config, workers=1) == [filter_job(j, filter_config) for j in jobs]
+
+    def test_process_pool_results_in_input_order(self, jobs, filter_config):
+        from src.filters import filter_jobs, filter_job
+
+        results = filter_jobs(jobs, filter_config, workers=2, chunk_size=3, min_parallel=0)
+        assert results == [filter_job(j, filter_config) for j in jobs]
+
+    def test_small_batch_skips_pool(self, jobs, filter_config):
+        from unittest.mock import patch
+        from src.filters import filter_jobs
+
+        with patch("src.filters.ProcessPoolExecutor") as pool:
+            filter_jobs(jobs, filter_config, workers=4)
+        pool.assert_not_called()
+
+    def test_empty_batch(self, filter_config):
+        from src.filters import filter_jobs
+
+        assert filter_jobs([], filter_config) == []
+
+
+class TestRejectionReasons:
+    def test_reports_stage_and_keyword(self, sample_job_data, filter_config):
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        job = JobPost(**{**sample_job_data, "title": "Engineering Manager"})
+        rejection = CompiledFilter(filter_config).evaluate(job)
+        assert rejection.stage == "role"
+        assert rejection.keyword == "manager"
+        assert str(rejection) == "role: title matches excluded 'manager'"
+
+    def test_passing_job_has_no_rejection(self, sample_job_data, filter_config):
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        assert CompiledFilter(filter_config).evaluate(JobPost(**sample_job_data)) is None
+
+    def test_experience_reason(self, sample_job_data):
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        job = JobPost(**{**sample_job_data, "description": "10+ years of Python"})
+        rejection = CompiledFilter({"experience": {"max_years": 5}}).evaluate(job)
+        assert rejection.stage == "experience"
+        assert "10" in rejection.reason
+
+
+class TestAffectedDecisions:
+    def test_added_exclude_only_rechecks_passing(self, filter_config):
+        import copy
+        from src.filters import affected_decisions
+
+        new = copy.deepcopy(filter_config)
+        new["role"]["exclude"].append("lead")
+        assert affected_decisions(filter_config, new) == (True, set())
+
+    def test_removed_exclude_only_rechecks_that_stage(self, filter_config):
+        import copy
+        from src.filters import affected_decisions
+
+        new = copy.deepcopy(filter_config)
+        new["company"]["exclude_keywords"].remove("gambling")
+        assert affected_decisions(filter_config, new) == (False, {"company"})
+
+    def test_mixed_change_rechecks_both(self, filter_config):
+        import copy
+        from src.filters import affected_decisions
+
+        new = copy.deepcopy(filter_config)
+        new["location"]["include"] = ["remote", "san diego"]
+        assert affected_decisions(filter_config, new) == (True, {"location"})
+
+    def test_numeric_limits(self):
+        from src.filters import affected_decisions
+
+        old = {"experience": {"max_years": 5}, "tech": {"require_any": ["python"], "min_match": 1}}
+        assert affected_decisions(old, {**old, "experience": {"max_years": 3}}) == (True, set())
+        assert affected_decisions(old, {**old, "experience": {}}) == (False, {"experience"})
+        more_tech = {**old, "tech": {"require_any": ["python", "go"], "min_match": 1}}
+        assert affected_decisions(old, more_tech) == (False, {"tech"})
+
+    def test_unchanged_config(self, filter_config):
+        from src.filters import affected_decisions
+
+        assert affected_decisions(filter_config, filter_config) == (False, set())
+
+
+class TestExplain:
+    def test_explain_matches_evaluate(self, sample_job_data, filter_config):
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        compiled = CompiledFilter(filter_config)
+        for title in ["Backend Engineer", "Engineering Manager"]:
+            job = JobPost(**{**sample_job_data, "title": title})
+            assert compiled.explain(job).rejection == compiled.evaluate(job)
+
+    def test_records_every_failing_stage_and_timing(self, sample_job_data, filter_config):
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        job = JobPost(
+            **{**sample_job_data, "title": "Engineering Manager", "description": "Defense systems"}
+        )
+        decision = CompiledFilter(filter_config).explain(job)
+        assert decision.rejection.stage == "role"
+        assert decision.failed_stages == ["role", "company"]
+        assert set(decision.stage_times) == set(CompiledFilter.STAGES)
+        assert "role.exclude: manager" in decision.keyword_hits
+        assert "company.exclude_keywords: defense" in decision.keyword_hits
+
+    def test_stats_aggregate_decisions(self, sample_job_data, filter_config):
+        from src.models import JobPost
+        from src.filters import CompiledFilter, FilterStats
+
+        compiled = CompiledFilter(filter_config)
+        stats = FilterStats(keyword_lists=compiled.keyword_lists)
+        for title in ["Backend Engineer", "Engineering Manager", "Product Manager"]:
+            stats.add(compiled.explain(JobPost(**{**sample_job_data, "title": title})))
+
+        assert stats.jobs == 3
+        assert stats.rejections["role"] == 2
+        assert stats.keyword_hits["role.exclude: manager"] == 2
+        assert stats.stage_percentile("role", 0.5) <= stats.stage_percentile("role", 0.99)
+        assert "role.exclude: principal" in stats.dead_keywords()
+        assert "role.exclude: manager" not in stats.dead_keywords()
+
+
+class TestStageOrdering:
+    def test_orders_by_cost_per_rejection(self):
+        from src.filters import order_stages
+
+        stats = {
+            "role": {"samples": 100, "failures": 10, "seconds": 1.0},
+            "location": {"samples": 100, "failures": 50, "seconds": 1.0},
+            "company": {"samples": 100, "failures": 0, "seconds": 0.1},
+            "tech": {"samples": 100, "failures": 20, "seconds": 0.1},
+            "experience": {"samples": 100, "failures": 5, "seconds": 5.0},
+        }
+        assert order_stages(stats) == ("tech", "location", "role", "experience", "company")
+
+    def test_keeps_default_order_without_stats(self):
+        from src.filters import CompiledFilter, order_stages
+
+        assert order_stages({}) == CompiledFilter.STAGES
+
+    def test_any_order_gives_same_results(self, sample_job_data):
+        import yaml
+        from src.models import JobPost
+        from src.filters import CompiledFilter
+
+        with open("config/filters.yaml") as f:
+            config = yaml.safe_load(f)
+        jobs = [
+            JobPost(**{**sample_job_data, **variant})
+            for variant in [
+                {},
+                {"title": "Engineering Manager", "description": "Defense, 10+ years, COBOL"},
+                {"description": "Onsite only. Python"},
+                {"title": "Senior Backend Engineer"},
+            ]
+        ]
+        default = CompiledFilter(config)
+        reordered = CompiledFilter(config, reversed(CompiledFilter.STAGES))
+        assert [reordered(job) for job in jobs] == [default(job) for job in jobs]
+        assert reordered.evaluate(jobs[1]).stage == "experience"
@@ -0,0 +1,101 @@
+import sqlite_utils
+import pytest
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "pipeline.db")
+
+
+def _legacy_db(path, sample_job_data, count):
+    """A pipeline DB as created before filter columns and schema versioning"""
+    from src.models import JobPost
+
+    db = sqlite_utils.Database(path)
+    db["jobs"].insert_all(
+        (
+            {
+                "source": "hn_hiring",
+                "source_id": str(i),
+                "source_url": "https://example.com",
+                "company_name": "Acme Corp",
+                "title": "Engineer",
+                "data": JobPost(
+                    **{**sample_job_data, "source_id": str(i), "description": f"Job {i} uses Elixir"}
+                ).model_dump_json(),
+                "scraped_at": "2026-01-01T00:00:00",
+                "synced_at": None,
+                "account_id": None,
+                "contact_id": None,
+            }
+            for i in range(count)
+        ),
+        pk=["source", "source_id"],
+    )
+    db.close()
+
+
+class TestMigrations:
+    def test_new_database_is_at_latest_version(self, db_path):
+        from src.db import JobDatabase
+        from src.migrations import MIGRATIONS, migrate
+
+        db = JobDatabase(db_path)
+
+        assert db.schema_version == MIGRATIONS[-1].version
+        assert migrate(JobDatabase(db_path)) == []
+
+    def test_upgrades_legacy_database_in_place(self, db_path, sample_job_data):
+        from src.db import JobDatabase
+
+        _legacy_db(db_path, sample_job_data, 3)
+        db = JobDatabase(db_path)
+
+        assert "rejection_reason" in db.db["jobs"].columns_dict
+        assert db.count_jobs() == 3
+        assert len(db.get_unsynced_jobs()) == 3
+        assert sorted(r["source_id"] for r in db.search("elixir")) == ["0", "1", "2"]
+
+    def test_new_migration_is_applied_once(self, db_path):
+        from src.db import JobDatabase
+        from src.migrations import MIGRATIONS, Migration, migrate
+
+        db = JobDatabase(db_path)
+        step = Migration(
+            MIGRATIONS[-1].version + 1, "notes column", lambda jdb: jdb.db["jobs"].add_column("notes", str)
+        )
+        steps = [*MIGRATIONS, step]
+
+        assert migrate(db, steps) == [step.version]
+        assert migrate(db, steps) == []
+        assert "notes" in db.db["jobs"].columns_dict
+
+    def test_interrupted_backfill_resumes(self, db_path, sample_job_data, monkeypatch):
+        from src import migrations
+        from src.db import JobDatabase
+
+        _legacy_db(db_path, sample_job_data, 10)
+        monkeypatch.setattr(migrations, "BACKFILL_CHUNK_SIZE", 4)
+        original = migrations.backfill
+        chunks = []
+
+        def failing_backfill(jdb, select, start, update):
+            def update_then_fail(rows):
+                chunks.append([row[0] for row in rows])
+                if len(chunks) == 2:
+                    raise KeyboardInterrupt
+                update(rows)
+
+            original(jdb, select, start, update_then_fail)
+
+        monkeypatch.setattr(migrations, "backfill", failing_backfill)
+        with pytest.raises(KeyboardInterrupt):
+            JobDatabase(db_path)
+        # The first chunk was committed, the second rolled back
+        indexed = sqlite_utils.Database(db_path).execute("SELECT COUNT(*) FROM jobs_fts").fetchone()[0]
+        assert indexed == 4
+
+        monkeypatch.setattr(migrations, "backfill", original)
+        db = JobDatabase(db_path)
+        assert db.db.execute("SELECT COUNT(*) FROM jobs_fts").fetchone()[0] == 10
+        assert len(db.search("elixir", limit=20)) == 10
@@ -76,3 +76,641 @@ class TestPipeline:
         # Both scrapers should have been called
         failing_scraper.scrape.assert_called_once()
         working_scraper.scrape.assert_called_once()
+
+
+class TestConcurrentScraping:
+    def _scraper(self, jobs=(), delay=0.0, error=None):
+        import time
+
+        def scrape():
+            time.sleep(delay)
+            if error:
+                raise error
+            return list(jobs)
+
+        scraper = Mock()
+        scraper.scrape.side_effect = scrape
+        return scraper
+
+    def test_sources_overlap_and_are_yielded_as_they_finish(self, sample_job_data):
+        import time
+        from src.models import JobPost
+        from src.pipeline import scrape_sources
+
+        scrapers = {
+            "slow": self._scraper([JobPost(**sample_job_data)], delay=0.5),
+            "fast": self._scraper(delay=0.2),
+            "broken": self._scraper(error=RuntimeError("blocked")),
+        }
+
+        start = time.perf_counter()
+        results = list(scrape_sources(scrapers))
+        elapsed = time.perf_counter() - start
+
+        assert [(source, len(jobs)) for source, jobs in results] == [("fast", 0), ("slow", 1)]
+        # Less than the two would take one after the other
+        assert elapsed < 0.5 + 0.2
+
+    def test_hung_source_does_not_block_the_run(self, tmp_path, sample_job_data):
+        import time
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import run_pipeline
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        scrapers = {
+            "hn_hiring": self._scraper([JobPost(**sample_job_data)]),
+            "wellfound": self._scraper(delay=5),
+        }
+
+        start = time.perf_counter()
+        with patch("src.pipeline.db", db), patch("src.pipeline.get_scraper", side_effect=scrapers.get):
+            with patch("src.pipeline.load_filter_config", return_value={}):
+                run_pipeline(["hn_hiring", "wellfound"], sync=False, scrape_timeouts={"wellfound": 0.2})
+
+        assert time.perf_counter() - start < 1
+        assert db.outbox_counts()["due"] == 1
+        assert db.last_run()["scraped"] == 1
+
+
+class TestBatchedWrites:
+    def test_run_saves_jobs_before_syncing_and_marks_them_synced(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import run_pipeline
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        scraper = Mock()
+        scraper.scrape.return_value = [
+            JobPost(**{**sample_job_data, "source_id": "1"}),
+            JobPost(**{**sample_job_data, "source_id": "2", "title": "Engineering Manager"}),
+        ]
+        config = {"role": {"exclude": ["manager"]}}
+
+        def create_opportunity(job, account_id):
+            # Both jobs are already stored when the CRM is first called
+            assert db.db["jobs"].count == 2
+            return "opp" + job.source_id
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.get_scraper", return_value=scraper):
+            with patch("src.pipeline.load_filter_config", return_value=config):
+                with patch("src.pipeline.espo") as espo:
+                    espo.find_account.return_value = {"id": "acc"}
+                    espo.create_opportunity.side_effect = create_opportunity
+                    run_pipeline(["hn_hiring"])
+
+        assert db.get_job("hn_hiring", "1")["contact_id"] == "opp1"
+        assert db.get_job("hn_hiring", "2")["rejected_stage"] == "role"
+        assert db.get_unsynced_jobs() == []
+        run = db.last_run()
+        assert (run["scraped"], run["new"], run["rejected"], run["synced"], run["failed"]) == (2, 2, 1, 1, 0)
+
+    def test_syncs_are_recorded_when_a_later_sync_crashes(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import run_pipeline
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        scraper = Mock()
+        scraper.scrape.return_value = [
+            JobPost(**{**sample_job_data, "source_id": str(i)}) for i in range(3)
+        ]
+        outcomes = iter([None, KeyboardInterrupt()])
+
+        def sync(job, synced, **kwargs):
+            error = next(outcomes)
+            if error:
+                raise error
+            synced.append({"source": job.source, "source_id": job.source_id, "account_id": "a", "contact_id": "o"})
+            return True
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.get_scraper", return_value=scraper):
+            with patch("src.pipeline.load_filter_config", return_value={}):
+                with patch("src.pipeline.sync_to_crm", side_effect=sync):
+                    with pytest.raises(KeyboardInterrupt):
+                        run_pipeline(["hn_hiring"])
+
+        assert db.get_job("hn_hiring", "0")["synced_at"] is not None
+        assert [row["source_id"] for row in db.get_unsynced_jobs()] == ["1", "2"]
+
+
+class FakeAsyncEspo:
+    """Stands in for AsyncEspoClient, with a delay per call and in-flight tracking"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.accounts = {}
+        self.account_creates = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def _call(self):
+        import asyncio
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+    async def find_account(self, name):
+        await self._call()
+        return {"id": self.accounts[name]} if name in self.accounts else None
+
+    async def create_account(self, company):
+        await self._call()
+        self.account_creates += 1
+        self.accounts[company.name] = f"acc-{company.name}"
+        return self.accounts[company.name]
+
+    async def create_opportunity(self, job, account_id):
+        await self._call()
+        if job.title == "Broken":
+            raise RuntimeError("500 Server Error")
+        return f"opp-{job.source_id}"
+
+
+class TestConcurrentSync:
+    def _jobs(self, sample_job_data, companies):
+        from src.models import JobPost
+
+        return [
+            JobPost(**{**sample_job_data, "source_id": str(i), "company_name": company})
+            for i, company in enumerate(companies)
+        ]
+
+    def test_same_company_is_never_created_twice(self, tmp_path, sample_job_data):
+        import asyncio
+        from src.db import JobDatabase
+        from src.pipeline import sync_jobs_async
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        jobs = self._jobs(sample_job_data, ["Acme", "Globex", "Acme", "Acme", "Globex", "Initech"])
+        db.save_jobs({"job": job} for job in jobs)
+        client = FakeAsyncEspo()
+
+        with patch("src.pipeline.db", db):
+            result = asyncio.run(sync_jobs_async(jobs, concurrency=4, client=client))
+
+        assert result == (6, 0)
+        assert client.account_creates == 3
+        assert client.max_in_flight <= 4
+        assert db.get_unsynced_jobs() == []
+        assert db.get_job("hn_hiring", "3")["account_id"] == "acc-Acme"
+
+    def test_wall_clock_scales_with_concurrency(self, sample_job_data):
+        import asyncio
+        import time
+        from src.pipeline import sync_jobs_async
+
+        jobs = self._jobs(sample_job_data, [f"Company {i}" for i in range(16)])
+        client = FakeAsyncEspo(delay=0.02)
+
+        start = time.perf_counter()
+        with patch("src.pipeline.db"):
+            asyncio.run(sync_jobs_async(jobs, concurrency=16, client=client))
+        elapsed = time.perf_counter() - start
+
+        # Sequentially: 16 jobs x 3 calls x 20ms = 0.96s
+        assert client.max_in_flight == 16
+        assert elapsed < 0.5
+
+    def test_failures_are_counted_and_not_marked(self, tmp_path, sample_job_data):
+        import asyncio
+        from src.db import JobDatabase
+        from src.pipeline import sync_jobs_async
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        jobs = self._jobs(sample_job_data, ["Acme", "Globex"])
+        jobs[1] = jobs[1].model_copy(update={"title": "Broken"})
+        db.save_jobs({"job": job} for job in jobs)
+
+        with patch("src.pipeline.db", db):
+            result = asyncio.run(sync_jobs_async(jobs, concurrency=2, client=FakeAsyncEspo()))
+
+        assert result == (1, 1)
+        assert [row["source_id"] for row in db.get_unsynced_jobs()] == ["1"]
+
+
+class TestSyncOutboxWorker:
+    def _db(self, tmp_path, sample_job_data, companies):
+        from src.db import JobDatabase
+        from src.models import JobPost
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        db.save_jobs(
+            {"job": JobPost(**{**sample_job_data, "source_id": str(i), "company_name": company})}
+            for i, company in enumerate(companies)
+        )
+        return db
+
+    def test_run_without_sync_leaves_jobs_for_the_worker(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import drain_outbox, run_pipeline
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        scraper = Mock()
+        scraper.scrape.return_value = [JobPost(**sample_job_data)]
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.get_scraper", return_value=scraper):
+            with patch("src.pipeline.load_filter_config", return_value={}):
+                with patch("src.pipeline.espo") as espo:
+                    run_pipeline(["hn_hiring"], sync=False)
+                    espo.find_account.assert_not_called()
+                    assert db.outbox_counts()["due"] == 1
+
+                    espo.find_account.return_value = {"id": "acc"}
+                    espo.create_opportunity.return_value = "opp"
+                    assert drain_outbox() == (1, 0)
+
+        assert db.get_unsynced_jobs() == []
+        assert db.outbox_counts()["due"] == 0
+
+    def test_failed_jobs_wait_and_are_dead_lettered(self, tmp_path, sample_job_data):
+        from src.pipeline import drain_outbox
+
+        db = self._db(tmp_path, sample_job_data, ["Acme", "Globex"])
+
+        def create_opportunity(job, account_id):
+            if job.company_name == "Globex":
+                raise RuntimeError("502 Bad Gateway")
+            return "opp"
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.find_account.return_value = {"id": "acc"}
+            espo.create_opportunity.side_effect = create_opportunity
+            assert drain_outbox(batch_size=1) == (1, 1)
+            # Backing off, so not retried by the next drain
+            assert drain_outbox() == (0, 0)
+            assert db.outbox_counts() == {"due": 0, "leased": 0, "waiting": 1, "dead": 0}
+
+            db.db.execute("UPDATE sync_outbox SET available_at = NULL")
+            assert drain_outbox(max_attempts=2) == (0, 1)
+
+        [dead] = db.dead_syncs()
+        assert (dead["source_id"], dead["attempts"], dead["last_error"]) == ("1", 2, "502 Bad Gateway")
+
+    def test_interrupted_worker_releases_its_batch(self, tmp_path, sample_job_data):
+        from src.pipeline import drain_outbox
+
+        db = self._db(tmp_path, sample_job_data, ["Acme", "Globex", "Initech"])
+        outcomes = iter([None, KeyboardInterrupt()])
+
+        def sync(job, synced, **kwargs):
+            error = next(outcomes)
+            if error:
+                raise error
+            synced.append({"source": job.source, "source_id": job.source_id, "account_id": "a", "contact_id": "o"})
+            return True
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.sync_to_crm", side_effect=sync):
+            with pytest.raises(KeyboardInterrupt):
+                drain_outbox()
+
+        assert db.get_job("hn_hiring", "0")["synced_at"] is not None
+        assert db.outbox_counts() == {"due": 2, "leased": 0, "waiting": 0, "dead": 0}
+
+    def test_drain_is_committed(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.pipeline import drain_outbox
+
+        db = self._db(tmp_path, sample_job_data, ["Acme", "Globex", "Initech"])
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.find_account.return_value = {"id": "acc"}
+            espo.create_opportunity.return_value = "opp"
+            assert drain_outbox(batch_size=2) == (3, 0)
+
+        assert not db.db.conn.in_transaction
+        # Another process sees the drain's writes
+        other = JobDatabase(str(tmp_path / "pipeline.db"))
+        assert other.db.execute("SELECT COUNT(synced_at) FROM jobs").fetchone()[0] == 3
+        assert other.db["sync_outbox"].count == 0
+
+    def test_other_worker_claims_between_batches(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.pipeline import drain_outbox
+
+        db = self._db(tmp_path, sample_job_data, ["Acme", "Globex", "Initech"])
+        other = JobDatabase(str(tmp_path / "pipeline.db"))
+        other.db.conn.execute("PRAGMA busy_timeout = 0")
+        claimed = []
+
+        def sync(job, synced, **kwargs):
+            if job.source_id == "1":
+                # The first batch is committed and the worker holds no lock
+                assert other.get_job("hn_hiring", "0")["synced_at"] is not None
+                claimed.extend(job.source_id for job in other.claim_sync_batch("other", 5, 60))
+            synced.append({"source": job.source, "source_id": job.source_id, "account_id": "a", "contact_id": "o"})
+            return True
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.sync_to_crm", side_effect=sync):
+            assert drain_outbox(batch_size=1) == (2, 0)
+
+        assert claimed == ["2"]
+        assert other.outbox_counts()["leased"] == 1
+
+    def test_job_taken_over_by_another_worker_is_skipped(self, tmp_path, sample_job_data):
+        from src.pipeline import drain_outbox
+
+        db = self._db(tmp_path, sample_job_data, ["Acme", "Globex", "Initech"])
+        seen = []
+
+        def sync(job, synced, **kwargs):
+            if not seen:
+                # Job 1's lease runs out while job 0 syncs and another worker claims it
+                db.db.execute("UPDATE sync_outbox SET lease_until = '2000-01-01' WHERE source_id = '1'")
+                assert [job.source_id for job in db.claim_sync_batch("other", 5, 60)] == ["1"]
+            seen.append(job.source_id)
+            synced.append({"source": job.source, "source_id": job.source_id, "account_id": "a", "contact_id": "o"})
+            return True
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.sync_to_crm", side_effect=sync):
+            assert drain_outbox() == (2, 0)
+
+        assert seen == ["0", "2"]
+        assert db.get_job("hn_hiring", "1")["synced_at"] is None
+        assert db.outbox_counts()["leased"] == 1
+
+    def test_concurrent_drain(self, tmp_path, sample_job_data):
+        from src.pipeline import drain_outbox
+
+        db = self._db(tmp_path, sample_job_data, ["Acme", "Globex", "Acme"])
+        client = FakeAsyncEspo()
+
+        with patch("src.pipeline.db", db), patch("src.pipeline._async_espo", return_value=client):
+            assert drain_outbox(concurrency=4, batch_size=2) == (3, 0)
+
+        assert client.account_creates == 2
+        assert db.get_unsynced_jobs() == []
+
+
+class TestBatchedSync:
+    def test_only_created_opportunities_are_marked_synced(self, tmp_path, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.db import JobDatabase
+        from src.espo_client import BatchResult
+        from src.models import JobPost
+        from src.pipeline import sync_jobs_batched
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        jobs = [
+            JobPost(**{**sample_job_data, "source_id": str(i), "company_name": company, "title": title})
+            for i, (company, title) in enumerate(
+                [("Acme", "Backend"), ("Globex", "Backend"), ("acme", "Broken"), ("Initech", "Backend")]
+            )
+        ]
+        db.save_jobs({"job": job} for job in jobs)
+        accounts = AccountCache(db)
+        accounts.put("Initech", "acc-initech")
+        failures = []
+
+        def create_opportunities(items, concurrency):
+            return [
+                BatchResult(error=RuntimeError("400")) if job.title == "Broken" else BatchResult("opp-" + job.source_id)
+                for job, _ in items
+            ]
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.find_accounts.return_value = [BatchResult({"id": "acc-acme"}), BatchResult(None)]
+            espo.create_accounts.return_value = [BatchResult("acc-globex")]
+            espo.create_opportunities.side_effect = create_opportunities
+            assert sync_jobs_batched(jobs, 4, accounts, failures) == (3, 1)
+
+        assert espo.find_accounts.call_args.args[0] == ["Acme", "Globex"]
+        assert [company.name for company in espo.create_accounts.call_args.args[0]] == ["Globex"]
+        # Both Acme jobs go out together, not one after the other
+        assert espo.create_opportunities.call_count == 1
+        assert [row["source_id"] for row in db.get_unsynced_jobs()] == ["2"]
+        assert db.get_job("hn_hiring", "3")["account_id"] == "acc-initech"
+        assert failures == [{"source": "hn_hiring", "source_id": "2", "error": "400"}]
+
+    def test_failed_account_lookup_fails_its_jobs(self, tmp_path, sample_job_data):
+        from src.account_cache import AccountCache
+        from src.db import JobDatabase
+        from src.espo_client import BatchResult
+        from src.models import JobPost
+        from src.pipeline import sync_jobs_batched
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        jobs = [JobPost(**{**sample_job_data, "source_id": str(i)}) for i in range(2)]
+        db.save_jobs({"job": job} for job in jobs)
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.espo") as espo:
+            espo.find_accounts.return_value = [BatchResult(error=RuntimeError("503"))]
+            espo.create_accounts.return_value = []
+            espo.create_opportunities.return_value = []
+            assert sync_jobs_batched(jobs, 4, AccountCache(db)) == (0, 2)
+
+        assert len(db.get_unsynced_jobs()) == 2
+
+
+class TestDropDuplicates:
+    def test_drops_stored_and_repeated_jobs(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import drop_duplicates
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        jobs = [JobPost(**{**sample_job_data, "source_id": source_id}) for source_id in ["1", "2", "3", "3"]]
+        db.save_job(jobs[0])
+        db.save_job(jobs[1], rejected_stage="role", rejection_reason="no match")
+
+        with patch("src.pipeline.db", db):
+            fresh = drop_duplicates(jobs)
+
+        assert [job.source_id for job in fresh] == ["2", "3"]
+
+
+class TestFilterCache:
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        from src.db import JobDatabase
+
+        return JobDatabase(str(tmp_path / "pipeline.db"))
+
+    @pytest.fixture
+    def config(self):
+        return {
+            "role": {"include": ["engineer"], "exclude": ["manager"]},
+            "tech": {"require_any": ["python"]},
+        }
+
+    @pytest.fixture
+    def jobs(self, sample_job_data):
+        from src.models import JobPost
+
+        return [
+            JobPost(**{**sample_job_data, "source_id": "1"}),
+            JobPost(**{**sample_job_data, "source_id": "2", "title": "Engineering Manager"}),
+            JobPost(**{**sample_job_data, "source_id": "3", "description": "Java shop", "tech_stack": []}),
+        ]
+
+    def test_reuses_cached_decisions(self, temp_db, config, jobs):
+        from src.filters import CompiledFilter
+        from src.pipeline import apply_filters
+
+        with patch("src.pipeline.db", temp_db):
+            first = apply_filters(jobs, CompiledFilter(config))
+            with patch("src.pipeline.evaluate_jobs", return_value=[]) as evaluate:
+                second = apply_filters(jobs, CompiledFilter(config))
+
+        assert [r is None for r in first] == [True, False, False]
+        assert [str(r) for r in second] == [str(r) for r in first]
+        evaluate.assert_called_once_with([], config, workers=None, stage_order=CompiledFilter.STAGES)
+
+    def test_changed_content_is_reevaluated(self, temp_db, config, jobs):
+        from src.filters import CompiledFilter
+        from src.pipeline import apply_filters
+
+        with patch("src.pipeline.db", temp_db):
+            apply_filters(jobs, CompiledFilter(config))
+            edited = jobs[1].model_copy(update={"title": "Backend Engineer"})
+            assert apply_filters([edited], CompiledFilter(config)) == [None]
+
+    def test_config_change_only_invalidates_affected_decisions(self, temp_db, config, jobs):
+        from src.filters import CompiledFilter, evaluate_jobs
+        from src.pipeline import apply_filters
+
+        with patch("src.pipeline.db", temp_db):
+            apply_filters(jobs, CompiledFilter(config))
+            tech_changed = {**config, "tech": {"require_any": ["python", "java"]}}
+            with patch("src.pipeline.evaluate_jobs", side_effect=evaluate_jobs) as evaluate:
+                results = apply_filters(jobs, CompiledFilter(tech_changed))
+
+        # The role rejection doesn't depend on the tech config, so it stays cached
+        assert [r is None for r in results] == [True, False, True]
+        assert [job.source_id for job in evaluate.call_args[0][0]] == ["1", "3"]
+
+
+class TestRefilter:
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        from src.db import JobDatabase
+
+        return JobDatabase(str(tmp_path / "pipeline.db"))
+
+    @pytest.fixture
+    def config(self):
+        return {"role": {"include": ["engineer"], "exclude": ["manager"]}}
+
+    def _store(self, db, config, jobs):
+        from src.filters import CompiledFilter
+
+        job_filter = CompiledFilter(config)
+        db.save_filter_config(job_filter.config_hash, config)
+        for job in jobs:
+            rejection = job_filter.evaluate(job)
+            db.save_job(
+                job,
+                rejected_stage=rejection.stage if rejection else None,
+                rejection_reason=rejection.reason if rejection else None,
+                filter_hash=job_filter.config_hash,
+            )
+
+    @pytest.fixture
+    def jobs(self, sample_job_data):
+        from src.models import JobPost
+
+        return [
+            JobPost(**{**sample_job_data, "source_id": "1", "title": "Backend Engineer"}),
+            JobPost(**{**sample_job_data, "source_id": "2", "title": "Frontend Engineer"}),
+            JobPost(**{**sample_job_data, "source_id": "3", "title": "Engineering Manager"}),
+        ]
+
+    def test_new_exclude_only_rechecks_passing_jobs(self, temp_db, config, jobs):
+        from src.filters import CompiledFilter
+        from src.pipeline import refilter_stored_jobs
+
+        self._store(temp_db, config, jobs)
+        new_config = {"role": {"include": ["engineer"], "exclude": ["manager", "frontend"]}}
+
+        with patch("src.pipeline.db", temp_db), patch("src.pipeline.load_filter_config", return_value=new_config):
+            with patch.object(CompiledFilter, "evaluate", autospec=True, side_effect=CompiledFilter.evaluate) as evaluate:
+                newly_passing, newly_failing = refilter_stored_jobs()
+
+        assert sorted(call.args[1].source_id for call in evaluate.call_args_list) == ["1", "2"]
+        assert newly_passing == []
+        assert [row["source_id"] for row in newly_failing] == ["2"]
+        assert temp_db.get_job("hn_hiring", "2")["rejected_stage"] == "role"
+        assert temp_db.filter_hashes() == [CompiledFilter(new_config).config_hash]
+
+    def test_removed_exclude_reports_newly_passing(self, temp_db, config, jobs):
+        from src.pipeline import refilter_stored_jobs
+
+        self._store(temp_db, config, jobs)
+        new_config = {"role": {"include": ["engineer"]}}
+
+        with patch("src.pipeline.db", temp_db), patch("src.pipeline.load_filter_config", return_value=new_config):
+            newly_passing, newly_failing = refilter_stored_jobs()
+
+        assert [row["source_id"] for row in newly_passing] == ["3"]
+        assert newly_failing == []
+        assert temp_db.get_job("hn_hiring", "3")["rejection_reason"] is None
+
+    def test_dry_run_saves_nothing(self, temp_db, config, jobs):
+        from src.pipeline import refilter_stored_jobs
+
+        self._store(temp_db, config, jobs)
+        new_config = {"role": {"include": ["engineer"]}}
+
+        with patch("src.pipeline.db", temp_db), patch("src.pipeline.load_filter_config", return_value=new_config):
+            newly_passing, _ = refilter_stored_jobs(dry_run=True)
+
+        assert len(newly_passing) == 1
+        assert temp_db.get_job("hn_hiring", "3")["rejected_stage"] == "role"
+
+    def test_synced_job_is_not_synced_again_after_refilters(self, temp_db, sample_job_data):
+        from src.models import JobPost
+        from src.pipeline import refilter_stored_jobs, run_pipeline
+
+        scraper = Mock()
+        scraper.scrape.return_value = [JobPost(**sample_job_data)]
+        config = {}
+
+        with patch("src.pipeline.db", temp_db), patch("src.pipeline.get_scraper", return_value=scraper):
+            with patch("src.pipeline.load_filter_config", side_effect=lambda: config):
+                with patch("src.pipeline.espo") as espo:
+                    espo.find_account.return_value = {"id": "acc"}
+                    espo.create_opportunity.return_value = "opp"
+                    run_pipeline(["hn_hiring"])
+                    config = {"role": {"exclude": ["backend"]}}
+                    refilter_stored_jobs()
+                    run_pipeline(["hn_hiring"])
+                    config = {}
+                    refilter_stored_jobs()
+                    run_pipeline(["hn_hiring"])
+
+        espo.create_opportunity.assert_called_once()
+        assert temp_db.get_job("hn_hiring", "12345")["contact_id"] == "opp"
+        assert temp_db.outbox_counts()["due"] == 0
+
+
+class TestAdaptiveOrdering:
+    def test_adaptive_run_records_stage_stats(self, tmp_path, sample_job_data):
+        from src.db import JobDatabase
+        from src.models import JobPost
+        from src.pipeline import run_pipeline
+
+        db = JobDatabase(str(tmp_path / "pipeline.db"))
+        scraper = Mock()
+        scraper.scrape.return_value = [
+            JobPost(**{**sample_job_data, "source_id": str(i), "title": "Engineering Manager"})
+            for i in range(3)
+        ]
+        config = {"role": {"exclude": ["manager"]}}
+
+        with patch("src.pipeline.db", db), patch("src.pipeline.get_scraper", return_value=scraper):
+            with patch("src.pipeline.load_filter_config", return_value=config):
+                run_pipeline(["hn_hiring"], dry_run=True, adaptive=True)
+
+        stats = db.get_stage_stats()
+        assert stats["role"]["samples"] == 1
+        assert stats["role"]["failures"] == 1
+        assert stats["tech"]["failures"] == 0
@@ -0,0 +1,41 @@
+class TestTechExtractor:
+    def test_returns_canonical_names(self):
+        from src.tech import extract_tech_stack
+
+        result = extract_tech_stack("We run Postgres on k8s, with a NextJS and NodeJS frontend")
+        assert result == ["next.js", "node.js", "kubernetes", "postgresql"]
+
+    def test_matches_whole_words_only(self):
+        from src.tech import extract_tech_stack
+
+        assert extract_tech_stack("A good team with great goals") == []
+        assert extract_tech_stack("Backend in Go, infra on AWS.") == ["go", "aws"]
+
+    def test_matches_symbols_and_dots(self):
+        from src.tech import extract_tech_stack
+
+        result = extract_tech_stack("C++ and C# services, a Node.js API, React.js UI")
+        assert result == ["c++", "c#", "react", "node.js", "api"]
+
+    def test_keeps_the_keywords_of_the_old_indeed_list(self):
+        from src.tech import extract_tech_stack
+
+        result = extract_tech_stack("Express and Spring services behind a public API")
+        assert result == ["express", "spring", "api"]
+
+    def test_prefers_longest_alias(self):
+        from src.tech import extract_tech_stack
+
+        assert extract_tech_stack("Ruby on Rails on Google Cloud Platform") == ["ruby", "rails", "gcp"]
+
+    def test_custom_alias_table(self):
+        from src.tech import TechExtractor
+
+        extractor = TechExtractor({"elixir": ("elixir", "phoenix")})
+        assert extractor.extract("Phoenix LiveView, Python") == ["elixir"]
+
+    def test_merge_keeps_tags_and_adds_new_tech(self):
+        from src.tech import merge_tech_stack
+
+        result = merge_tech_stack(["Python", "React"], "python, react.js and k8s")
+        assert result == ["Python", "React", "kubernetes"]